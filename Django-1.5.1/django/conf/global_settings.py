@@ -20,6 +20,13 @@ DEBUG_PROPAGATE_EXCEPTIONS = False
 # Whether to use the "Etag" header. This saves bandwidth but slows down performance.
 USE_ETAGS = False
 
+# The zlib compression level (1-9) used by GZipMiddleware.
+GZIP_COMPRESSION_LEVEL = 6
+
+# Number of bytes of a streaming response GZipMiddleware compresses before
+# flushing the output to the client. 0 flushes after every chunk.
+GZIP_STREAMING_FLUSH_SIZE = 0
+
 # People who get code error notifications.
 # In the format (('Full Name', 'email@example.com'), ('Full Name', 'anotheremail@example.com'))
 ADMINS = ()
@@ -273,6 +280,11 @@ IGNORABLE_404_URLS = ()
 # loudly.
 SECRET_KEY = ''
 
+# Previous secret keys. Values signed with one of them are still accepted,
+# while everything new is signed with SECRET_KEY, so the key can be rotated
+# without invalidating every session and signed cookie at once.
+SECRET_KEY_FALLBACKS = []
+
 # Default file storage mechanism that holds media.
 DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
 
@@ -303,11 +315,26 @@ FILE_UPLOAD_HANDLERS = (
 # file system instead of into memory.
 FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440 # i.e. 2.5 MB
 
+# Maximum size in bytes of a request body that may be loaded into memory, as
+# request.body or to parse a form-encoded request.POST. Larger form bodies are
+# spooled to disk and parsed from there; accessing request.body for them raises
+# RequestDataTooBig. `None` disables the limit.
+DATA_UPLOAD_MAX_MEMORY_SIZE = None
+
 # Directory in which upload streamed files will be temporarily saved. A value of
 # `None` will make Django use the operating system's default temporary directory
 # (i.e. "/tmp" on *nix systems).
 FILE_UPLOAD_TEMP_DIR = None
 
+# Whether DirectTemporaryFileUploadHandler fsyncs each uploaded file once it
+# has been completely written.
+FILE_UPLOAD_FSYNC = False
+
+# Number of bytes after which DirectTemporaryFileUploadHandler fsyncs the file
+# it is writing, limiting how much unwritten data builds up during large
+# uploads. `None` disables periodic fsyncs.
+FILE_UPLOAD_FSYNC_INTERVAL = None
+
 # The numeric mode to set newly-uploaded files to. The value should be a mode
 # you'd pass directly to os.chmod; see http://docs.python.org/lib/os-file-dir.html.
 FILE_UPLOAD_PERMISSIONS = None
@@ -453,6 +480,10 @@ MIDDLEWARE_CLASSES = (
 #     'django.middleware.gzip.GZipMiddleware',
 )
 
+# Whether to record the latency of every middleware method; see
+# django.core.handlers.stats.get_middleware_stats().
+MIDDLEWARE_TIMING = False
+
 ############
 # SESSIONS #
 ############
@@ -467,7 +498,11 @@ SESSION_COOKIE_HTTPONLY = True                          # Whether to use the non
 SESSION_SAVE_EVERY_REQUEST = False                      # Whether to save the session data on every request.
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False                 # Whether a user's session cookie expires when the Web browser is closed.
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'  # The module to store session data
+SESSION_SERIALIZER = 'django.contrib.sessions.serializers.PickleSerializer'  # Class used to serialize session data.
 SESSION_FILE_PATH = None                                # Directory to store session files if using the file session module. If None, the backend will use a sensible default.
+SESSION_WRITE_BEHIND = False                            # Whether the cached_db backend writes sessions to the database in the background.
+SESSION_WRITE_BEHIND_INTERVAL = 1                       # Seconds between two background writes of pending sessions.
+SESSION_WRITE_BEHIND_QUEUE_SIZE = 1000                  # Maximum number of pending sessions before they are written synchronously.
 
 #########
 # CACHE #
@@ -483,6 +518,14 @@ CACHE_MIDDLEWARE_KEY_PREFIX = ''
 CACHE_MIDDLEWARE_SECONDS = 600
 CACHE_MIDDLEWARE_ALIAS = 'default'
 
+# Whether pages cached by the cache middleware are tagged with their URL path
+# prefixes, so they can be purged with django.utils.cache.invalidate_cache_path.
+CACHE_MIDDLEWARE_PATH_TAGS = False
+
+# Maximum size in bytes of a streaming response that the cache middleware will
+# store once it has been sent in full. `None` never caches streaming responses.
+CACHE_MIDDLEWARE_STREAMING_MAX_SIZE = None
+
 ####################
 # COMMENTS         #
 ####################
@@ -507,6 +550,18 @@ LOGOUT_URL = '/accounts/logout/'
 
 LOGIN_REDIRECT_URL = '/accounts/profile/'
 
+# The cache alias ModelBackend shares users' permissions through between
+# requests. None keeps them in the user object for the current request only.
+AUTH_PERMISSION_CACHE_ALIAS = None
+
+# The cache alias used to keep logged in users between requests, sparing a
+# query on every request. None loads the user from its backend each time.
+AUTH_USER_CACHE_ALIAS = None
+
+# The number of seconds a cached user is kept for. Writes that bypass the
+# model's signals only show up once the entry expires.
+AUTH_USER_CACHE_TIMEOUT = 60
+
 # The number of days a password reset link is valid for
 PASSWORD_RESET_TIMEOUT_DAYS = 3
 
@@ -524,6 +579,11 @@ PASSWORD_HASHERS = (
     'django.contrib.auth.hashers.CryptPasswordHasher',
 )
 
+# The maximum number of passwords hashed or checked at the same time by a
+# process. Other requests needing a hash wait for a free slot. None means
+# no limit.
+PASSWORD_HASHING_CONCURRENCY = None
+
 ###########
 # SIGNING #
 ###########
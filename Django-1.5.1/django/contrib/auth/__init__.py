@@ -1,4 +1,5 @@
 import re
+import time
 
 from django.core.exceptions import ImproperlyConfigured
 from django.utils.importlib import import_module
@@ -7,9 +8,17 @@ from django.contrib.auth.signals import user_logged_in, user_logged_out, user_lo
 SESSION_KEY = '_auth_user_id'
 BACKEND_SESSION_KEY = '_auth_user_backend'
 REDIRECT_FIELD_NAME = 'next'
+USER_CACHE_PREFIX = 'django.contrib.auth.user'
+
+# Backend instances by dotted path; backends are created once and reused.
+_backends = {}
 
 
 def load_backend(path):
+    try:
+        return _backends[path]
+    except KeyError:
+        pass
     i = path.rfind('.')
     module, attr = path[:i], path[i + 1:]
     try:
@@ -22,7 +31,8 @@ def load_backend(path):
         cls = getattr(mod, attr)
     except AttributeError:
         raise ImproperlyConfigured('Module "%s" does not define a "%s" authentication backend' % (module, attr))
-    return cls()
+    backend = _backends[path] = cls()
+    return backend
 
 
 def get_backends():
@@ -107,6 +117,10 @@ def logout(request):
         user = None
     user_logged_out.send(sender=user.__class__, request=request, user=user)
 
+    cache = _get_user_cache()
+    if cache is not None and SESSION_KEY in request.session:
+        cache.delete(_user_cache_key(request.session.session_key,
+                                     request.session[SESSION_KEY]))
     request.session.flush()
     if hasattr(request, 'user'):
         from django.contrib.auth.models import AnonymousUser
@@ -128,13 +142,65 @@ def get_user_model():
     return user_model
 
 
+def _get_user_cache():
+    from django.conf import settings
+    if not settings.AUTH_USER_CACHE_ALIAS:
+        return None
+    from django.core.cache import get_cache
+    return get_cache(settings.AUTH_USER_CACHE_ALIAS)
+
+
+def _user_cache_key(session_key, user_id):
+    return '%s.%s.%s' % (USER_CACHE_PREFIX, session_key, user_id)
+
+
+def _user_version_key(user_id):
+    return '%s.version.%s' % (USER_CACHE_PREFIX, user_id)
+
+
+def invalidate_cached_user(user_id):
+    """
+    Makes get_user() load the given user from its backend again in every
+    session, by moving the user to a new version. Saving or deleting the user
+    through the ORM does this; writes that send no signals, such as
+    QuerySet.update() or raw SQL, must call it themselves.
+    """
+    cache = _get_user_cache()
+    if cache is None:
+        return
+    version_key = _user_version_key(user_id)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, int(time.time() * 1000))
+
+
 def get_user(request):
+    from django.conf import settings
     from django.contrib.auth.models import AnonymousUser
     try:
         user_id = request.session[SESSION_KEY]
         backend_path = request.session[BACKEND_SESSION_KEY]
-        backend = load_backend(backend_path)
-        user = backend.get_user(user_id) or AnonymousUser()
     except KeyError:
-        user = AnonymousUser()
+        return AnonymousUser()
+
+    cache = _get_user_cache()
+    if cache is not None:
+        # Users are cached per session, and stamped with a version that
+        # changes whenever the user is saved.
+        key = _user_cache_key(request.session.session_key, user_id)
+        version_key = _user_version_key(user_id)
+        values = cache.get_many([key, version_key])
+        version = values.get(version_key)
+        entry = values.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        if version is None:
+            cache.add(version_key, int(time.time() * 1000))
+            version = cache.get(version_key)
+
+    backend = load_backend(backend_path)
+    user = backend.get_user(user_id) or AnonymousUser()
+    if cache is not None and version is not None and user.is_authenticated():
+        cache.set(key, (version, user), settings.AUTH_USER_CACHE_TIMEOUT)
     return user
@@ -1,6 +1,60 @@
 from __future__ import unicode_literals
+import time
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
+from django.core.cache import get_cache
+from django.db.models import Q
+
+PERMISSION_CACHE_PREFIX = 'django.contrib.auth.permissions'
+PERMISSION_GENERATION_KEY = PERMISSION_CACHE_PREFIX + '.generation'
+# How long, in seconds, cached permissions are kept. It bounds how long a
+# change the invalidation doesn't see, such as a raw SQL update, goes unnoticed.
+PERMISSION_CACHE_TIMEOUT = 5 * 60
+
+
+def get_permission_cache():
+    """
+    Returns the cache named by AUTH_PERMISSION_CACHE_ALIAS, or None when
+    permissions aren't shared between requests.
+    """
+    if not settings.AUTH_PERMISSION_CACHE_ALIAS:
+        return None
+    return get_cache(settings.AUTH_PERMISSION_CACHE_ALIAS)
+
+
+def _permission_cache_key(kind, user_id):
+    return '%s.%s.%s' % (PERMISSION_CACHE_PREFIX, kind, user_id)
+
+
+def _permission_version_key(user_id):
+    return '%s.version.%s' % (PERMISSION_CACHE_PREFIX, user_id)
+
+
+def _new_version(cache, key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000))
+
+
+def invalidate_permission_cache(user_ids=None):
+    """
+    Invalidates the shared permission cache entries of the given users, or
+    of all users if ``user_ids`` is None.
+    """
+    cache = get_permission_cache()
+    if cache is None:
+        return
+    # Entries are stamped with the generation and the user's version they
+    # were computed in. Moving to a new one invalidates them, including any
+    # that a request computing them right now stores afterwards.
+    if user_ids is None:
+        _new_version(cache, PERMISSION_GENERATION_KEY)
+    else:
+        for user_id in user_ids:
+            _new_version(cache, _permission_version_key(user_id))
 
 
 class ModelBackend(object):
@@ -19,6 +73,35 @@ class ModelBackend(object):
         except UserModel.DoesNotExist:
             return None
 
+    def _get_cached_permissions(self, user_obj, kind, compute):
+        """
+        Returns the ``kind`` permissions of user_obj from the shared cache,
+        computing and storing them with ``compute`` on a miss. Superusers
+        have every permission and are never cached.
+        """
+        cache = get_permission_cache()
+        if cache is None or user_obj.is_superuser:
+            return compute()
+        key = _permission_cache_key(kind, user_obj.pk)
+        version_key = _permission_version_key(user_obj.pk)
+        values = cache.get_many([PERMISSION_GENERATION_KEY, version_key, key])
+        stamp = []
+        for stamp_key in (PERMISSION_GENERATION_KEY, version_key):
+            value = values.get(stamp_key)
+            if value is None:
+                cache.add(stamp_key, int(time.time() * 1000))
+                value = cache.get(stamp_key)
+            stamp.append(value)
+        stamp = tuple(stamp)
+        entry = values.get(key)
+        if entry is not None and entry[0] == stamp:
+            return set(entry[1])
+        # Read the stamp before computing, so that an invalidation made in
+        # the meantime leaves the stored entry out of date.
+        perms = compute()
+        cache.set(key, (stamp, list(perms)), PERMISSION_CACHE_TIMEOUT)
+        return perms
+
     def get_group_permissions(self, user_obj, obj=None):
         """
         Returns a set of permission strings that this user has through his/her
@@ -27,24 +110,47 @@ class ModelBackend(object):
         if user_obj.is_anonymous() or obj is not None:
             return set()
         if not hasattr(user_obj, '_group_perm_cache'):
-            if user_obj.is_superuser:
-                perms = Permission.objects.all()
-            else:
-                user_groups_field = get_user_model()._meta.get_field('groups')
-                user_groups_query = 'group__%s' % user_groups_field.related_query_name()
-                perms = Permission.objects.filter(**{user_groups_query: user_obj})
-            perms = perms.values_list('content_type__app_label', 'codename').order_by()
-            user_obj._group_perm_cache = set(["%s.%s" % (ct, name) for ct, name in perms])
+            def compute():
+                if user_obj.is_superuser:
+                    perms = Permission.objects.all()
+                else:
+                    user_groups_field = get_user_model()._meta.get_field('groups')
+                    user_groups_query = 'group__%s' % user_groups_field.related_query_name()
+                    perms = Permission.objects.filter(**{user_groups_query: user_obj})
+                return self._perm_names(perms)
+            user_obj._group_perm_cache = self._get_cached_permissions(
+                user_obj, 'group', compute)
         return user_obj._group_perm_cache
 
     def get_all_permissions(self, user_obj, obj=None):
         if user_obj.is_anonymous() or obj is not None:
             return set()
         if not hasattr(user_obj, '_perm_cache'):
-            user_obj._perm_cache = set(["%s.%s" % (p.content_type.app_label, p.codename) for p in user_obj.user_permissions.select_related()])
-            user_obj._perm_cache.update(self.get_group_permissions(user_obj))
+            def compute():
+                if user_obj.is_superuser:
+                    return self._perm_names(Permission.objects.all())
+                # Fetch direct and group permissions in one query. Filtering
+                # on two subqueries avoids joining both many-to-many tables
+                # at once, which would multiply the rows.
+                UserModel = get_user_model()
+                user_perms_query = UserModel._meta.get_field(
+                    'user_permissions').related_query_name()
+                user_groups_query = 'group__%s' % UserModel._meta.get_field(
+                    'groups').related_query_name()
+                direct = Permission.objects.filter(
+                    **{user_perms_query: user_obj}).values('pk')
+                through_groups = Permission.objects.filter(
+                    **{user_groups_query: user_obj}).values('pk')
+                return self._perm_names(Permission.objects.filter(
+                    Q(pk__in=direct) | Q(pk__in=through_groups)))
+            user_obj._perm_cache = self._get_cached_permissions(
+                user_obj, 'all', compute)
         return user_obj._perm_cache
 
+    def _perm_names(self, perms):
+        perms = perms.values_list('content_type__app_label', 'codename').order_by()
+        return set(["%s.%s" % (ct, name) for ct, name in perms])
+
     def has_perm(self, user_obj, perm, obj=None):
         if not user_obj.is_active:
             return False
@@ -2,6 +2,7 @@ from __future__ import unicode_literals
 
 import base64
 import hashlib
+import threading
 
 from django.dispatch import receiver
 from django.conf import settings
@@ -18,6 +19,8 @@ from django.utils.translation import ugettext_noop as _
 UNUSABLE_PASSWORD = '!'  # This will never be a valid encoded hash
 HASHERS = None  # lazily loaded from PASSWORD_HASHERS
 PREFERRED_HASHER = None  # defaults to first item in PASSWORD_HASHERS
+HASHING_SEMAPHORE = None  # lazily created from PASSWORD_HASHING_CONCURRENCY
+_hashing_semaphore_lock = threading.Lock()
 
 @receiver(setting_changed)
 def reset_hashers(**kwargs):
@@ -25,6 +28,37 @@ def reset_hashers(**kwargs):
         global HASHERS, PREFERRED_HASHER
         HASHERS = None
         PREFERRED_HASHER = None
+    elif kwargs['setting'] == 'PASSWORD_HASHING_CONCURRENCY':
+        global HASHING_SEMAPHORE
+        HASHING_SEMAPHORE = None
+
+
+def get_hashing_semaphore():
+    """
+    Returns the semaphore bounding how many passwords are hashed at once, or
+    None if PASSWORD_HASHING_CONCURRENCY doesn't set a limit.
+    """
+    global HASHING_SEMAPHORE
+    if not settings.PASSWORD_HASHING_CONCURRENCY:
+        return None
+    with _hashing_semaphore_lock:
+        if HASHING_SEMAPHORE is None:
+            HASHING_SEMAPHORE = threading.BoundedSemaphore(
+                settings.PASSWORD_HASHING_CONCURRENCY)
+        return HASHING_SEMAPHORE
+
+
+def _run_hasher(func, *args):
+    """
+    Runs one of a hasher's methods, waiting for a free slot first if the
+    number of concurrent hashing operations is bounded. This keeps a burst
+    of logins from taking every CPU and starving the other requests.
+    """
+    semaphore = get_hashing_semaphore()
+    if semaphore is None:
+        return func(*args)
+    with semaphore:
+        return func(*args)
 
 
 def is_password_usable(encoded):
@@ -52,7 +86,7 @@ def check_password(password, encoded, setter=None, preferred='default'):
     hasher = identify_hasher(encoded)
 
     must_update = hasher.algorithm != preferred.algorithm
-    is_correct = hasher.verify(password, encoded)
+    is_correct = _run_hasher(hasher.verify, password, encoded)
     if setter and is_correct and must_update:
         setter(password)
     return is_correct
@@ -74,7 +108,7 @@ def make_password(password, salt=None, hasher='default'):
     if not salt:
         salt = hasher.salt()
 
-    return hasher.encode(password, salt)
+    return _run_hasher(hasher.encode, password, salt)
 
 
 def load_hashers(password_hashers=None):
@@ -0,0 +1,72 @@
+import time
+from optparse import make_option
+
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import NoArgsCommand, CommandError
+
+
+class Command(NoArgsCommand):
+    option_list = NoArgsCommand.option_list + (
+        make_option('--hasher', action='store', dest='hasher', default='default',
+            help='Algorithm of the password hasher to benchmark. Defaults to '
+                 'the first hasher in PASSWORD_HASHERS.'),
+        make_option('--target', action='store', dest='target', type='float',
+            default=100,
+            help='Time in milliseconds a password check should take. Default is 100.'),
+        make_option('--samples', action='store', dest='samples', type='int',
+            default=5,
+            help='Number of timed runs; the fastest one is used. Default is 5.'),
+    )
+    help = ("Times a password hasher on this machine and recommends the "
+            "number of iterations that makes a password check take the "
+            "target time.")
+
+    requires_model_validation = False
+
+    # Hashing must take at least this many seconds to be timed reliably.
+    min_duration = 0.005
+
+    def handle_noargs(self, **options):
+        target = options.get('target', 100)
+        samples = options.get('samples', 5)
+        if target <= 0:
+            raise CommandError("--target must be a positive number of milliseconds.")
+        if samples < 1:
+            raise CommandError("--samples must be at least 1.")
+        try:
+            hasher = get_hasher(options.get('hasher', 'default'))
+        except ValueError as e:
+            raise CommandError(e)
+        if not getattr(hasher, 'iterations', None):
+            raise CommandError("The '%s' hasher doesn't have an iteration count."
+                               % hasher.algorithm)
+
+        current = hasher.iterations
+        current_duration = self.time_hasher(hasher, current, samples)
+        # Cheap hashers are timed with more iterations to drown out noise.
+        iterations, duration = current, current_duration
+        while duration < self.min_duration:
+            iterations *= 2
+            duration = self.time_hasher(hasher, iterations, samples)
+
+        per_iteration = duration / iterations
+        recommended = int(target / 1000.0 / per_iteration)
+        # Round to a figure that is easy to read in a settings file.
+        if recommended >= 10000:
+            recommended = int(round(recommended, -3))
+        recommended = max(recommended, 1)
+
+        self.stdout.write("Hasher: %s" % hasher.algorithm)
+        self.stdout.write("Current iterations: %d (%.1f ms per check)"
+                          % (current, current_duration * 1000))
+        self.stdout.write("Recommended iterations for %g ms: %d"
+                          % (target, recommended))
+
+    def time_hasher(self, hasher, iterations, samples):
+        salt = hasher.salt()
+        timings = []
+        for i in range(samples):
+            start = time.time()
+            hasher.encode('password', salt, iterations)
+            timings.append(time.time() - start)
+        return min(timings)
@@ -2,11 +2,14 @@ from __future__ import unicode_literals
 import re
 import warnings
 
+from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.core.mail import send_mail
+from django.dispatch import receiver
 from django.core import validators
 from django.db import models
 from django.db.models.manager import EmptyManager
+from django.test.signals import setting_changed
 from django.utils.crypto import get_random_string
 from django.utils.http import urlquote
 from django.utils import six
@@ -534,3 +537,109 @@ class AnonymousUser(object):
 
     def is_authenticated(self):
         return False
+
+
+def invalidate_permission_cache_on_m2m_change(sender, instance, action,
+                                              reverse, pk_set, **kwargs):
+    """
+    A signal receiver which drops the permissions ModelBackend shares
+    between requests when a user's permissions or groups, or a group's
+    permissions, change.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    from django.contrib.auth.backends import invalidate_permission_cache
+    if sender is Group.permissions.through:
+        invalidate_permission_cache()
+    elif not reverse:
+        invalidate_permission_cache([instance.pk])
+    elif pk_set is not None:
+        invalidate_permission_cache(pk_set)
+    else:
+        # Clearing a group's users doesn't say who was in it.
+        invalidate_permission_cache()
+
+
+def invalidate_permission_cache_on_delete(sender, **kwargs):
+    """
+    A signal receiver which drops the shared permission cache when a group
+    or a permission is deleted, since related rows go without m2m_changed.
+    """
+    from django.contrib.auth.backends import invalidate_permission_cache
+    invalidate_permission_cache()
+
+
+def invalidate_cached_user_on_change(sender, instance, **kwargs):
+    """
+    A signal receiver which drops the copies of a user get_user() cached
+    when the user is saved or deleted.
+    """
+    auth.invalidate_cached_user(instance.pk)
+
+# The (signal, receiver, sender) connections made by connect_cache_receivers(),
+# by dispatch_uid.
+_cache_receivers = {}
+
+
+def _set_receivers(dispatch_uid, receivers):
+    """
+    Replaces the connections made under ``dispatch_uid`` with ``receivers``.
+    """
+    if receivers == _cache_receivers.get(dispatch_uid, []):
+        return
+    for signal, receiver, sender in _cache_receivers.get(dispatch_uid, []):
+        signal.disconnect(sender=sender, dispatch_uid=dispatch_uid)
+    for signal, receiver, sender in receivers:
+        signal.connect(receiver, sender=sender, dispatch_uid=dispatch_uid)
+    _cache_receivers[dispatch_uid] = receivers
+
+
+def connect_cache_receivers(**kwargs):
+    """
+    Connects the receivers that invalidate the shared permission cache and
+    the user cache, only to the models they watch and only while those
+    caches are enabled. Delete receivers for every model would disable fast
+    deletes across the project.
+    """
+    try:
+        app_label, model_name = settings.AUTH_USER_MODEL.split('.')
+    except ValueError:
+        # get_user_model() reports the bad setting.
+        user_model = None
+    else:
+        # The user model may not be prepared yet; class_prepared calls this
+        # again once it is.
+        user_model = models.get_model(app_label, model_name,
+                                      seed_cache=False, only_installed=False)
+
+    receivers = []
+    if settings.AUTH_PERMISSION_CACHE_ALIAS:
+        m2m_senders = [Group.permissions.through]
+        for name in ('groups', 'user_permissions'):
+            try:
+                m2m_senders.append(user_model._meta.get_field(name).rel.through)
+            except (AttributeError, models.FieldDoesNotExist):
+                pass
+        receivers = [(models.signals.m2m_changed,
+                      invalidate_permission_cache_on_m2m_change, sender)
+                     for sender in m2m_senders]
+        receivers += [(models.signals.post_delete,
+                       invalidate_permission_cache_on_delete, sender)
+                      for sender in (Group, Permission)]
+    _set_receivers('django.contrib.auth.permission_cache', receivers)
+
+    receivers = []
+    if settings.AUTH_USER_CACHE_ALIAS and user_model is not None:
+        receivers = [(signal, invalidate_cached_user_on_change, user_model)
+                     for signal in (models.signals.post_save,
+                                    models.signals.post_delete)]
+    _set_receivers('django.contrib.auth.cached_user', receivers)
+models.signals.class_prepared.connect(connect_cache_receivers)
+connect_cache_receivers()
+
+
+@receiver(setting_changed)
+def cache_settings_changed(**kwargs):
+    if kwargs['setting'] in ('AUTH_PERMISSION_CACHE_ALIAS',
+                             'AUTH_USER_CACHE_ALIAS', 'AUTH_USER_MODEL'):
+        connect_cache_receivers()
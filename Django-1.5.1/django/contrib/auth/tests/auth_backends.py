@@ -1,13 +1,20 @@
 from __future__ import unicode_literals
 from datetime import date
+import time
 
 from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth.models import User, Group, Permission, AnonymousUser
 from django.contrib.auth.tests.utils import skipIfCustomUser
 from django.contrib.auth.tests.custom_user import ExtensionUser, CustomPermissionsUser, CustomUser
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import get_cache
 from django.core.exceptions import ImproperlyConfigured
-from django.contrib.auth import authenticate
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.contrib.auth import (authenticate, get_backends, get_user,
+    invalidate_cached_user, load_backend, login, logout, _user_cache_key)
+from django.contrib.sessions.backends.cache import SessionStore as CacheSession
+from django.http import HttpRequest
 from django.test import TestCase
 from django.test.utils import override_settings
 
@@ -130,6 +137,86 @@ class ModelBackendTest(BaseModelBackendTest, TestCase):
         )
 
 
+@skipIfCustomUser
+@override_settings(AUTH_PERMISSION_CACHE_ALIAS='permissions', CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'permissions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'auth-permissions',
+    },
+})
+class SharedPermissionCacheModelBackendTest(ModelBackendTest):
+    """
+    Runs the ModelBackend tests with permissions shared between requests
+    through a cache.
+    """
+    def setUp(self):
+        get_cache('permissions').clear()
+        super(SharedPermissionCacheModelBackendTest, self).setUp()
+        content_type = ContentType.objects.get_for_model(Group)
+        self.perm = Permission.objects.create(name='shared', content_type=content_type, codename='shared')
+        self.group_perm = Permission.objects.create(name='shared_group', content_type=content_type, codename='shared_group')
+        self.group = Group.objects.create(name='shared_group')
+
+    def get_user(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_permissions_shared_between_requests(self):
+        self.user.user_permissions.add(self.perm)
+        user = self.get_user()
+        with self.assertNumQueries(1):
+            self.assertEqual(user.get_all_permissions(), set(['auth.shared']))
+        user = self.get_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(user.get_all_permissions(), set(['auth.shared']))
+
+    def test_user_changes_invalidate(self):
+        self.assertEqual(self.get_user().get_all_permissions(), set())
+        self.user.user_permissions.add(self.perm)
+        self.assertEqual(self.get_user().get_all_permissions(), set(['auth.shared']))
+        self.group.user_set.add(self.user)
+        self.group.permissions.add(self.group_perm)
+        self.assertEqual(self.get_user().get_all_permissions(),
+                         set(['auth.shared', 'auth.shared_group']))
+        self.group.user_set.clear()
+        self.assertEqual(self.get_user().get_all_permissions(), set(['auth.shared']))
+
+    def test_group_changes_invalidate(self):
+        self.user.groups.add(self.group)
+        self.assertEqual(self.get_user().get_group_permissions(), set())
+        self.group.permissions.add(self.group_perm)
+        self.assertEqual(self.get_user().get_group_permissions(), set(['auth.shared_group']))
+        self.group.delete()
+        self.assertEqual(self.get_user().get_group_permissions(), set())
+
+    def test_invalidation_during_computation(self):
+        """
+        Permissions computed before they were revoked aren't cached, even if
+        they are stored after the invalidation.
+        """
+        self.user.user_permissions.add(self.perm)
+        user = self.get_user()
+        backend = ModelBackend()
+        def compute():
+            perms = set(['auth.shared'])
+            self.user.user_permissions.remove(self.perm)
+            return perms
+        self.assertEqual(backend._get_cached_permissions(user, 'all', compute),
+                         set(['auth.shared']))
+        self.assertEqual(self.get_user().get_all_permissions(), set())
+
+    def test_receivers_only_when_enabled(self):
+        through = User.user_permissions.through
+        self.assertTrue(m2m_changed.has_listeners(through))
+        self.assertTrue(post_delete.has_listeners(Group))
+        self.assertFalse(m2m_changed.has_listeners(ContentType))
+        with self.settings(AUTH_PERMISSION_CACHE_ALIAS=None):
+            self.assertFalse(m2m_changed.has_listeners(through))
+            self.assertFalse(post_delete.has_listeners(Group))
+
+
 @override_settings(AUTH_USER_MODEL='auth.ExtensionUser')
 class ExtensionUserModelBackendTest(BaseModelBackendTest, TestCase):
     """
@@ -367,3 +454,83 @@ class InActiveUserBackendTest(TestCase):
     def test_has_module_perms(self):
         self.assertEqual(self.user1.has_module_perms("app1"), False)
         self.assertEqual(self.user1.has_module_perms("app2"), False)
+
+
+class LoadBackendTest(TestCase):
+
+    def test_backend_instances_reused(self):
+        backend = load_backend('django.contrib.auth.backends.ModelBackend')
+        self.assertIs(load_backend('django.contrib.auth.backends.ModelBackend'), backend)
+        with self.settings(AUTHENTICATION_BACKENDS=(
+                'django.contrib.auth.backends.ModelBackend',)):
+            self.assertEqual(get_backends(), [backend])
+
+
+@skipIfCustomUser
+@override_settings(AUTH_USER_CACHE_ALIAS='users', CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'users': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'auth-users',
+    },
+})
+class CachedUserTest(TestCase):
+    """
+    Tests for get_user() with AUTH_USER_CACHE_ALIAS.
+    """
+    def setUp(self):
+        get_cache('users').clear()
+        self.user = User.objects.create_user('test', 'test@example.com', 'test')
+        self.request = HttpRequest()
+        self.request.session = CacheSession()
+        self.request.user = self.user
+        self.user.backend = 'django.contrib.auth.backends.ModelBackend'
+        login(self.request, self.user)
+
+    def test_user_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(get_user(self.request), self.user)
+        with self.assertNumQueries(0):
+            user = get_user(self.request)
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.email, 'test@example.com')
+
+    def test_save_invalidates(self):
+        get_user(self.request)
+        self.user.email = 'changed@example.com'
+        self.user.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_user(self.request).email, 'changed@example.com')
+
+    def test_logout_invalidates(self):
+        get_user(self.request)
+        key = _user_cache_key(self.request.session.session_key, self.user.pk)
+        self.assertIsNotNone(get_cache('users').get(key))
+        logout(self.request)
+        self.assertIsNone(get_cache('users').get(key))
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=30)
+    def test_timeout(self):
+        get_user(self.request)
+        cache = get_cache('users')
+        key = cache.make_key(_user_cache_key(self.request.session.session_key, self.user.pk))
+        self.assertTrue(time.time() < cache._expire_info[key] <= time.time() + 30)
+
+    def test_update_needs_invalidation(self):
+        get_user(self.request)
+        # Bulk updates send no signals, so the cached user is stale until
+        # it expires or is invalidated explicitly.
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertTrue(get_user(self.request).is_active)
+        invalidate_cached_user(self.user.pk)
+        self.assertFalse(get_user(self.request).is_active)
+
+    def test_receivers_only_for_user_model(self):
+        self.assertTrue(post_save.has_listeners(User))
+        self.assertTrue(post_delete.has_listeners(User))
+        self.assertFalse(post_delete.has_listeners(ContentType))
+        with self.settings(AUTH_USER_CACHE_ALIAS=None):
+            self.assertFalse(post_save.has_listeners(User))
+            self.assertFalse(post_delete.has_listeners(User))
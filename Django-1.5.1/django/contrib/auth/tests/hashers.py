@@ -1,10 +1,14 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import threading
+
 from django.conf.global_settings import PASSWORD_HASHERS as default_hashers
 from django.contrib.auth.hashers import (is_password_usable,
     check_password, make_password, PBKDF2PasswordHasher, load_hashers,
-    PBKDF2SHA1PasswordHasher, get_hasher, identify_hasher, UNUSABLE_PASSWORD)
+    PBKDF2SHA1PasswordHasher, get_hasher, get_hashing_semaphore,
+    identify_hasher, UNUSABLE_PASSWORD)
+from django.test.utils import override_settings
 from django.utils import unittest
 from django.utils.unittest import skipUnless
 
@@ -162,3 +166,21 @@ class TestUtilsHashPass(unittest.TestCase):
                 state['upgraded'] = True
             self.assertFalse(check_password('WRONG', encoded, setter))
             self.assertFalse(state['upgraded'])
+
+    def test_unbounded_concurrency(self):
+        self.assertIsNone(get_hashing_semaphore())
+
+    @override_settings(PASSWORD_HASHING_CONCURRENCY=1)
+    def test_bounded_concurrency(self):
+        encoded = make_password('letmein', hasher='md5')
+        results = []
+        checker = threading.Thread(
+            target=lambda: results.append(check_password('letmein', encoded)))
+        semaphore = get_hashing_semaphore()
+        # While the only slot is taken, the check has to wait for it.
+        with semaphore:
+            checker.start()
+            checker.join(0.1)
+            self.assertEqual(results, [])
+        checker.join()
+        self.assertEqual(results, [True])
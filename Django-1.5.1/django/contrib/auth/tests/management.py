@@ -1,6 +1,7 @@
 from __future__ import unicode_literals
 from datetime import date
 
+from django.conf import global_settings
 from django.contrib.auth import models, management
 from django.contrib.auth.management import create_permissions
 from django.contrib.auth.management.commands import changepassword
@@ -82,6 +83,28 @@ class ChangepasswordManagementCommandTestCase(TestCase):
             command.execute("joe", stdout=self.stdout, stderr=self.stderr)
 
 
+@override_settings(PASSWORD_HASHERS=global_settings.PASSWORD_HASHERS)
+class RecommendIterationsManagementCommandTestCase(TestCase):
+
+    def test_recommendation(self):
+        out = StringIO()
+        call_command('recommenditerations', hasher='pbkdf2_sha256',
+                     target=50, samples=1, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], 'Hasher: pbkdf2_sha256')
+        self.assertTrue(lines[1].startswith('Current iterations: 10000 ('))
+        self.assertTrue(lines[2].startswith('Recommended iterations for 50 ms: '))
+        self.assertGreater(int(lines[2].rsplit(' ', 1)[1]), 0)
+
+    def test_hasher_without_iterations(self):
+        with self.assertRaisesRegexp(CommandError, "doesn't have an iteration count"):
+            call_command('recommenditerations', hasher='md5', stdout=StringIO())
+
+    def test_unknown_hasher(self):
+        with self.assertRaisesRegexp(CommandError, "Unknown password hashing algorithm"):
+            call_command('recommenditerations', hasher='rot13', stdout=StringIO())
+
+
 @skipIfCustomUser
 class CreatesuperuserManagementCommandTestCase(TestCase):
 
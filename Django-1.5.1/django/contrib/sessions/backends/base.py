@@ -1,11 +1,9 @@
 from __future__ import unicode_literals
 
 import base64
+import datetime as datetime_module
 from datetime import datetime, timedelta
-try:
-    from django.utils.six.moves import cPickle as pickle
-except ImportError:
-    import pickle
+from decimal import Decimal
 import string
 
 from django.conf import settings
@@ -13,13 +11,40 @@ from django.core.exceptions import SuspiciousOperation
 from django.utils.crypto import constant_time_compare
 from django.utils.crypto import get_random_string
 from django.utils.crypto import salted_hmac
+from django.utils import six
 from django.utils import timezone
-from django.utils.encoding import force_bytes
+from django.utils.encoding import force_bytes, force_text
+from django.utils.importlib import import_module
 
 # session_key should not be case sensitive because some backends can store it
 # on case insensitive file systems.
 VALID_KEY_CHARS = string.ascii_lowercase + string.digits
 
+# Length of the hex digest prefixed to encoded session data.
+HASH_LENGTH = 40
+
+# Session values of these types can't be changed in place, so a session
+# holding only such values is unchanged unless one of its keys was set.
+IMMUTABLE_TYPES = six.string_types + six.integer_types + (
+    six.binary_type, float, bool, type(None), Decimal, datetime_module.date,
+    datetime_module.time, timedelta)
+
+_serializers = {}
+
+
+def get_serializer_class(path):
+    """
+    Returns the serializer class at the given dotted path, importing it only
+    the first time it is asked for.
+    """
+    try:
+        return _serializers[path]
+    except KeyError:
+        module_path, class_name = path.rsplit('.', 1)
+        serializer = getattr(import_module(module_path), class_name)
+        _serializers[path] = serializer
+        return serializer
+
 class CreateError(Exception):
     """
     Used internally as a consistent exception type to catch from save (see the
@@ -38,6 +63,9 @@ class SessionBase(object):
         self._session_key = session_key
         self.accessed = False
         self.modified = False
+        self.serializer = get_serializer_class(settings.SESSION_SERIALIZER)
+        # The last (session dict, encoded data) pair returned by decode().
+        self._decoded = None
 
     def __contains__(self, key):
         return key in self._session
@@ -77,30 +105,66 @@ class SessionBase(object):
     def delete_test_cookie(self):
         del self[self.TEST_COOKIE_NAME]
 
-    def _hash(self, value):
+    def _hash(self, value, secret=None):
         key_salt = "django.contrib.sessions" + self.__class__.__name__
-        return salted_hmac(key_salt, value).hexdigest()
+        return salted_hmac(key_salt, value, secret).hexdigest()
 
     def encode(self, session_dict):
-        "Returns the given session dictionary pickled and encoded as a string."
-        pickled = pickle.dumps(session_dict, pickle.HIGHEST_PROTOCOL)
-        hash = self._hash(pickled)
-        return base64.b64encode(hash.encode() + b":" + pickled).decode('ascii')
+        "Returns the given session dictionary serialized and encoded as a string."
+        if self._is_unchanged(session_dict):
+            return self._decoded[1]
+        serialized = self.serializer().dumps(session_dict)
+        hash = self._hash(serialized)
+        try:
+            # Text-based serializers such as JSON can be stored as they are,
+            # without base64 encoding.
+            return hash + ':' + serialized.decode('ascii')
+        except UnicodeDecodeError:
+            return base64.b64encode(hash.encode() + b":" + serialized).decode('ascii')
 
     def decode(self, session_data):
-        encoded_data = base64.b64decode(force_bytes(session_data))
         try:
+            session_data = force_text(session_data)
+            # The base64 alphabet doesn't include ':', so a separator right
+            # after the hash means the data was stored without base64.
+            if session_data[HASH_LENGTH:HASH_LENGTH + 1] == ':':
+                encoded_data = session_data.encode('ascii')
+            else:
+                encoded_data = base64.b64decode(force_bytes(session_data))
             # could produce ValueError if there is no ':'
-            hash, pickled = encoded_data.split(b':', 1)
-            expected_hash = self._hash(pickled)
-            if not constant_time_compare(hash.decode(), expected_hash):
+            hash, serialized = encoded_data.split(b':', 1)
+            hash = hash.decode()
+            current = constant_time_compare(hash, self._hash(serialized))
+            if not current and not any(
+                    constant_time_compare(hash, self._hash(serialized, secret))
+                    for secret in settings.SECRET_KEY_FALLBACKS):
                 raise SuspiciousOperation("Session data corrupted")
             else:
-                return pickle.loads(pickled)
+                session_dict = self.serializer().loads(serialized)
         except Exception:
-            # ValueError, SuspiciousOperation, unpickling exceptions. If any of
-            # these happen, just return an empty dictionary (an empty session).
+            # ValueError, SuspiciousOperation, decoding and deserialization
+            # exceptions. If any of these happen, just return an empty
+            # dictionary (an empty session).
             return {}
+        if current:
+            # Data signed with an old key is always signed again on save.
+            self._decoded = (session_dict, session_data)
+        return session_dict
+
+    def _is_unchanged(self, session_dict):
+        """
+        Returns True if ``session_dict`` is the dictionary last returned by
+        decode() and can't have changed since, so that its stored encoding
+        can be reused instead of serializing and signing it again.
+        """
+        if self.modified or self._decoded is None:
+            return False
+        if session_dict is not self._decoded[0]:
+            return False
+        for value in session_dict.values():
+            if not isinstance(value, IMMUTABLE_TYPES):
+                return False
+        return True
 
     def update(self, dict_):
         self._session.update(dict_)
@@ -320,3 +384,18 @@ class SessionBase(object):
         a built-in expiration mechanism, it should be a no-op.
         """
         raise NotImplementedError
+
+    @classmethod
+    def clear_expired_batches(cls, batch_size):
+        """
+        Remove expired sessions from the session store, at most
+        ``batch_size`` at a time, and yield the number of sessions removed by
+        each batch.
+
+        Backends that can't work in batches remove everything with
+        clear_expired() and yield nothing. Since only expired sessions are
+        ever removed, stopping part way is safe; the next run picks up the
+        remaining ones.
+        """
+        cls.clear_expired()
+        return iter(())
@@ -2,13 +2,194 @@
 Cached, database-backed sessions.
 """
 
+import atexit
+import logging
+import threading
+
+from django.conf import settings
 from django.contrib.sessions.backends.db import SessionStore as DBStore
 from django.core.cache import cache
 from django.core.exceptions import SuspiciousOperation
+from django.db import connections, router, transaction
 from django.utils import timezone
 
 KEY_PREFIX = "django.contrib.sessions.cached_db"
 
+logger = logging.getLogger('django.contrib.sessions')
+
+
+class SessionWriter(object):
+    """
+    Writes sessions to the database in batches from a background thread.
+
+    Pending writes are keyed by session key, so saving the same session
+    several times between two flushes results in a single database write.
+    Deletions are queued the same way, as ``(None, None)``, so that they
+    override writes queued earlier. Once ``max_size`` distinct sessions are
+    pending, the thread that adds the next one flushes the whole batch itself
+    instead of letting the queue grow.
+    """
+    # Number of session keys looked up per query, kept below the number of
+    # query parameters some databases accept.
+    batch_size = 500
+    # Number of times a session is tried in a failing batch before it is
+    # given up on.
+    max_attempts = 3
+
+    def __init__(self, interval, max_size):
+        self.interval = interval
+        self.max_size = max_size
+        self._pending = {}
+        # The batch being written, still visible to get() until committed.
+        self._writing = {}
+        # Failed attempts of the sessions requeued after an error.
+        self._failures = {}
+        self._lock = threading.Lock()
+        # Only one batch is written at a time, so that an older one can't
+        # overwrite a newer one.
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the background thread and writes out anything still pending.
+        """
+        self._stopped = True
+        self._wakeup.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.interval)
+            if self._stopped:
+                return
+            self.flush(close_connection=True)
+
+    def enqueue(self, session_key, session_data, expire_date):
+        with self._lock:
+            self._pending[session_key] = (session_data, expire_date)
+            full = len(self._pending) >= self.max_size
+        if full:
+            self.flush()
+
+    def enqueue_delete(self, session_key):
+        self.enqueue(session_key, None, None)
+
+    def get(self, session_key):
+        """
+        Returns the pending ``(session_data, expire_date)`` pair for the
+        given key, ``(None, None)`` if its deletion is pending, or None if it
+        has no unwritten changes.
+        """
+        with self._lock:
+            pending = self._pending.get(session_key)
+            if pending is None:
+                pending = self._writing.get(session_key)
+            return pending
+
+    def discard(self, session_key):
+        with self._lock:
+            self._pending.pop(session_key, None)
+
+    def flush(self, close_connection=False):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._writing = batch
+            if not batch:
+                return
+            using = router.db_for_write(Session)
+            try:
+                self._write(batch, using)
+            except Exception:
+                self._requeue(batch)
+            else:
+                with self._lock:
+                    for key in batch:
+                        self._failures.pop(key, None)
+            finally:
+                with self._lock:
+                    self._writing = {}
+                if close_connection:
+                    connections[using].close()
+
+    def _requeue(self, batch):
+        """
+        Puts the sessions of a batch that failed to be written back in the
+        queue, unless they changed in the meantime or failed too often.
+        """
+        dropped = 0
+        with self._lock:
+            for key, value in batch.items():
+                if key in self._pending:
+                    self._failures.pop(key, None)
+                    continue
+                failures = self._failures.get(key, 0) + 1
+                if failures >= self.max_attempts:
+                    self._failures.pop(key, None)
+                    dropped += 1
+                else:
+                    self._failures[key] = failures
+                    self._pending[key] = value
+        if dropped:
+            logger.exception("Failed to write %d pending sessions to the "
+                             "database; giving up on %d of them.",
+                             len(batch), dropped)
+        else:
+            logger.exception("Failed to write %d pending sessions to the "
+                             "database; they will be retried.", len(batch))
+
+    def _write(self, batch, using):
+        sessions = Session.objects.using(using)
+        deleted = [key for key, (session_data, expire_date) in batch.items()
+                   if session_data is None]
+        keys = [key for key, (session_data, expire_date) in batch.items()
+                if session_data is not None]
+        with transaction.commit_on_success(using=using):
+            for i in range(0, len(deleted), self.batch_size):
+                sessions.filter(
+                    session_key__in=deleted[i:i + self.batch_size]).delete()
+            existing = set()
+            for i in range(0, len(keys), self.batch_size):
+                existing.update(sessions.filter(
+                    session_key__in=keys[i:i + self.batch_size],
+                ).values_list('session_key', flat=True))
+            new = []
+            for key in keys:
+                session_data, expire_date = batch[key]
+                if key in existing:
+                    sessions.filter(session_key=key).update(
+                        session_data=session_data, expire_date=expire_date)
+                else:
+                    new.append(Session(session_key=key,
+                        session_data=session_data, expire_date=expire_date))
+            sessions.bulk_create(new)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """
+    Returns the process-wide SessionWriter, starting it on first use.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = SessionWriter(settings.SESSION_WRITE_BEHIND_INTERVAL,
+                                    settings.SESSION_WRITE_BEHIND_QUEUE_SIZE)
+            _writer.start()
+            atexit.register(_writer.stop)
+        return _writer
+
 
 class SessionStore(DBStore):
     """
@@ -30,6 +211,20 @@ class SessionStore(DBStore):
             # cache keys. If this happens, reset the session. See #17810.
             data = None
 
+        if data is None and settings.SESSION_WRITE_BEHIND:
+            pending = get_writer().get(self.session_key)
+            if pending is not None:
+                session_data, expire_date = pending
+                if session_data is not None and expire_date > timezone.now():
+                    data = self.decode(session_data)
+                    cache.set(self.cache_key, data,
+                        self.get_expiry_age(expiry=expire_date))
+                else:
+                    # Deleted or expired, whatever the database says until
+                    # the change is written.
+                    self.create()
+                    data = {}
+
         if data is None:
             # Duplicate DBStore.load, because we need to keep track
             # of the expiry date to set it properly in the cache.
@@ -49,18 +244,35 @@ class SessionStore(DBStore):
     def exists(self, session_key):
         if (KEY_PREFIX + session_key) in cache:
             return True
+        if settings.SESSION_WRITE_BEHIND:
+            pending = get_writer().get(session_key)
+            if pending is not None:
+                return pending[0] is not None
         return super(SessionStore, self).exists(session_key)
 
     def save(self, must_create=False):
-        super(SessionStore, self).save(must_create)
+        if must_create or not settings.SESSION_WRITE_BEHIND:
+            super(SessionStore, self).save(must_create)
+            if settings.SESSION_WRITE_BEHIND:
+                # Don't let an older queued write or deletion undo this one.
+                get_writer().discard(self._get_or_create_session_key())
+        else:
+            # Creation stays synchronous so that key collisions are still
+            # detected; later saves only reach the database on the next flush.
+            get_writer().enqueue(self._get_or_create_session_key(),
+                self.encode(self._get_session()), self.get_expiry_date())
         cache.set(self.cache_key, self._session, self.get_expiry_age())
 
     def delete(self, session_key=None):
-        super(SessionStore, self).delete(session_key)
         if session_key is None:
             if self.session_key is None:
                 return
             session_key = self.session_key
+        if settings.SESSION_WRITE_BEHIND:
+            # The deletion is queued as well, so that it is repeated after
+            # a batch being written now, which may still contain the session.
+            get_writer().enqueue_delete(session_key)
+        super(SessionStore, self).delete(session_key)
         cache.delete(KEY_PREFIX + session_key)
 
     def flush(self):
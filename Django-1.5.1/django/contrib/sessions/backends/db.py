@@ -1,6 +1,7 @@
 from django.contrib.sessions.backends.base import SessionBase, CreateError
 from django.core.exceptions import SuspiciousOperation
 from django.db import IntegrityError, transaction, router
+from django.db.models.sql.subqueries import DeleteQuery
 from django.utils import timezone
 
 
@@ -76,6 +77,22 @@ class SessionStore(SessionBase):
         Session.objects.filter(expire_date__lt=timezone.now()).delete()
         transaction.commit_unless_managed()
 
+    @classmethod
+    def clear_expired_batches(cls, batch_size):
+        # Walk the expire_date index from the oldest session and delete by
+        # primary key, so each batch only locks the rows it removes.
+        now = timezone.now()
+        using = router.db_for_write(Session)
+        expired = Session.objects.using(using).filter(
+            expire_date__lt=now).order_by('expire_date')
+        while True:
+            keys = list(expired.values_list('session_key', flat=True)[:batch_size])
+            if not keys:
+                return
+            DeleteQuery(Session).delete_batch(keys, using)
+            transaction.commit_unless_managed(using=using)
+            yield len(keys)
+
 
 # At bottom to avoid circular import
 from django.contrib.sessions.models import Session
@@ -174,16 +174,34 @@ class SessionStore(SessionBase):
 
     @classmethod
     def clear_expired(cls):
+        for removed in cls.clear_expired_batches(100):
+            pass
+
+    @classmethod
+    def clear_expired_batches(cls, batch_size):
         storage_path = cls._get_storage_path()
         file_prefix = settings.SESSION_COOKIE_NAME
+        valid_chars = set(VALID_KEY_CHARS)
 
+        removed = checked = 0
         for session_file in os.listdir(storage_path):
             if not session_file.startswith(file_prefix):
                 continue
             session_key = session_file[len(file_prefix):]
+            # Skip the temporary files save() writes before renaming them.
+            if not set(session_key).issubset(valid_chars):
+                continue
             session = cls(session_key)
             # When an expired session is loaded, its file is removed, and a
             # new file is immediately created. Prevent this by disabling
             # the create() method.
             session.create = lambda: None
             session.load()
+            if not session.exists(session_key):
+                removed += 1
+            checked += 1
+            if checked == batch_size:
+                yield removed
+                removed = checked = 0
+        if checked:
+            yield removed
@@ -1,15 +1,45 @@
+import time
+from optparse import make_option
+
 from django.conf import settings
 from django.core.management.base import NoArgsCommand
 from django.utils.importlib import import_module
 
 
 class Command(NoArgsCommand):
-    help = "Can be run as a cronjob or directly to clean out expired sessions (only with the database backend at the moment)."
+    help = "Can be run as a cronjob or directly to clean out expired sessions."
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--batch-size', action='store', dest='batch_size',
+            type='int', default=1000,
+            help='Number of expired sessions to remove at a time.'),
+        make_option('--sleep', action='store', dest='sleep',
+            type='float', default=0,
+            help='Number of seconds to wait between two batches.'),
+    )
 
     def handle_noargs(self, **options):
+        batch_size = options.get('batch_size', 1000)
+        sleep = options.get('sleep', 0)
+        verbosity = int(options.get('verbosity', 1))
+
         engine = import_module(settings.SESSION_ENGINE)
+        start = time.time()
+        total = 0
         try:
-            engine.SessionStore.clear_expired()
+            for removed in engine.SessionStore.clear_expired_batches(batch_size):
+                total += removed
+                if verbosity >= 2:
+                    self.stdout.write("Removed %d expired sessions (%d so far)."
+                                      % (removed, total))
+                if sleep:
+                    time.sleep(sleep)
         except NotImplementedError:
             self.stderr.write("Session engine '%s' doesn't support clearing "
                               "expired sessions.\n" % settings.SESSION_ENGINE)
+            return
+        if verbosity >= 2:
+            elapsed = time.time() - start
+            self.stdout.write("Removed %d expired sessions in %.2f seconds "
+                              "(%.1f sessions/second)." % (
+                              total, elapsed, total / elapsed if elapsed else total))
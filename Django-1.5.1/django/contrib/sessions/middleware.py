@@ -6,10 +6,24 @@ from django.utils.http import cookie_date
 from django.utils.importlib import import_module
 
 class SessionMiddleware(object):
+    # The (SESSION_ENGINE, SessionStore class) pair last looked up.
+    _engine = (None, None)
+
+    def get_session_store_class(self):
+        """
+        Returns the SessionStore class of SESSION_ENGINE, looking it up again
+        only when the setting changes.
+        """
+        engine, store_class = self._engine
+        if engine != settings.SESSION_ENGINE:
+            engine = settings.SESSION_ENGINE
+            store_class = import_module(engine).SessionStore
+            self._engine = (engine, store_class)
+        return store_class
+
     def process_request(self, request):
-        engine = import_module(settings.SESSION_ENGINE)
         session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME, None)
-        request.session = engine.SessionStore(session_key)
+        request.session = self.get_session_store_class()(session_key)
 
     def process_response(self, request, response):
         """
@@ -0,0 +1,34 @@
+"""
+Serializers for session data.
+
+The serializer used by the session backends is selected with the
+SESSION_SERIALIZER setting. A serializer is a class with a ``dumps(obj)``
+method returning a bytestring and a ``loads(data)`` method accepting one.
+"""
+try:
+    from django.utils.six.moves import cPickle as pickle
+except ImportError:
+    import pickle
+
+from django.core.signing import JSONSerializer as BaseJSONSerializer
+
+
+class PickleSerializer(object):
+    """
+    Simple wrapper around pickle to be used in signing.dumps and
+    signing.loads.
+    """
+    def dumps(self, obj):
+        return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data):
+        return pickle.loads(data)
+
+
+class JSONSerializer(BaseJSONSerializer):
+    """
+    Serializes sessions as compact JSON. Smaller and faster than pickle for
+    the usual session contents, and stored without base64 encoding, but
+    limited to plain data (dicts, lists, strings, numbers and booleans).
+    """
+    pass
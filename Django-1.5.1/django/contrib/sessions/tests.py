@@ -8,14 +8,17 @@ import warnings
 from django.conf import settings
 from django.contrib.sessions.backends.db import SessionStore as DatabaseSession
 from django.contrib.sessions.backends.cache import SessionStore as CacheSession
+from django.contrib.sessions.backends import cached_db
 from django.contrib.sessions.backends.cached_db import SessionStore as CacheDBSession
 from django.contrib.sessions.backends.file import SessionStore as FileSession
 from django.contrib.sessions.backends.signed_cookies import SessionStore as CookieSession
 from django.contrib.sessions.models import Session
 from django.contrib.sessions.middleware import SessionMiddleware
+from django.contrib.sessions.serializers import PickleSerializer
 from django.core.cache import get_cache
 from django.core import management
 from django.core.exceptions import ImproperlyConfigured, SuspiciousOperation
+from django.db import DatabaseError
 from django.http import HttpResponse
 from django.test import TestCase, RequestFactory
 from django.test.utils import override_settings
@@ -24,6 +27,14 @@ from django.utils import timezone
 from django.utils import unittest
 
 
+class CountingSerializer(PickleSerializer):
+    dumps_calls = 0
+
+    def dumps(self, obj):
+        CountingSerializer.dumps_calls += 1
+        return super(CountingSerializer, self).dumps(obj)
+
+
 class SessionTestsMixin(object):
     # This does not inherit from TestCase to avoid any tests being run with this
     # class, which wouldn't work, and to allow different TestCase subclasses to
@@ -272,6 +283,16 @@ class SessionTestsMixin(object):
         encoded = self.session.encode(data)
         self.assertEqual(self.session.decode(encoded), data)
 
+    def test_decode_with_fallback_secret_key(self):
+        data = {'a test key': 'a test value'}
+        with override_settings(SECRET_KEY='old-secret'):
+            encoded = self.backend().encode(data)
+        with override_settings(SECRET_KEY='new-secret',
+                               SECRET_KEY_FALLBACKS=['old-secret']):
+            self.assertEqual(self.backend().decode(encoded), data)
+        with override_settings(SECRET_KEY='new-secret'):
+            self.assertEqual(self.backend().decode(encoded), {})
+
     def test_actual_expiry(self):
         # Regression test for #19200
         old_session_key = None
@@ -345,6 +366,66 @@ class DatabaseSessionTests(SessionTestsMixin, TestCase):
         # ... and one is deleted.
         self.assertEqual(1, Session.objects.count())
 
+    def test_clear_expired_batches(self):
+        for expiry in (-3600, -7200, -10800, 3600):
+            session = self.backend()
+            session.set_expiry(expiry)
+            session.save()
+        self.assertEqual(list(self.backend.clear_expired_batches(2)), [2, 1])
+        self.assertEqual(1, Session.objects.count())
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.db")
+    def test_clearsessions_command_reports_progress(self):
+        for expiry in (-3600, -7200, 3600):
+            session = self.backend()
+            session.set_expiry(expiry)
+            session.save()
+        out = six.StringIO()
+        management.call_command('clearsessions', batch_size=1, verbosity=2,
+                                stdout=out)
+        self.assertEqual(1, Session.objects.count())
+        output = out.getvalue()
+        self.assertIn("Removed 1 expired sessions (2 so far).", output)
+        self.assertIn("Removed 2 expired sessions in", output)
+
+    @override_settings(
+        SESSION_SERIALIZER='django.contrib.sessions.serializers.JSONSerializer')
+    def test_json_serializer(self):
+        session = self.backend()
+        data = {'a test key': 'a test value', 'count': 1}
+        encoded = session.encode(data)
+        # JSON data is stored without base64 encoding.
+        self.assertIn('"a test key":"a test value"', encoded)
+        self.assertEqual(session.decode(encoded), data)
+
+    def test_decode_pickled_with_json_serializer(self):
+        encoded = self.session.encode({'a': 1})
+        with self.settings(SESSION_SERIALIZER=
+                'django.contrib.sessions.serializers.JSONSerializer'):
+            self.assertEqual(self.backend().decode(encoded), {})
+
+    @override_settings(
+        SESSION_SERIALIZER='django.contrib.sessions.tests.CountingSerializer')
+    def test_unchanged_session_not_reserialized(self):
+        session = self.backend()
+        session['user'] = 42
+        session.save()
+        session = self.backend(session.session_key)
+        self.assertEqual(session['user'], 42)
+        CountingSerializer.dumps_calls = 0
+        session.save()
+        self.assertEqual(CountingSerializer.dumps_calls, 0)
+
+        # A mutable value may have changed in place, so it is serialized.
+        session['items'] = []
+        session.save()
+        session = self.backend(session.session_key)
+        session['items'].append(1)
+        CountingSerializer.dumps_calls = 0
+        session.save()
+        self.assertEqual(CountingSerializer.dumps_calls, 1)
+        self.assertEqual(self.backend(session.session_key)['items'], [1])
+
 
 @override_settings(USE_TZ=True)
 class DatabaseSessionWithTimeZoneTests(DatabaseSessionTests):
@@ -376,6 +457,141 @@ class CacheDBSessionWithTimeZoneTests(CacheDBSessionTests):
     pass
 
 
+@override_settings(SESSION_WRITE_BEHIND=True,
+                   SESSION_WRITE_BEHIND_INTERVAL=3600,
+                   SESSION_WRITE_BEHIND_QUEUE_SIZE=3)
+class CacheDBWriteBehindSessionTests(CacheDBSessionTests):
+
+    def setUp(self):
+        cached_db._writer = None
+        super(CacheDBWriteBehindSessionTests, self).setUp()
+
+    def tearDown(self):
+        super(CacheDBWriteBehindSessionTests, self).tearDown()
+        if cached_db._writer is not None:
+            cached_db._writer.stop()
+            cached_db._writer = None
+
+    def test_save_is_deferred(self):
+        self.session['x'] = 1
+        self.session.create()
+        self.session['x'] = 2
+        self.session.save()
+        self.session['x'] = 3
+        self.session.save()
+        row = Session.objects.get(session_key=self.session.session_key)
+        self.assertEqual(row.get_decoded(), {'x': 1})
+        with self.assertNumQueries(2):
+            # One lookup for existing rows and a single update.
+            cached_db.get_writer().flush()
+        row = Session.objects.get(session_key=self.session.session_key)
+        self.assertEqual(row.get_decoded(), {'x': 3})
+
+    def test_load_pending_after_cache_eviction(self):
+        self.session.create()
+        self.session['x'] = 'pending'
+        self.session.save()
+        get_cache('default').clear()
+        session = self.backend(self.session.session_key)
+        self.assertEqual(session['x'], 'pending')
+        self.assertTrue(session.exists(self.session.session_key))
+
+    def test_delete_discards_pending(self):
+        self.session.create()
+        self.session['x'] = 1
+        self.session.save()
+        self.session.delete()
+        cached_db.get_writer().flush()
+        self.assertFalse(Session.objects.filter(
+            session_key=self.session.session_key).exists())
+
+    def test_delete_during_flush(self):
+        """
+        A session deleted while a batch holding it is written stays deleted,
+        even though the batch writes it again.
+        """
+        self.session.create()
+        self.session['x'] = 1
+        self.session.save()
+        writer = cached_db.get_writer()
+        write = writer._write
+        def delete_then_write(batch, using):
+            self.session.delete()
+            write(batch, using)
+        writer._write = delete_then_write
+        try:
+            writer.flush()
+        finally:
+            writer._write = write
+        session_key = self.session.session_key
+        self.assertFalse(self.backend().exists(session_key))
+        self.assertEqual(self.backend(session_key).load(), {})
+        writer.flush()
+        self.assertFalse(Session.objects.filter(session_key=session_key).exists())
+
+    def test_load_during_flush(self):
+        # Sessions being written are read from the batch, not the database.
+        self.session.create()
+        self.session['x'] = 'pending'
+        self.session.save()
+        writer = cached_db.get_writer()
+        write = writer._write
+        loaded = []
+        def load_then_write(batch, using):
+            get_cache('default').clear()
+            loaded.append(self.backend(self.session.session_key).load())
+            write(batch, using)
+        writer._write = load_then_write
+        try:
+            writer.flush()
+        finally:
+            writer._write = write
+        self.assertEqual(loaded, [{'x': 'pending'}])
+
+    def test_failed_flush_is_retried(self):
+        self.session.create()
+        self.session['x'] = 1
+        self.session.save()
+        writer = cached_db.get_writer()
+        write = writer._write
+        def fail(batch, using):
+            raise DatabaseError("unavailable")
+        writer._write = fail
+        cached_db.logger.disabled = True
+        try:
+            writer.flush()
+            self.assertEqual(writer.get(self.session.session_key)[0],
+                             self.session.encode({'x': 1}))
+            writer.flush()
+            writer._write = write
+            writer.flush()
+            self.assertEqual(Session.objects.get(
+                session_key=self.session.session_key).get_decoded(), {'x': 1})
+            # Sessions are given up on after max_attempts failures.
+            self.session['x'] = 2
+            self.session.save()
+            writer._write = fail
+            for i in range(writer.max_attempts):
+                writer.flush()
+            self.assertIsNone(writer.get(self.session.session_key))
+        finally:
+            writer._write = write
+            cached_db.logger.disabled = False
+
+    def test_full_queue_flushes(self):
+        sessions = []
+        for i in range(3):
+            session = self.backend()
+            session.create()
+            session['x'] = i
+            session.save()
+            sessions.append(session)
+        for session in sessions:
+            row = Session.objects.get(session_key=session.session_key)
+            self.assertEqual(row.get_decoded(), {'x': sessions.index(session)})
+        self.assertIsNone(cached_db.get_writer().get(sessions[0].session_key))
+
+
 # Don't need DB flushing for these tests, so can use unittest.TestCase as base class
 class FileSessionTests(SessionTestsMixin, unittest.TestCase):
 
@@ -443,6 +659,16 @@ class FileSessionTests(SessionTestsMixin, unittest.TestCase):
         # ... and one is deleted.
         self.assertEqual(1, count_sessions())
 
+    def test_clear_expired_batches(self):
+        for expiry in (-3600, -7200, 3600):
+            session = self.backend()
+            session['foo'] = 'bar'
+            session.set_expiry(expiry)
+            session.save()
+        # Each batch reports how many of the files it checked were expired.
+        self.assertEqual(sum(self.backend.clear_expired_batches(2)), 2)
+        self.assertEqual(len(list(self.backend.clear_expired_batches(2))), 1)
+
 
 class CacheSessionTests(SessionTestsMixin, unittest.TestCase):
 
@@ -475,6 +701,16 @@ class CacheSessionTests(SessionTestsMixin, unittest.TestCase):
 
 class SessionMiddlewareTests(unittest.TestCase):
 
+    def test_session_store_class_follows_engine(self):
+        middleware = SessionMiddleware()
+        request = RequestFactory().get('/')
+        with override_settings(SESSION_ENGINE='django.contrib.sessions.backends.file'):
+            middleware.process_request(request)
+            self.assertIsInstance(request.session, FileSession)
+        with override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cache'):
+            middleware.process_request(request)
+            self.assertIsInstance(request.session, CacheSession)
+
     @override_settings(SESSION_COOKIE_SECURE=True)
     def test_secure_session_cookie(self):
         request = RequestFactory().get('/')
@@ -0,0 +1,10 @@
+from django.core.handlers.asgi import ASGIHandler
+
+
+def get_asgi_application(executor=None):
+    """
+    Returns an ASGI application for asyncio-based servers, the counterpart of
+    get_wsgi_application(). The middleware and views run in ``executor``, a
+    concurrent.futures executor, or in the event loop's default executor.
+    """
+    return ASGIHandler(executor)
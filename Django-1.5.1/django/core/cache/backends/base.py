@@ -4,6 +4,7 @@ from __future__ import unicode_literals
 import warnings
 
 from django.core.exceptions import ImproperlyConfigured, DjangoRuntimeWarning
+from django.utils import six
 from django.utils.importlib import import_module
 
 class InvalidCacheBackendError(ImproperlyConfigured):
@@ -42,6 +43,32 @@ def get_key_func(key_func):
             return getattr(key_func_module, key_func_name)          函数的名字
     return default_key_func
 
+def _load_class(cls):
+    if isinstance(cls, six.string_types):
+        module_path, cls_name = cls.rsplit('.', 1)
+        return getattr(import_module(module_path), cls_name)
+    return cls
+
+def get_serializer(serializer):
+    """
+    Function to decide which value serializer to use.
+
+    Defaults to ``django.core.cache.serializers.PickleSerializer``.
+    """
+    if serializer is None:
+        serializer = 'django.core.cache.serializers.PickleSerializer'
+    return _load_class(serializer)()
+
+def get_compressor(compressor, options=None):
+    """
+    Function to decide which value compressor to use, if any.
+
+    Returns None when no compressor is configured.
+    """
+    if compressor is None:
+        return None
+    return _load_class(compressor)(**(options or {}))
+
 class BaseCache(object):
     def __init__(self, params):
         timeout = params.get('timeout', params.get('TIMEOUT', 300)) 超时时间
@@ -74,6 +101,9 @@ class BaseCache(object):
         self.key_prefix = params.get('KEY_PREFIX', '')
         self.version = params.get('VERSION', 1)
         self.key_func = get_key_func(params.get('KEY_FUNCTION', None))
+        self._serializer = get_serializer(params.get('SERIALIZER', None))
+        self._compressor = get_compressor(params.get('COMPRESSOR', None),
+                                          params.get('COMPRESSOR_OPTIONS', None))
 
     def make_key(self, key, version=None):
         key 生成器
@@ -90,6 +120,24 @@ class BaseCache(object):
         new_key = self.key_func(key, self.key_prefix, version)
         return new_key
 
+    def _serialize(self, value):
+        """
+        Turns a value into the bytestring stored by the backend, using the
+        configured serializer and compressor.
+        """
+        data = self._serializer.dumps(value)
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        return data
+
+    def _deserialize(self, data):
+        """
+        Reverse of _serialize().
+        """
+        if self._compressor is not None:
+            data = self._compressor.decompress(data)
+        return self._serializer.loads(data)
+
     def add(self, key, value, timeout=None, version=None):
         """
         在某个 key 中存储 value
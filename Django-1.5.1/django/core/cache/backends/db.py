@@ -5,11 +5,6 @@ import base64
 import time
 from datetime import datetime
 
-try:
-    from django.utils.six.moves import cPickle as pickle
-except ImportError:
-    import pickle
-
 from django.conf import settings
 from django.core.cache.backends.base import BaseCache
 from django.db import connections, router, transaction, DatabaseError
@@ -88,7 +83,7 @@ class DatabaseCache(BaseDatabaseCache):
             return default
 
         value = connections[db].ops.process_clob(row[1])
-        return pickle.loads(base64.b64decode(force_bytes(value))) base64 编码
+        return self._deserialize(base64.b64decode(force_bytes(value))) base64 编码
 
     def set(self, key, value, timeout=None, version=None):
         key = self.make_key(key, version=version)
@@ -127,8 +122,7 @@ class DatabaseCache(BaseDatabaseCache):
         if num > self._max_entries:
             self._cull(db, cursor, now)
 
-        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
-        b64encoded = base64.b64encode(pickled)
+        b64encoded = base64.b64encode(self._serialize(value))
         # The DB column is expecting a string, so make sure the value is a
         # string, not bytes. Refs #19274.
         if six.PY3:
@@ -5,6 +5,7 @@ import hashlib
 import os
 import shutil 删除所有文件
 import time
+import zlib
 try:
     from django.utils.six.moves import cPickle as pickle
 except ImportError:
@@ -41,7 +42,12 @@ class FileBasedCache(BaseCache):
                     self._delete(fname)
 
                 else:
-                    return pickle.load(f)
+                    try:
+                        return self._deserialize(f.read())
+                    except (EOFError, pickle.PickleError, zlib.error, ValueError):
+                        # Written with another serializer or compressor,
+                        # or truncated: treat it as a miss.
+                        self._delete(fname)
 
         except (IOError, OSError, EOFError, pickle.PickleError):
             pass
@@ -66,7 +72,7 @@ class FileBasedCache(BaseCache):
             with open(fname, 'wb') as f:
                 now = time.time()
                 pickle.dump(now + timeout, f, pickle.HIGHEST_PROTOCOL)
-                pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+                f.write(self._serialize(value))
         except (IOError, OSError):
             pass
 
@@ -0,0 +1,250 @@
+"""
+Instrumentation wrapper for cache backends.
+
+Point an alias at another one to record per-operation latency, hit ratios
+per key prefix, value sizes and errors for every call made through it::
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.instrumented.InstrumentedCache',
+            'LOCATION': 'memcached',
+        },
+        'memcached': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': '127.0.0.1:11211',
+        },
+    }
+
+Statistics are aggregated in-process (see get_cache_stats()), and each call
+is also reported through the django.core.signals.cache_operation signal when
+it has receivers.
+"""
+import random
+import threading
+import time
+try:
+    from django.utils.six.moves import cPickle as pickle
+except ImportError:
+    import pickle
+
+from django.core.cache.backends.base import BaseCache
+from django.core.signals import cache_operation
+from django.utils import six
+
+# Keys are grouped on the part before the first separator; past this many
+# distinct groups further keys are counted under OTHER_GROUP.
+MAX_KEY_GROUPS = 1000
+OTHER_GROUP = '<other>'
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+# Lets get() tell a miss from a cached value equal to the caller's default.
+_MISSING = object()
+
+
+class CacheStats(object):
+    """
+    Thread-safe counters for the calls made through InstrumentedCache.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # operation -> [calls, errors, total time, max time]
+            self._operations = {}
+            # key group -> [hits, misses]
+            self._groups = {}
+            # [sampled values, total bytes, max bytes]
+            self._sizes = [0, 0, 0]
+
+    def record(self, operation, duration, error=False):
+        with self._lock:
+            counters = self._operations.get(operation)
+            if counters is None:
+                counters = self._operations[operation] = [0, 0, 0.0, 0.0]
+            counters[0] += 1
+            if error:
+                counters[1] += 1
+            counters[2] += duration
+            if duration > counters[3]:
+                counters[3] = duration
+
+    def record_lookup(self, group, hit):
+        with self._lock:
+            counters = self._groups.get(group)
+            if counters is None:
+                if len(self._groups) >= MAX_KEY_GROUPS:
+                    group = OTHER_GROUP
+                counters = self._groups.setdefault(group, [0, 0])
+            counters[0 if hit else 1] += 1
+
+    def record_size(self, size):
+        with self._lock:
+            self._sizes[0] += 1
+            self._sizes[1] += size
+            if size > self._sizes[2]:
+                self._sizes[2] = size
+
+    def snapshot(self, reset=False):
+        """
+        Returns the statistics gathered so far as a dictionary, and clears
+        them if ``reset`` is True.
+        """
+        with self._lock:
+            operations = dict(
+                (operation, {
+                    'calls': calls,
+                    'errors': errors,
+                    'total_time': total,
+                    'mean_time': total / calls,
+                    'max_time': longest,
+                }) for operation, (calls, errors, total, longest)
+                in self._operations.items())
+            keys = dict(
+                (group, {
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_ratio': float(hits) / (hits + misses),
+                }) for group, (hits, misses) in self._groups.items())
+            count, total, largest = self._sizes
+            sizes = {
+                'sampled': count,
+                'mean': float(total) / count if count else 0,
+                'max': largest,
+            }
+        if reset:
+            self.reset()
+        return {'operations': operations, 'keys': keys, 'sizes': sizes}
+
+
+def get_cache_stats(reset=False):
+    """
+    Returns the statistics of every instrumented cache, keyed by the alias of
+    the cache it wraps.
+    """
+    return dict((name, stats.snapshot(reset=reset))
+                for name, stats in list(_stats.items()))
+
+
+class InstrumentedCache(BaseCache):
+    def __init__(self, name, params):
+        from django.core.cache import get_cache
+        BaseCache.__init__(self, params)
+        options = params.get('OPTIONS', {})
+        self._alias = name
+        self._cache = get_cache(name)
+        self._separator = options.get('KEY_GROUP_SEPARATOR', ':')
+        # Measuring a value's size means pickling it once more, so only a
+        # fraction of the writes are measured.
+        self._size_sample_rate = float(options.get('SIZE_SAMPLE_RATE', 0.01))
+        with _stats_lock:
+            self.stats = _stats.setdefault(name, CacheStats())
+
+    def _key_group(self, key):
+        return key.split(self._separator, 1)[0]
+
+    def _record(self, operation, start, key=None, hit=None, error=False):
+        duration = time.time() - start
+        self.stats.record(operation, duration, error)
+        if hit is not None:
+            self.stats.record_lookup(self._key_group(key), hit)
+        if cache_operation.receivers:
+            cache_operation.send(sender=self.__class__, alias=self._alias,
+                operation=operation, key=key, hit=hit, duration=duration,
+                error=error)
+
+    def _record_size(self, value):
+        if self._size_sample_rate and random.random() < self._size_sample_rate:
+            if isinstance(value, six.binary_type):
+                size = len(value)
+            else:
+                try:
+                    size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+                except (pickle.PickleError, TypeError):
+                    return
+            self.stats.record_size(size)
+
+    def _call(self, operation, key, method, *args, **kwargs):
+        start = time.time()
+        try:
+            result = method(*args, **kwargs)
+        except Exception:
+            self._record(operation, start, key, error=True)
+            raise
+        self._record(operation, start, key)
+        return result
+
+    def make_key(self, key, version=None):
+        return self._cache.make_key(key, version=version)
+
+    def validate_key(self, key):
+        self._cache.validate_key(key)
+
+    def add(self, key, value, timeout=None, version=None):
+        self._record_size(value)
+        return self._call('add', key, self._cache.add, key, value,
+                          timeout=timeout, version=version)
+
+    def get(self, key, default=None, version=None):
+        start = time.time()
+        try:
+            value = self._cache.get(key, _MISSING, version=version)
+        except Exception:
+            self._record('get', start, key, error=True)
+            raise
+        hit = value is not _MISSING
+        self._record('get', start, key, hit=hit)
+        return value if hit else default
+
+    def set(self, key, value, timeout=None, version=None):
+        self._record_size(value)
+        return self._call('set', key, self._cache.set, key, value,
+                          timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        return self._call('delete', key, self._cache.delete, key,
+                          version=version)
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        result = self._call('get_many', None, self._cache.get_many, keys,
+                            version=version)
+        for key in keys:
+            self.stats.record_lookup(self._key_group(key), key in result)
+        return result
+
+    def has_key(self, key, version=None):
+        return self._call('has_key', key, self._cache.has_key, key,
+                          version=version)
+
+    def incr(self, key, delta=1, version=None):
+        return self._call('incr', key, self._cache.incr, key, delta,
+                          version=version)
+
+    def decr(self, key, delta=1, version=None):
+        return self._call('decr', key, self._cache.decr, key, delta,
+                          version=version)
+
+    def set_many(self, data, timeout=None, version=None):
+        for value in data.values():
+            self._record_size(value)
+        return self._call('set_many', None, self._cache.set_many, data,
+                          timeout=timeout, version=version)
+
+    def delete_many(self, keys, version=None):
+        return self._call('delete_many', None, self._cache.delete_many, keys,
+                          version=version)
+
+    def clear(self):
+        return self._call('clear', None, self._cache.clear)
+
+    def incr_version(self, key, delta=1, version=None):
+        return self._call('incr_version', key, self._cache.incr_version, key,
+                          delta, version)
+
+    def decr_version(self, key, delta=1, version=None):
+        return self._call('decr_version', key, self._cache.decr_version, key,
+                          delta, version)
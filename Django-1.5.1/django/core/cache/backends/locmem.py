@@ -37,7 +37,7 @@ class LocMemCache(BaseCache):
 
             if exp is None or exp <= time.time(): 已经过期
                 try:
-                    pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+                    pickled = self._serialize(value)
                     self._set(key, pickled, timeout)
                     return True
                 except pickle.PickleError:
@@ -56,7 +56,7 @@ class LocMemCache(BaseCache):
             elif exp > time.time(): 没有过期
                 try:
                     pickled = self._cache[key]
-                    return pickle.loads(pickled)
+                    return self._deserialize(pickled)
                 except pickle.PickleError:
                     return default
 
@@ -84,7 +84,7 @@ class LocMemCache(BaseCache):
 
         with self._lock.writer(): 写锁
             try:
-                pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+                pickled = self._serialize(value)
                 self._set(key, pickled, timeout)
             except pickle.PickleError:
                 pass
@@ -101,7 +101,7 @@ class LocMemCache(BaseCache):
 
         with self._lock.writer():
             try:
-                pickled = pickle.dumps(new_value, pickle.HIGHEST_PROTOCOL)
+                pickled = self._serialize(new_value)
                 self._cache[key] = pickled
             except pickle.PickleError:
                 pass
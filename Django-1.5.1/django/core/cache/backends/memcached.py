@@ -1,12 +1,168 @@
 "Memcached cache backend"
 
+import bisect
+import hashlib
+import socket
+import struct
 import time
 from threading import local
 
 from django.core.cache.backends.base import BaseCache, InvalidCacheBackendError
 
 from django.utils import six
-from django.utils.encoding import force_str
+from django.utils.encoding import force_bytes, force_str
+
+
+class HashRing(object):
+    """
+    A ketama-compatible consistent hash ring. Each server is placed at a
+    number of points on a 32-bit circle and a key belongs to the first server
+    found clockwise from the key's own hash, so adding or removing a server
+    only moves the keys adjacent to its points.
+    """
+    # Each md5 digest yields four points.
+    digests_per_server = 40
+
+    def __init__(self, servers):
+        self._servers = list(servers)
+        ring = {}
+        for server in self._servers:
+            for i in range(self.digests_per_server):
+                digest = hashlib.md5(force_bytes('%s-%s' % (server, i))).digest()
+                for point in struct.unpack('<4I', digest):
+                    ring[point] = server
+        self._points = sorted(ring)
+        self._ring = ring
+
+    def hash(self, key):
+        return struct.unpack('<I', hashlib.md5(force_bytes(key)).digest()[:4])[0]
+
+    def get_server(self, key):
+        return next(self.iter_servers(key), None)
+
+    def iter_servers(self, key):
+        """
+        Yields every server once, in ring order starting from the one owning
+        ``key``; the servers after the first are its failover candidates.
+        """
+        if not self._points:
+            return
+        start = bisect.bisect(self._points, self.hash(key))
+        seen = set()
+        for i in range(len(self._points)):
+            server = self._ring[self._points[(start + i) % len(self._points)]]
+            if server not in seen:
+                seen.add(server)
+                yield server
+                if len(seen) == len(self._servers):
+                    return
+
+
+class ConsistentHashingClient(object):
+    """
+    Quacks like a memcached library client, but holds one library client per
+    server and routes each key through a HashRing. A server whose client
+    fails is ejected from the ring, and its keys fail over to the next server,
+    until a retry delay (doubling on each consecutive failure) has passed.
+    """
+    def __init__(self, servers, ring, client_factory, failures,
+                 server_errors=(), is_dead=None, dead_retry=30,
+                 max_dead_retry=300):
+        self._clients = dict((server, client_factory([server]))
+                             for server in servers)
+        self._ring = ring
+        # Shared between the clients of all threads: server -> (retry_at, count)
+        self._failures = failures
+        self._server_errors = server_errors
+        self._is_dead = is_dead
+        self._dead_retry = dead_retry
+        self._max_dead_retry = max_dead_retry
+
+    def _get_server(self, key):
+        now = time.time()
+        for server in self._ring.iter_servers(key):
+            failure = self._failures.get(server)
+            if failure is None or failure[0] <= now:
+                return server
+        return None
+
+    def _mark_dead(self, server):
+        count = self._failures.get(server, (0, 0))[1] + 1
+        delay = min(self._dead_retry * 2 ** (count - 1), self._max_dead_retry)
+        self._failures[server] = (time.time() + delay, count)
+
+    def _call(self, server, method, default, *args):
+        client = self._clients[server]
+        try:
+            result = getattr(client, method)(*args)
+        except self._server_errors:
+            self._mark_dead(server)
+            return default
+        if self._is_dead is not None and self._is_dead(client):
+            self._mark_dead(server)
+            return default
+        if server in self._failures:
+            self._failures.pop(server, None)
+        return result
+
+    def _group_by_server(self, keys):
+        groups = {}
+        for key in keys:
+            server = self._get_server(key)
+            if server is not None:
+                groups.setdefault(server, []).append(key)
+        return groups
+
+    def _call_for_key(self, method, key, default, *args):
+        server = self._get_server(key)
+        if server is None:
+            return default
+        return self._call(server, method, default, key, *args)
+
+    def get(self, key):
+        return self._call_for_key('get', key, None)
+
+    def set(self, key, value, time=0):
+        return self._call_for_key('set', key, False, value, time)
+
+    def add(self, key, value, time=0):
+        return self._call_for_key('add', key, False, value, time)
+
+    def delete(self, key):
+        return self._call_for_key('delete', key, False)
+
+    def incr(self, key, delta=1):
+        return self._call_for_key('incr', key, None, delta)
+
+    def decr(self, key, delta=1):
+        return self._call_for_key('decr', key, None, delta)
+
+    def get_multi(self, keys):
+        result = {}
+        for server, server_keys in self._group_by_server(keys).items():
+            result.update(self._call(server, 'get_multi', {}, server_keys) or {})
+        return result
+
+    def set_multi(self, mapping, time=0):
+        failed = []
+        for server, server_keys in self._group_by_server(mapping).items():
+            server_mapping = dict((key, mapping[key]) for key in server_keys)
+            failed.extend(self._call(server, 'set_multi', server_keys,
+                                     server_mapping, time) or [])
+        return failed
+
+    def delete_multi(self, keys):
+        for server, server_keys in self._group_by_server(keys).items():
+            self._call(server, 'delete_multi', False, server_keys)
+
+    def flush_all(self):
+        for server in self._clients:
+            self._call(server, 'flush_all', None)
+
+    def disconnect_all(self):
+        for client in self._clients.values():
+            client.disconnect_all()
+
 
 class BaseMemcachedCache(BaseCache):
     def __init__(self, server, params, library, value_not_found_exception):
@@ -25,15 +181,53 @@ class BaseMemcachedCache(BaseCache):
         self._lib = library
         self._options = params.get('OPTIONS', None)
 
+        # The client libraries pickle values themselves, so only route values
+        # through the cache's serializer when one was explicitly configured.
+        self._encode_values = (params.get('SERIALIZER') is not None or
+                               params.get('COMPRESSOR') is not None)
+
+        # Ketama-style key distribution with per-server failure ejection.
+        self._consistent_hashing = bool(params.get('CONSISTENT_HASHING', False))
+        self._dead_retry = int(params.get('DEAD_RETRY', 30))
+        self._max_dead_retry = int(params.get('MAX_DEAD_RETRY', 300))
+        self._ring = HashRing(self._servers) if self._consistent_hashing else None
+        self._failures = {}
+
+        # Keep each thread's client (and its sockets) open between requests
+        # instead of disconnecting on request_finished.
+        self._persistent = bool(params.get('PERSISTENT_CONNECTIONS', False))
+        self._local = local()
+
+    # Exceptions raised by the client library when a server cannot be reached.
+    server_errors = (socket.error,)
+
+    def _create_client(self, servers):
+        return self._lib.Client(servers)
+
+    def _server_is_dead(self, client):
+        """
+        Tells whether the library client marked its server as dead during the
+        last call, for libraries that swallow connection errors.
+        """
+        return False
+
     @property
     def _cache(self):
         """
         Implements transparent thread-safe access to a memcached client.
         """
-        if getattr(self, '_client', None) is None:
-            self._client = self._lib.Client(self._servers)
-
-        return self._client
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            if self._consistent_hashing:
+                client = ConsistentHashingClient(
+                    self._servers, self._ring, self._create_client,
+                    self._failures, server_errors=self.server_errors,
+                    is_dead=self._server_is_dead, dead_retry=self._dead_retry,
+                    max_dead_retry=self._max_dead_retry)
+            else:
+                client = self._create_client(self._servers)
+            self._local.client = client
+        return client
 
     def _get_memcache_timeout(self, timeout):
         """
@@ -51,24 +245,39 @@ class BaseMemcachedCache(BaseCache):
             timeout += int(time.time())
         return int(timeout)
 
+    def _encode(self, value):
+        # Integers are left to the client library so that incr() and decr()
+        # keep working on values stored with set().
+        if (not self._encode_values or
+                (isinstance(value, six.integer_types) and not isinstance(value, bool))):
+            return value
+        return self._serialize(value)
+
+    def _decode(self, value):
+        if not self._encode_values or not isinstance(value, bytes):
+            return value
+        return self._deserialize(value)
+
     def make_key(self, key, version=None):
         # Python 2 memcache requires the key to be a byte string.
         return force_str(super(BaseMemcachedCache, self).make_key(key, version))
 
     def add(self, key, value, timeout=0, version=None):
         key = self.make_key(key, version=version)
-        return self._cache.add(key, value, self._get_memcache_timeout(timeout))
+        return self._cache.add(key, self._encode(value),
+                               self._get_memcache_timeout(timeout))
 
     def get(self, key, default=None, version=None):
         key = self.make_key(key, version=version)
         val = self._cache.get(key)
         if val is None:
             return default
-        return val
+        return self._decode(val)
 
     def set(self, key, value, timeout=0, version=None):
         key = self.make_key(key, version=version)
-        self._cache.set(key, value, self._get_memcache_timeout(timeout))
+        self._cache.set(key, self._encode(value),
+                        self._get_memcache_timeout(timeout))
 
     def delete(self, key, version=None):
         key = self.make_key(key, version=version)
@@ -81,12 +290,14 @@ class BaseMemcachedCache(BaseCache):
             _ = {}
             m = dict(zip(new_keys, keys))
             for k, v in ret.items():
-                _[m[k]] = v
+                _[m[k]] = self._decode(v)
             ret = _
         return ret
 
     def close(self, **kwargs):
-        self._cache.disconnect_all()
+        client = getattr(self._local, 'client', None)
+        if client is not None and not self._persistent:
+            client.disconnect_all()
 
     def incr(self, key, delta=1, version=None):
         key = self.make_key(key, version=version)
@@ -128,7 +339,7 @@ class BaseMemcachedCache(BaseCache):
         safe_data = {}
         for key, value in data.items():
             key = self.make_key(key, version=version)
-            safe_data[key] = value
+            safe_data[key] = self._encode(value)
         self._cache.set_multi(safe_data, self._get_memcache_timeout(timeout))
 
     def delete_many(self, keys, version=None):
@@ -163,28 +374,32 @@ class MemcachedCache(BaseMemcachedCache):
                                              library=memcache,
                                              value_not_found_exception=ValueError)
 
+    def _create_client(self, servers):
+        return self._lib.Client(servers, dead_retry=self._dead_retry)
+
+    def _server_is_dead(self, client):
+        # python-memcached doesn't raise on connection errors; it marks the
+        # host dead for dead_retry seconds instead.
+        now = time.time()
+        return all(host.deaduntil > now for host in client.servers)
+
 class PyLibMCCache(BaseMemcachedCache):
     "An implementation of a cache binding using pylibmc"
     def __init__(self, server, params):
         import pylibmc
-        self._local = local()
         super(PyLibMCCache, self).__init__(server, params,
                                            library=pylibmc,
                                            value_not_found_exception=pylibmc.NotFound)
+        self.server_errors = tuple(
+            getattr(pylibmc, name) for name in
+            ('ConnectionError', 'ServerDown', 'ServerDead', 'SocketCreateError')
+            if hasattr(pylibmc, name))
 
-    @property
-    def _cache(self):
+    def _create_client(self, servers):
         # PylibMC uses cache options as the 'behaviors' attribute.
-        # It also needs to use threadlocals, because some versions of
-        # PylibMC don't play well with the GIL.
-        client = getattr(self._local, 'client', None)
-        if client:
-            return client
-
-        client = self._lib.Client(self._servers)
+        # Clients are kept in threadlocals (see BaseMemcachedCache._cache),
+        # because some versions of PylibMC don't play well with the GIL.
+        client = self._lib.Client(servers)
         if self._options:
             client.behaviors = self._options
-
-        self._local.client = client
-
         return client
@@ -0,0 +1,41 @@
+"""
+Value compressors for cache backends.
+
+A compressor is a class with a ``compress(data)`` method and a
+``decompress(data)`` method, both operating on bytestrings. The compressor
+used by a cache is selected with the ``COMPRESSOR`` key of its ``CACHES``
+entry; ``COMPRESSOR_OPTIONS`` is passed to its constructor as keyword
+arguments.
+"""
+import zlib
+
+# Every compressed payload starts with one of these markers so that values
+# below the size threshold can be stored as-is and told apart on the way out.
+RAW_MARKER = b'\x00'
+ZLIB_MARKER = b'\x01'
+
+
+class ZlibCompressor(object):
+    """
+    Compresses values of at least ``min_length`` bytes with zlib. Compression
+    is only kept when it actually makes the value smaller.
+    """
+    def __init__(self, min_length=1024, level=6):
+        self.min_length = int(min_length)
+        self.level = int(level)
+
+    def compress(self, data):
+        if len(data) >= self.min_length:
+            compressed = zlib.compress(data, self.level)
+            if len(compressed) < len(data):
+                return ZLIB_MARKER + compressed
+        return RAW_MARKER + data
+
+    def decompress(self, data):
+        marker = data[:1]
+        if marker == ZLIB_MARKER:
+            return zlib.decompress(data[1:])
+        if marker == RAW_MARKER:
+            return data[1:]
+        # Values written before compression was enabled carry no marker.
+        return data
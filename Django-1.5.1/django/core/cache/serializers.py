@@ -0,0 +1,56 @@
+"""
+Value serializers for cache backends.
+
+A serializer is a class with a ``dumps(value)`` method returning a
+bytestring and a ``loads(data)`` method accepting one. The serializer used
+by a cache is selected with the ``SERIALIZER`` key of its ``CACHES`` entry.
+"""
+try:
+    from django.utils.six.moves import cPickle as pickle
+except ImportError:
+    import pickle
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signing import JSONSerializer as BaseJSONSerializer
+
+
+class PickleSerializer(object):
+    """
+    Serializes values with pickle at the highest available protocol. This is
+    the default and can store any picklable Python object.
+    """
+    protocol = pickle.HIGHEST_PROTOCOL
+
+    def dumps(self, value):
+        return pickle.dumps(value, self.protocol)
+
+    def loads(self, data):
+        return pickle.loads(data)
+
+
+class JSONSerializer(BaseJSONSerializer):
+    """
+    Serializes values as compact JSON. Readable from other languages and safe
+    to load from an untrusted store, but limited to plain data (dicts, lists,
+    strings and numbers).
+    """
+    pass
+
+
+class MessagePackSerializer(object):
+    """
+    Serializes values with MessagePack. Requires the ``msgpack`` library.
+    """
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError as e:
+            raise ImproperlyConfigured(
+                "Error loading msgpack module: %s" % e)
+        self._msgpack = msgpack
+
+    def dumps(self, value):
+        return self._msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data):
+        return self._msgpack.unpackb(data, raw=False)
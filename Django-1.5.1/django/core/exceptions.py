@@ -23,6 +23,14 @@ class SuspiciousOperation(Exception):
     pass
 
 
+class RequestDataTooBig(SuspiciousOperation):
+    """
+    The request body is larger than settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+    allows to be loaded into memory.
+    """
+    pass
+
+
 class PermissionDenied(Exception):
     "The user did not have permission to do that"
     pass
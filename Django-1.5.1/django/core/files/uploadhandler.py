@@ -4,6 +4,7 @@ Base file upload handler classes, and the built-in concrete subclasses
 
 from __future__ import unicode_literals
 
+import os
 from io import BytesIO
 
 from django.conf import settings
@@ -13,8 +14,8 @@ from django.utils import importlib
 from django.utils.encoding import python_2_unicode_compatible
 
 __all__ = ['UploadFileException','StopUpload', 'SkipFile', 'FileUploadHandler',
-           'TemporaryFileUploadHandler', 'MemoryFileUploadHandler',
-           'load_handler', 'StopFutureHandlers']
+           'TemporaryFileUploadHandler', 'DirectTemporaryFileUploadHandler',
+           'MemoryFileUploadHandler', 'load_handler', 'StopFutureHandlers']
 
 class UploadFileException(Exception):
     """
@@ -144,6 +145,71 @@ class TemporaryFileUploadHandler(FileUploadHandler):
         self.file.size = file_size
         return self.file
 
+class DirectTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Upload handler that streams data into a temporary file by writing straight
+    to its descriptor, bypassing Python's file buffering. Where the platform
+    supports it the file is preallocated, and it can be flushed to disk as it
+    is written (see ``FILE_UPLOAD_FSYNC`` and ``FILE_UPLOAD_FSYNC_INTERVAL``).
+    """
+    def __init__(self, *args, **kwargs):
+        super(DirectTemporaryFileUploadHandler, self).__init__(*args, **kwargs)
+        self.request_length = None
+        self.received_length = 0
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        """
+        Remember the length of the request body, which bounds the size of any
+        file in it.
+        """
+        self.request_length = content_length
+        self.received_length = 0
+
+    def new_file(self, file_name, *args, **kwargs):
+        """
+        Create the temporary file and, if the part gives its size, reserve
+        disk space for it.
+        """
+        super(DirectTemporaryFileUploadHandler, self).new_file(file_name, *args, **kwargs)
+        self.fd = self.file.fileno()
+        self.preallocated = False
+        self.unsynced = 0
+        # Parts rarely give their own size. The size of the whole request
+        # isn't used instead: it would be reserved for every file in it, and
+        # where posix_fallocate() is emulated that means writing it out.
+        size = self.content_length or 0
+        if size and self.request_length:
+            # The part can't be larger than what is left of the request.
+            size = min(size, self.request_length - self.received_length)
+        if size > 0 and hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(self.fd, 0, size)
+            except OSError:
+                # Not every filesystem supports preallocation.
+                pass
+            else:
+                self.preallocated = True
+
+    def receive_data_chunk(self, raw_data, start):
+        written = os.write(self.fd, raw_data)
+        while written < len(raw_data):
+            written += os.write(self.fd, raw_data[written:])
+        interval = settings.FILE_UPLOAD_FSYNC_INTERVAL
+        if interval:
+            self.unsynced += written
+            if self.unsynced >= interval:
+                os.fsync(self.fd)
+                self.unsynced = 0
+
+    def file_complete(self, file_size):
+        self.received_length += file_size
+        if self.preallocated:
+            # Give back the space reserved beyond the end of the file.
+            os.ftruncate(self.fd, file_size)
+        if settings.FILE_UPLOAD_FSYNC or (settings.FILE_UPLOAD_FSYNC_INTERVAL and self.unsynced):
+            os.fsync(self.fd)
+        return super(DirectTemporaryFileUploadHandler, self).file_complete(file_size)
+
 class MemoryFileUploadHandler(FileUploadHandler):
     """
     File upload handler to stream uploads into memory (used for small files). 直接在内存中存放上传文件
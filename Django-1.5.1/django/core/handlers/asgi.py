@@ -0,0 +1,311 @@
+"""
+A handler for asyncio-based servers speaking the ASGI protocol.
+
+Requests are read and responses written on the event loop, so slow clients
+don't tie up a thread. The middleware and the view run in a thread pool
+(the loop's default executor, unless another one is given), exactly as they
+would under WSGIHandler. When a view returns a coroutine, as views defined
+with ``async def`` do, the thread is released while the coroutine runs on
+the event loop, and the response middleware runs once it has finished.
+
+Requires asyncio, which is available from Python 3.5 on. The code avoids the
+``async``/``await`` syntax, so that this module can still be compiled by the
+other Python versions Django supports.
+"""
+from __future__ import unicode_literals
+
+import logging
+import sys
+import tempfile
+from threading import Lock
+
+try:
+    import asyncio
+except ImportError as e:
+    from django.core.exceptions import ImproperlyConfigured
+    raise ImproperlyConfigured("Error loading asyncio module: %s" % e)
+
+from django import http
+from django.conf import settings
+from django.core import signals
+from django.core.handlers import base
+from django.core.handlers.wsgi import WSGIRequest
+from django.core import urlresolvers
+
+logger = logging.getLogger('django.request')
+
+
+def _run(coroutine, loop):
+    """
+    Runs the generator ``coroutine`` on ``loop`` and returns a future for its
+    completion. Each value the generator yields is awaited, and its result
+    (or exception) is sent back into the generator, much like ``await``.
+    """
+    done = loop.create_future()
+
+    def step(value=None, exc=None):
+        try:
+            if exc is not None:
+                awaitable = coroutine.throw(exc)
+            else:
+                awaitable = coroutine.send(value)
+        except StopIteration:
+            done.set_result(None)
+        except BaseException as e:
+            done.set_exception(e)
+        else:
+            asyncio.ensure_future(awaitable, loop=loop).add_done_callback(resume)
+
+    def resume(future):
+        if future.cancelled():
+            step(exc=asyncio.CancelledError())
+        elif future.exception() is not None:
+            step(exc=future.exception())
+        else:
+            step(future.result())
+
+    loop.call_soon(step)
+    return done
+
+
+def _next_chunk(iterator):
+    # StopIteration can't be passed through a future, so the end of the
+    # content is signaled with None instead.
+    return next(iterator, None)
+
+
+class ASGIHandler(base.BaseHandler):
+    """
+    An ASGI (version 3) application: call it with the connection scope and
+    the ``receive`` and ``send`` awaitables, and await the result.
+
+    Coroutines returned by views (defined with ``async def``) are awaited on
+    the event loop, between running the request and view middleware and
+    running the response middleware in the thread pool. The content of
+    streaming responses is produced in the thread pool a chunk at a time and
+    sent from the event loop.
+    """
+    initLock = Lock()
+    request_class = WSGIRequest
+
+    def __init__(self, executor=None):
+        super(ASGIHandler, self).__init__()
+        self.executor = executor
+
+    def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            raise ValueError("ASGIHandler can't handle %r connections." %
+                             scope['type'])
+        loop = asyncio.get_event_loop()
+        return _run(self.handle(scope, receive, send, loop), loop)
+
+    def handle(self, scope, receive, send, loop):
+        """
+        Reads the request body, gets the response in the thread pool and
+        sends it. A generator run by _run().
+        """
+        body = tempfile.SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+        while True:
+            message = yield receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return
+            body.write(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+        body.seek(0)
+
+        environ = self.get_environ(scope, body)
+        response = yield loop.run_in_executor(
+            self.executor, self.get_response_for_environ, environ)
+        if isinstance(response, PendingView):
+            pending = response
+            try:
+                response = yield pending.coroutine
+            except Exception:
+                exc_info = sys.exc_info()
+                response = None
+            else:
+                exc_info = None
+            response = yield loop.run_in_executor(
+                self.executor, self.finish_pending_view, pending, response,
+                exc_info)
+
+        yield send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': self.get_response_headers(response),
+        })
+        if not response.streaming:
+            yield send({'type': 'http.response.body', 'body': response.content})
+            return
+        # The thread that closes a streaming response may not be the one that
+        # handled the request, so request_finished may not see the same
+        # database connection.
+        try:
+            iterator = iter(response.streaming_content)
+            while True:
+                chunk = yield loop.run_in_executor(
+                    self.executor, _next_chunk, iterator)
+                if chunk is None:
+                    break
+                yield send({'type': 'http.response.body', 'body': chunk,
+                            'more_body': True})
+            yield send({'type': 'http.response.body'})
+        except BaseException:
+            loop.run_in_executor(self.executor, response.close)
+            raise
+        yield loop.run_in_executor(self.executor, response.close)
+
+    def get_environ(self, scope, body):
+        """
+        Returns a WSGI environ for the request described by ``scope``, with
+        ``body`` as its input.
+        """
+        script_name = scope.get('root_path', '')
+        path_info = scope['path']
+        if script_name and path_info.startswith(script_name):
+            path_info = path_info[len(script_name):]
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            # Strings in a WSGI environ are decoded with ISO-8859-1.
+            'SCRIPT_NAME': script_name.encode('utf-8').decode('iso-8859-1'),
+            'PATH_INFO': path_info.encode('utf-8').decode('iso-8859-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('iso-8859-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': 'HTTP/%s' % scope.get('http_version', '1.1'),
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope.get('headers', ()):
+            name = name.decode('iso-8859-1').upper().replace('-', '_')
+            value = value.decode('iso-8859-1')
+            if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = 'HTTP_' + name
+            if name in environ:
+                # Repeated headers are joined, as a WSGI server would do.
+                value = environ[name] + (
+                    '; ' if name == 'HTTP_COOKIE' else ',') + value
+            environ[name] = value
+        return environ
+
+    def get_response_for_environ(self, environ):
+        """
+        Returns the response to the request described by ``environ``, or a
+        PendingView if the view returned a coroutine. Runs in the thread pool,
+        and does what WSGIHandler.__call__ does.
+        """
+        # Set up middleware if needed. We couldn't do this earlier, because
+        # settings weren't available.
+        if self._request_middleware is None:
+            with self.initLock:
+                try:
+                    # Check that middleware is still uninitialised.
+                    if self._request_middleware is None:
+                        self.load_middleware()
+                except:
+                    # Unload whatever middleware we got
+                    self._request_middleware = None
+                    raise
+
+        urlresolvers.set_script_prefix(base.get_script_name(environ))
+        signals.request_started.send(sender=self.__class__)
+        try:
+            request = self.request_class(environ)
+        except UnicodeDecodeError:
+            logger.warning('Bad Request (UnicodeDecodeError)',
+                exc_info=sys.exc_info(),
+                extra={
+                    'status_code': 400,
+                }
+            )
+            response = http.HttpResponseBadRequest()
+        else:
+            response = self.get_response(request)
+            if isinstance(response, PendingView):
+                return response
+        return self.prepare_response(response)
+
+    def get_response(self, request):
+        """
+        Returns the response to ``request``, as BaseHandler.get_response()
+        does, unless the view returns a coroutine: then the response
+        middleware is left for finish_pending_view() and a PendingView is
+        returned.
+        """
+        middleware = self._middleware_for_path(request.path_info)
+        try:
+            response, resolver, view = self.prepare_view(request, middleware)
+            if view is not None:
+                response = self.call_view(request, middleware, resolver, view)
+        finally:
+            urlresolvers.set_urlconf(None)
+        if isinstance(response, PendingView):
+            return response
+        return self.finish_response(request, middleware, resolver, response)
+
+    def finish_view(self, request, middleware, resolver, callback, response=None,
+                    exc_info=None):
+        if asyncio.iscoroutine(response):
+            return PendingView(request, middleware, resolver, callback, response)
+        return super(ASGIHandler, self).finish_view(
+            request, middleware, resolver, callback, response, exc_info)
+
+    def finish_pending_view(self, pending, response, exc_info):
+        """
+        Finishes the response to a request whose view returned a coroutine,
+        given the coroutine's result or the exception it raised. Runs in the
+        thread pool.
+        """
+        request = pending.request
+        # This may not be the thread that started on the request.
+        urlresolvers.set_script_prefix(base.get_script_name(request.environ))
+        urlresolvers.set_urlconf(getattr(request, 'urlconf', settings.ROOT_URLCONF))
+        try:
+            response = super(ASGIHandler, self).finish_view(
+                request, pending.middleware, pending.resolver, pending.callback,
+                response, exc_info)
+        finally:
+            urlresolvers.set_urlconf(None)
+        response = self.finish_response(
+            request, pending.middleware, pending.resolver, response)
+        return self.prepare_response(response)
+
+    def prepare_response(self, response):
+        response._handler_class = self.__class__
+        if not response.streaming:
+            # The content is ready, so the response can be closed by the
+            # thread that handled the request.
+            response.close()
+        return response
+
+    def get_response_headers(self, response):
+        headers = [(k.encode('iso-8859-1'), v.encode('iso-8859-1'))
+                   for k, v in response.items()]
+        for c in response.cookies.values():
+            headers.append((b'Set-Cookie', c.output(header='').encode('iso-8859-1')))
+        return headers
+
+
+class PendingView(object):
+    """
+    The state of a request whose view returned a coroutine, kept while the
+    coroutine runs on the event loop.
+    """
+    def __init__(self, request, middleware, resolver, callback, coroutine):
+        self.request = request
+        self.middleware = middleware
+        self.resolver = resolver
+        self.callback = callback
+        self.coroutine = coroutine
@@ -2,6 +2,7 @@ from __future__ import unicode_literals
 
 import logging
 import sys
+import time
 import types
 
 from django import http
@@ -9,6 +10,7 @@ from django.conf import settings
 from django.core import exceptions
 from django.core import urlresolvers
 from django.core import signals
+from django.core.handlers import stats
 from django.utils.encoding import force_text
 from django.utils.importlib import import_module
 from django.utils import six
@@ -50,6 +52,7 @@ class BaseHandler(object):
 
         # 临时的请求中间件, 因为在加入中间件的过程中, 可能会出现异常, 而出现异常都导致加载中间件的不成功, 因此将 self._request_middleware 的赋值放在最后, 表示已经成功.
         request_middleware = []
+        path_filters = []
 
         # settings.MIDDLEWARE_CLASSES 设置项指定需要预装的中间件
         for middleware_path in settings.MIDDLEWARE_CLASSES:
@@ -76,178 +79,292 @@ class BaseHandler(object):
             except exceptions.MiddlewareNotUsed:
                 continue
 
+            methods = self._middleware_methods(middleware_path, mw_instance)
+
             和 urllib 的处理方法类似: 请求预处理, 视图处理?, 模版处理, 相应处理, 错误处理(详见我的 urllib 源码剖析)
-            if hasattr(mw_instance, 'process_request'):
+            if 'process_request' in methods:
                 # 这里 request_middleware 用的是 append(), 这里是有讲究的:
                 # django 规定, 多个请求中间件调用的次序是其出现的次序, 下同
-                request_middleware.append(mw_instance.process_request)
+                request_middleware.append(methods['process_request'])
 
-            if hasattr(mw_instance, 'process_view'):
-                self._view_middleware.append(mw_instance.process_view)
+            if 'process_view' in methods:
+                self._view_middleware.append(methods['process_view'])
 
-            if hasattr(mw_instance, 'process_template_response'):
+            if 'process_template_response' in methods:
                 # 这里 _template_response_middleware 用的是 insert() 头插法, 这里是有讲究的:
                 # django 规定, 多个模版相应中间件调用的次序是其出现次序的逆序, 下同
-                self._template_response_middleware.insert(0, mw_instance.process_template_response)
+                self._template_response_middleware.insert(0, methods['process_template_response'])
+
+            if 'process_response' in methods:
+                self._response_middleware.insert(0, methods['process_response'])
 
-            if hasattr(mw_instance, 'process_response'):
-                self._response_middleware.insert(0, mw_instance.process_response)
+            if 'process_exception' in methods:
+                self._exception_middleware.insert(0, methods['process_exception'])
 
-            if hasattr(mw_instance, 'process_exception'):
-                self._exception_middleware.insert(0, mw_instance.process_exception)
+            inactive_paths = tuple(getattr(mw_instance, 'inactive_paths', ()))
+            if inactive_paths:
+                path_filters.append((inactive_paths, set(methods.values())))
+
+        self._middleware_chain = (request_middleware, self._view_middleware,
+            self._template_response_middleware, self._response_middleware,
+            self._exception_middleware)
+        self._path_filters = path_filters
+        self._path_chains = {}
 
         # We only assign to this when initialization is complete as it is used
         # as a flag for initialization being complete.
         # 结束的标识, 表明中间件加载成功
         self._request_middleware = request_middleware
 
+    def _middleware_methods(self, middleware_path, mw_instance):
+        """
+        Returns the middleware methods mw_instance defines, keyed by name.
+        They are wrapped to record their latency if MIDDLEWARE_TIMING is on.
+        """
+        methods = {}
+        for name in ('process_request', 'process_view',
+                     'process_template_response', 'process_response',
+                     'process_exception'):
+            if hasattr(mw_instance, name):
+                methods[name] = getattr(mw_instance, name)
+        if settings.MIDDLEWARE_TIMING:
+            middleware_stats = stats.get_stats(middleware_path)
+            for name, method in list(methods.items()):
+                methods[name] = stats.timed(method, middleware_stats, name)
+        return methods
+
+    def _middleware_for_path(self, path):
+        """
+        Returns the request, view, template response, response and exception
+        middleware lists to apply to a request for ``path``, leaving out the
+        middleware whose ``inactive_paths`` match it.
+        """
+        skipped = tuple([i for i, (prefixes, methods) in enumerate(self._path_filters)
+                         if path.startswith(prefixes)])
+        if not skipped:
+            return self._middleware_chain
+        try:
+            return self._path_chains[skipped]
+        except KeyError:
+            excluded = set()
+            for i in skipped:
+                excluded.update(self._path_filters[i][1])
+            chain = tuple([[method for method in methods if method not in excluded]
+                           for methods in self._middleware_chain])
+            self._path_chains[skipped] = chain
+            return chain
+
     # 处理请求的函数, 并返回 response
     def get_response(self, request):
         "Returns an HttpResponse object for the given HttpRequest"
         根据请求, 得到响应
 
+        # Middleware that declared itself inactive for this path is left out.
+        middleware = self._middleware_for_path(request.path_info)
+
         try:
-            为该线程提供默认的 url 处理器
-            # Setup default url resolver for this thread, this code is outside
-            # the try/except so we don't get a spurious "unbound local
-            # variable" exception in the event an exception is raised before
-            # resolver is set
+            response, resolver, view = self.prepare_view(request, middleware)
+            if view is not None:
+                # 这里调用的是真正的处理函数, 我们一般在 view.py 中定义这些函数
+                response = self.call_view(request, middleware, resolver, view)
+        finally:
+            # Reset URLconf for this thread on the way out for complete
+            # isolation of request.urlconf 重置, 因为前面有两种 url resolver 的可能, 拒绝混淆
+            urlresolvers.set_urlconf(None)
 
-            #ROOT_URLCONF = 'mysite.urls'
-            urlconf = settings.ROOT_URLCONF
+        return self.finish_response(request, middleware, resolver, response)
 
-            # set_urlconf() 会设置 url 配置即 settings.ROOT_URLCONF
-            urlresolvers.set_urlconf(urlconf)
+    def prepare_view(self, request, middleware):
+        """
+        Applies the request middleware, resolves the view and applies the view
+        middleware. Returns a (response, resolver, view) tuple, where ``view``
+        is the (callback, callback_args, callback_kwargs) to call next, or
+        None if the middleware (or an error) already produced ``response``.
+        """
+        request_middleware, view_middleware = middleware[:2]
 
-            # 实例化 RegexURLResolver, 暂且将其理解为一个 url 的匹配处理器, 下节展开
-            resolver = urlresolvers.RegexURLResolver(r'^/', urlconf)
+        为该线程提供默认的 url 处理器
+        # Setup default url resolver for this thread, this code is outside
+        # the try/except so we don't get a spurious "unbound local
+        # variable" exception in the event an exception is raised before
+        # resolver is set
 
-            try:
-                response = None
+        #ROOT_URLCONF = 'mysite.urls'
+        urlconf = settings.ROOT_URLCONF
+
+        # set_urlconf() 会设置 url 配置即 settings.ROOT_URLCONF
+        urlresolvers.set_urlconf(urlconf)
 
-                # Apply request middleware 调用请求中间件
-                for middleware_method in self._request_middleware:
-                    response = middleware_method(request)
+        # 实例化 RegexURLResolver, 暂且将其理解为一个 url 的匹配处理器, 下节展开
+        resolver = urlresolvers.get_resolver(urlconf)
+
+        try:
+            response = None
+            callback = None
+
+            # Apply request middleware 调用请求中间件
+            for middleware_method in request_middleware:
+                response = middleware_method(request)
+
+                # 如果此 response 有效, 即不走下面的逻辑
+                if response:
+                    break
+
+            # 如果没有结果
+            if response is None:
+                # 尝试 request 中是否有 urlconf, 一般没有, 可以忽略此段代码!!!
+                if hasattr(request, 'urlconf'):
+                    # Reset url resolver with a custom urlconf. 自定义的 urlconf
+                    urlconf = request.urlconf
+                    urlresolvers.set_urlconf(urlconf)
+                    if urlconf is None:
+                        # get_resolver() would quietly fall back to
+                        # ROOT_URLCONF.
+                        raise exceptions.ImproperlyConfigured(
+                            "request.urlconf can't be None; delete the "
+                            "attribute to use ROOT_URLCONF instead.")
+                    resolver = urlresolvers.get_resolver(urlconf)
+                # 调用 RegexURLResolver.resolve(), 可以理解为启动匹配的函数; 返回 ResolverMatch 实例
+                resolver_match = self.resolve_request(request, urlconf)
+
+                # resolver_match 对象中存储了有用的信息, 譬如 callback 就是我们在 views.py 中定义的函数.
+                callback, callback_args, callback_kwargs = resolver_match
+
+                # 将返回的 resolver_match 挂钩到 request
+                request.resolver_match = resolver_match
+
+                # Apply view middleware 调用视图中间件
+                for middleware_method in view_middleware:
+                    response = middleware_method(request, callback, callback_args, callback_kwargs)
 
                     # 如果此 response 有效, 即不走下面的逻辑
                     if response:
                         break
 
-                # 如果没有结果
-                if response is None:
-                    # 尝试 request 中是否有 urlconf, 一般没有, 可以忽略此段代码!!!
-                    if hasattr(request, 'urlconf'):
-                        # Reset url resolver with a custom urlconf. 自定义的 urlconf
-                        urlconf = request.urlconf
-                        urlresolvers.set_urlconf(urlconf)
-                        resolver = urlresolvers.RegexURLResolver(r'^/', urlconf)
-                    # 调用 RegexURLResolver.resolve(), 可以理解为启动匹配的函数; 返回 ResolverMatch 实例
-                    resolver_match = resolver.resolve(request.path_info)
-
-                    # resolver_match 对象中存储了有用的信息, 譬如 callback 就是我们在 views.py 中定义的函数.
-                    callback, callback_args, callback_kwargs = resolver_match
-
-                    # 将返回的 resolver_match 挂钩到 request
-                    request.resolver_match = resolver_match
-
-                    # Apply view middleware 调用视图中间件
-                    for middleware_method in self._view_middleware:
-                        response = middleware_method(request, callback, callback_args, callback_kwargs)
-
-                        # 如果此 response 有效, 即不走下面的逻辑
-                        if response:
-                            break
-
                 # response 还是为空
                 if response is None:
-                    try:
-                        # 这里调用的是真正的处理函数, 我们一般在 view.py 中定义这些函数
-                        response = callback(request, *callback_args, **callback_kwargs)
+                    return None, resolver, (callback, callback_args, callback_kwargs)
+        except:
+            return self.response_for_exception(request, resolver), resolver, None
 
-                    except Exception as e:
-                        # If the view raised an exception, run it through exception
-                        # middleware, and if the exception middleware returns a
-                        # response, use that. Otherwise, reraise the exception.
+        return (self.finish_view(request, middleware, resolver, callback, response),
+                resolver, None)
 
-                        # 出现异常, 调用异常中间件
-                        for middleware_method in self._exception_middleware:
-                            response = middleware_method(request, e)
+    def call_view(self, request, middleware, resolver, view):
+        """
+        Calls the view returned by prepare_view() and returns its response,
+        as finished by finish_view().
+        """
+        callback, callback_args, callback_kwargs = view
+        try:
+            response = callback(request, *callback_args, **callback_kwargs)
+        except Exception:
+            return self.finish_view(request, middleware, resolver, callback,
+                                    exc_info=sys.exc_info())
+        except:
+            return self.response_for_exception(request, resolver)
+        return self.finish_view(request, middleware, resolver, callback, response)
+
+    def finish_view(self, request, middleware, resolver, callback, response=None,
+                    exc_info=None):
+        """
+        Turns what the view returned, or the exception it raised (given as
+        ``exc_info``), into a rendered response.
+        """
+        template_response_middleware, exception_middleware = middleware[2], middleware[4]
+        try:
+            if exc_info is not None:
+                # If the view raised an exception, run it through exception
+                # middleware, and if the exception middleware returns a
+                # response, use that. Otherwise, reraise the exception.
 
-                            # 如果此 response 有效, 即不走下面的逻辑
-                            if response:
-                                break
+                # 出现异常, 调用异常中间件
+                for middleware_method in exception_middleware:
+                    response = middleware_method(request, exc_info[1])
 
-                        if response is None:
-                            raise
+                    # 如果此 response 有效, 即不走下面的逻辑
+                    if response:
+                        break
 
-                # response 还是为空, 可能就要异常了
-                # Complain if the view returned None (a common error).
                 if response is None:
-                    if isinstance(callback, types.FunctionType):    # FBV
-                        view_name = callback.__name__
-                    else:                                           # CBV
-                        view_name = callback.__class__.__name__ + '.__call__'
-                    raise ValueError("The view %s.%s didn't return an HttpResponse object." % (callback.__module__, view_name))
-
-                # If the response supports deferred rendering, apply template
-                # response middleware and the render the response 如果 response 实现了 render, 那么渲染返回.
-                if hasattr(response, 'render') and callable(response.render):
-                    for middleware_method in self._template_response_middleware:
-                        response = middleware_method(request, response)
-                    response = response.render()
-
-            except http.Http404 as e:
-                logger.warning('Not Found: %s', request.path,
-                            extra={
-                                'status_code': 404,
-                                'request': request
-                            })
-
-                # 如果是调试下, 直接要返回 404 页面
-                if settings.DEBUG:
-                    response = debug.technical_404_response(request, e)
-                else:
-                    try:
-                        # 非调试模式下, 获取 url 处理器的默认 404 处理
-                        callback, param_dict = resolver.resolve404()
-                        response = callback(request, **param_dict)
-                    except:
-                        signals.got_request_exception.send(sender=self.__class__, request=request)
-                        response = self.handle_uncaught_exception(request, resolver, sys.exc_info())
-
-            # 访问拒绝
-            except exceptions.PermissionDenied:
-                logger.warning(
-                    'Forbidden (Permission denied): %s', request.path,
-                    extra={
-                        'status_code': 403,
-                        'request': request
-                    })
-                try:
-                    callback, param_dict = resolver.resolve403()
-                    response = callback(request, **param_dict)
-                except:
-                    signals.got_request_exception.send(
-                            sender=self.__class__, request=request)
-                    response = self.handle_uncaught_exception(request,
-                            resolver, sys.exc_info())
-
-            except SystemExit:
-                # Allow sys.exit() to actually exit. See tickets #1023 and #4701
-                raise
-
-            except: # Handle everything else, including SuspiciousOperation, etc.
-                # Get the exception info now, in case another exception is thrown later.
+                    six.reraise(*exc_info)
+
+            # response 还是为空, 可能就要异常了
+            # Complain if the view returned None (a common error).
+            if response is None:
+                if isinstance(callback, types.FunctionType):    # FBV
+                    view_name = callback.__name__
+                else:                                           # CBV
+                    view_name = callback.__class__.__name__ + '.__call__'
+                raise ValueError("The view %s.%s didn't return an HttpResponse object." % (callback.__module__, view_name))
+
+            # If the response supports deferred rendering, apply template
+            # response middleware and the render the response 如果 response 实现了 render, 那么渲染返回.
+            if hasattr(response, 'render') and callable(response.render):
+                for middleware_method in template_response_middleware:
+                    response = middleware_method(request, response)
+                response = response.render()
+        except:
+            return self.response_for_exception(request, resolver)
+        return response
+
+    def response_for_exception(self, request, resolver):
+        """
+        Returns the response for the exception being handled, which was
+        raised while getting the response to ``request``.
+        """
+        exc_info = sys.exc_info()
+        e = exc_info[1]
+        if isinstance(e, http.Http404):
+            logger.warning('Not Found: %s', request.path,
+                        extra={
+                            'status_code': 404,
+                            'request': request
+                        })
+
+            # 如果是调试下, 直接要返回 404 页面
+            if settings.DEBUG:
+                return debug.technical_404_response(request, e)
+            try:
+                # 非调试模式下, 获取 url 处理器的默认 404 处理
+                callback, param_dict = resolver.resolve404()
+                return callback(request, **param_dict)
+            except:
                 signals.got_request_exception.send(sender=self.__class__, request=request)
-                response = self.handle_uncaught_exception(request, resolver, sys.exc_info())
-        finally:
-            # Reset URLconf for this thread on the way out for complete
-            # isolation of request.urlconf 重置, 因为前面有两种 url resolver 的可能, 拒绝混淆
-            urlresolvers.set_urlconf(None)
+                return self.handle_uncaught_exception(request, resolver, sys.exc_info())
+
+        # 访问拒绝
+        elif isinstance(e, exceptions.PermissionDenied):
+            logger.warning(
+                'Forbidden (Permission denied): %s', request.path,
+                extra={
+                    'status_code': 403,
+                    'request': request
+                })
+            try:
+                callback, param_dict = resolver.resolve403()
+                return callback(request, **param_dict)
+            except:
+                signals.got_request_exception.send(
+                        sender=self.__class__, request=request)
+                return self.handle_uncaught_exception(request,
+                        resolver, sys.exc_info())
+
+        elif isinstance(e, SystemExit):
+            # Allow sys.exit() to actually exit. See tickets #1023 and #4701
+            six.reraise(*exc_info)
+
+        # Handle everything else, including SuspiciousOperation, etc.
+        signals.got_request_exception.send(sender=self.__class__, request=request)
+        return self.handle_uncaught_exception(request, resolver, exc_info)
 
+    def finish_response(self, request, middleware, resolver, response):
+        """
+        Applies the response middleware and the response fixes to ``response``.
+        """
         try:
             # Apply response middleware, regardless of the response 调用响应中间件
-            for middleware_method in self._response_middleware:
+            for middleware_method in middleware[3]:
                 response = middleware_method(request, response)
 
             response = self.apply_response_fixes(request, response)
@@ -258,6 +375,24 @@ class BaseHandler(object):
 
         return response
 
+    def resolve_request(self, request, urlconf):
+        """
+        Resolves request.path_info against urlconf and returns the
+        ResolverMatch. How long that took is reported through the
+        request_resolved signal, when it has receivers.
+        """
+        if not signals.request_resolved.receivers:
+            return urlresolvers.resolve(request.path_info, urlconf)
+        resolver_match = None
+        start = time.time()
+        try:
+            resolver_match = urlresolvers.resolve(request.path_info, urlconf)
+        finally:
+            signals.request_resolved.send(sender=self.__class__,
+                request=request, resolver_match=resolver_match,
+                duration=time.time() - start)
+        return resolver_match
+
     def handle_uncaught_exception(self, request, resolver, exc_info):
         """
         处理未能捕捉的错误
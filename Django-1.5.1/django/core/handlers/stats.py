@@ -0,0 +1,99 @@
+"""
+Latency statistics for middleware.
+
+When the MIDDLEWARE_TIMING setting is True, each middleware method is timed
+as the handler loads it, and the figures are aggregated per middleware class
+path (see get_middleware_stats()).
+"""
+import bisect
+import threading
+import time
+
+# Upper bounds, in seconds, of the latency histogram buckets. A last bucket
+# counts the calls slower than all of them.
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+class MiddlewareStats(object):
+    """
+    Thread-safe latency counters and histograms for the methods of one
+    middleware.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # method name -> [calls, total time, max time, bucket counts]
+            self._methods = {}
+
+    def record(self, method, duration):
+        with self._lock:
+            counters = self._methods.get(method)
+            if counters is None:
+                counters = self._methods[method] = [
+                    0, 0.0, 0.0, [0] * (len(BUCKETS) + 1)]
+            counters[0] += 1
+            counters[1] += duration
+            if duration > counters[2]:
+                counters[2] = duration
+            counters[3][bisect.bisect_left(BUCKETS, duration)] += 1
+
+    def snapshot(self, reset=False):
+        """
+        Returns the statistics gathered so far as a dictionary, and clears
+        them if ``reset`` is True. Histograms are lists of (upper bound,
+        count) pairs; the bound of the last one is None.
+        """
+        with self._lock:
+            methods = dict(
+                (method, {
+                    'calls': calls,
+                    'total_time': total,
+                    'mean_time': total / calls,
+                    'max_time': longest,
+                    'histogram': list(zip(BUCKETS + (None,), buckets)),
+                }) for method, (calls, total, longest, buckets)
+                in self._methods.items())
+            if reset:
+                self._methods = {}
+        return methods
+
+
+def get_stats(middleware_path):
+    """
+    Returns the MiddlewareStats shared by every instance of the middleware at
+    ``middleware_path``.
+    """
+    with _stats_lock:
+        stats = _stats.get(middleware_path)
+        if stats is None:
+            stats = _stats[middleware_path] = MiddlewareStats()
+        return stats
+
+
+def get_middleware_stats(reset=False):
+    """
+    Returns the statistics of every timed middleware, keyed by the path it is
+    listed under in MIDDLEWARE_CLASSES.
+    """
+    return dict((path, stats.snapshot(reset=reset))
+                for path, stats in list(_stats.items()))
+
+
+def timed(method, stats, name):
+    """
+    Wraps a middleware method so that each call is recorded in ``stats``
+    under ``name``.
+    """
+    def wrapper(*args):
+        start = time.time()
+        try:
+            return method(*args)
+        finally:
+            stats.record(name, time.time() - start)
+    return wrapper
@@ -3,7 +3,6 @@ from __future__ import unicode_literals
 import codecs
 import logging
 import sys
-from io import BytesIO
 from threading import Lock
 
 from django import http
@@ -78,7 +77,7 @@ class LimitedStream(object):
     LimitedStream wraps another stream in order to not allow reading from it 不允许读
     past specified amount of bytes.
     '''
-    def __init__(self, stream, limit, buf_size=64 * 1024 * 1024):
+    def __init__(self, stream, limit, buf_size=64 * 1024):
         self.stream = stream
         self.remaining = limit
         self.buffer = b''
@@ -94,6 +93,9 @@ class LimitedStream(object):
         return result
 
     def read(self, size=None):
+        if size is not None and size < 0:
+            # As with files, a negative size means no limit.
+            size = None
         if size is None:
             result = self.buffer + self._read_limited()
             self.buffer = b''
@@ -108,28 +110,31 @@ class LimitedStream(object):
         return result
 
     def readline(self, size=None):
-        while b'\n' not in self.buffer and \
-              (size is None or len(self.buffer) < size):
-            # 直到读到 \n 为止
-            if size:
-                # since size is not None here, len(self.buffer) < size
-                chunk = self._read_limited(size - len(self.buffer))
+        if size is not None and size < 0:
+            size = None
+        # Read at most buf_size bytes at a time while looking for the end of
+        # the line, rather than the whole of the remaining stream.
+        chunks = []
+        length = 0
+        data = self.buffer
+        while True:
+            end = data.find(b'\n') + 1 or len(data)
+            if size is not None:
+                end = min(end, size - length)
+            chunks.append(data[:end])
+            length += end
+            if (end < len(data) or data[end - 1:end] == b'\n' or
+                    (size is not None and length >= size)):
+                self.buffer = data[end:]
+                break
+            if size is None:
+                data = self._read_limited(self.buf_size)
             else:
-                chunk = self._read_limited()
-
-            if not chunk:
+                data = self._read_limited(min(self.buf_size, size - length))
+            if not data:
+                self.buffer = b''
                 break
-
-            self.buffer += chunk
-
-        sio = BytesIO(self.buffer)
-        if size:
-            line = sio.readline(size)
-        else:
-            line = sio.readline()
-
-        self.buffer = sio.read() # 把剩下的数据放入 buffer
-        return line
+        return b''.join(chunks)
 
 继承自 http.HttpRequest
 class WSGIRequest(http.HttpRequest):
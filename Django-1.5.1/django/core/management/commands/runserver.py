@@ -26,6 +26,15 @@ class Command(BaseCommand):
             help='Tells Django to NOT use threading.'),
         make_option('--noreload', action='store_false', dest='use_reloader', default=True,
             help='Tells Django to NOT use the auto-reloader.'),
+        make_option('--threads', type='int', dest='threads', default=0,
+            help='Handles connections in a pool of this many threads, rather '
+                 'than in a new thread for each one.'),
+        make_option('--processes', type='int', dest='processes', default=1,
+            help='Forks this many server processes. Requires --noreload.'),
+        make_option('--keep-alive', type='float', dest='keep_alive', default=0,
+            help='Keeps idle HTTP/1.1 connections open for this many seconds.'),
+        make_option('--backlog', type='int', dest='backlog', default=None,
+            help='The maximum number of connections waiting to be accepted.'),
     )
     help = "Starts a lightweight Web server for development."
     args = '[optional port number, or ipaddr:port]'
@@ -46,6 +55,17 @@ class Command(BaseCommand):
             raise CommandError('Your Python does not support IPv6.')
         if args:
             raise CommandError('Usage is runserver %s' % self.args)
+        use_threading = options.get('use_threading', True)
+        if options.get('threads') and not use_threading:
+            raise CommandError('--threads and --nothreading are exclusive.')
+        if options.get('keep_alive') and not use_threading:
+            # A single thread would be tied up by each idle connection.
+            raise CommandError('--keep-alive requires threading.')
+        if options.get('processes', 1) > 1:
+            if not hasattr(os, 'fork'):
+                raise CommandError('--processes is not supported on this platform.')
+            if options.get('use_reloader', True):
+                raise CommandError('--processes requires --noreload.')
         self._raw_ipv6 = False
         if not addrport:
             self.addr = ''
@@ -112,7 +132,11 @@ class Command(BaseCommand):
         try:
             handler = self.get_handler(*args, **options)
             run(self.addr, int(self.port), handler,
-                ipv6=self.use_ipv6, threading=threading)
+                ipv6=self.use_ipv6, threading=threading,
+                threads=options.get('threads'),
+                processes=options.get('processes', 1),
+                keep_alive=options.get('keep_alive'),
+                backlog=options.get('backlog'))
         except WSGIServerException as e:
             # Use helpful error messages instead of ugly tracebacks.
             ERRORS = {
@@ -15,8 +15,10 @@ from __future__ import unicode_literals
 
 
 import os
+import signal
 import socket
 import sys
+import threading
 import traceback
 
 try:
@@ -24,12 +26,13 @@ try:
 except ImportError:     # Python 2
     from urlparse import urljoin
 
-from django.utils.six.moves import socketserver
+from django.utils.six.moves import queue, socketserver
 from wsgiref import simple_server
 from wsgiref.util import FileWrapper   # for backwards compatibility
 
 import django
 from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.wsgi import LimitedStream
 from django.core.management.color import color_style
 from django.core.wsgi import get_wsgi_application
 from django.utils.importlib import import_module
@@ -95,6 +98,10 @@ class WSGIServerException(Exception):
 class ServerHandler(simple_server.ServerHandler, object):
     error_status = str("500 INTERNAL SERVER ERROR")
 
+    # Set by WSGIRequestHandler when the connection may be kept open after
+    # this response.
+    keep_alive = False
+
     def write(self, data):
         """'write()' callable as specified by PEP 3333"""
 
@@ -132,11 +139,48 @@ class ServerHandler(simple_server.ServerHandler, object):
         super(ServerHandler, self).error_output(environ, start_response)
         return ['\n'.join(traceback.format_exception(*sys.exc_info()))]
 
+    def cleanup_headers(self):
+        super(ServerHandler, self).cleanup_headers()
+        if not self.keep_alive:
+            return
+        request_handler = self.request_handler
+        # The client can only tell where this response ends, and the next
+        # one starts, if its length is known.
+        if 'Content-Length' not in self.headers:
+            request_handler.close_connection = True
+        if request_handler.close_connection:
+            self.headers['Connection'] = 'close'
+        elif request_handler.request_version == 'HTTP/1.0':
+            self.headers['Connection'] = 'keep-alive'
+
+    def handle_error(self):
+        # A response that failed half-way can't be followed by another one.
+        if self.keep_alive:
+            self.request_handler.close_connection = True
+        super(ServerHandler, self).handle_error()
+
+    def _buffer_result(self):
+        """
+        Returns whether the response should be joined up before sending it,
+        so that its Content-Length is known and the connection can be kept
+        open. Streaming responses and files are still sent as they come.
+        """
+        if not self.keep_alive or 'Content-Length' in self.headers:
+            return False
+        if isinstance(self.result, (list, tuple)):
+            return True
+        return getattr(self.result, 'streaming', True) is False
+
     # Backport of http://hg.python.org/cpython/rev/d5af1b235dab. See #16241.
     # This can be removed when support for Python <= 2.7.3 is deprecated.
     def finish_response(self):
         try:
-            if not self.result_is_file() or not self.sendfile():
+            if self._buffer_result():
+                data = b''.join(self.result)
+                self.headers['Content-Length'] = str(len(data))
+                self.write(data)
+                self.finish_content()
+            elif not self.result_is_file() or not self.sendfile():
                 for data in self.result:
                     self.write(data)
                 self.finish_content()
@@ -147,9 +191,19 @@ class ServerHandler(simple_server.ServerHandler, object):
 class WSGIServer(simple_server.WSGIServer, object):
     """BaseHTTPServer that implements the Python WSGI protocol""" 实现 WSGI
 
+    # Seconds an idle HTTP/1.1 connection is kept open for, waiting for the
+    # next request. None closes every connection after one response.
+    keep_alive = None
+
     def __init__(self, *args, **kwargs):
         if kwargs.pop('ipv6', False):
             self.address_family = socket.AF_INET6
+        keep_alive = kwargs.pop('keep_alive', None)
+        if keep_alive:
+            self.keep_alive = keep_alive
+        backlog = kwargs.pop('backlog', None)
+        if backlog:
+            self.request_queue_size = backlog
         super(WSGIServer, self).__init__(*args, **kwargs)
 
     def server_bind(self):
@@ -161,6 +215,56 @@ class WSGIServer(simple_server.WSGIServer, object):
         self.setup_environ()
 
 
+class ThreadPoolMixIn(object):
+    """
+    Mix-in class to handle each connection in one of a fixed pool of threads,
+    rather than in a new thread per connection as ThreadingMixIn does.
+    Accepted connections wait in a queue as long as the pool; once that is
+    full, further ones wait in the listen backlog.
+    """
+    pool_size = 8
+
+    def __init__(self, *args, **kwargs):
+        super(ThreadPoolMixIn, self).__init__(*args, **kwargs)
+        self._connections = queue.Queue(self.pool_size)
+
+    def serve_forever(self, *args, **kwargs):
+        # The threads are started here rather than in __init__ so that each
+        # process gets its own when the server is shared between forks.
+        workers = []
+        for i in range(self.pool_size):
+            worker = threading.Thread(target=self.process_connections)
+            worker.daemon = True
+            worker.start()
+            workers.append(worker)
+        try:
+            super(ThreadPoolMixIn, self).serve_forever(*args, **kwargs)
+        finally:
+            # Stop the idle workers. With every worker busy and the queue
+            # full, don't wait for room: the workers are daemon threads.
+            for worker in workers:
+                try:
+                    self._connections.put_nowait(None)
+                except queue.Full:
+                    break
+
+    def process_connections(self):
+        while True:
+            connection = self._connections.get()
+            if connection is None:
+                return
+            request, client_address = connection
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.close_request(request)
+
+    def process_request(self, request, client_address):
+        self._connections.put((request, client_address))
+
+
 class WSGIRequestHandler(simple_server.WSGIRequestHandler, object):
 
     def __init__(self, *args, **kwargs):
@@ -176,6 +280,69 @@ class WSGIRequestHandler(simple_server.WSGIRequestHandler, object):
         # Short-circuit parent method to not call socket.getfqdn
         return self.client_address[0]
 
+    def handle(self):
+        """
+        Handles a single request, or with keep-alive enabled on the server,
+        one request after another until either side closes the connection.
+        Pipelined requests are read from the buffered input in turn.
+        """
+        if not getattr(self.server, 'keep_alive', None):
+            return super(WSGIRequestHandler, self).handle()
+        self.protocol_version = str('HTTP/1.1')
+        self.close_connection = False
+        # Headers and body are written separately; without this, Nagle's
+        # algorithm holds the body back until the client acknowledges the
+        # headers, which it delays in turn on a persistent connection.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        while not self.close_connection:
+            self.handle_one_request()
+
+    def handle_one_request(self):
+        # The timeout applies to the headers as well as to the request line,
+        # so that a client that stops sending them doesn't hold on to a
+        # worker thread.
+        self.connection.settimeout(self.server.keep_alive)
+        try:
+            self.raw_requestline = self.rfile.readline(65537)
+            if len(self.raw_requestline) > 65536:
+                self.requestline = self.request_version = self.command = ''
+                self.send_error(414)
+                self.close_connection = True
+                return
+            if not self.raw_requestline:
+                self.close_connection = True
+                return
+            if not self.parse_request(): # An error code has been sent, just exit
+                self.close_connection = True
+                return
+        except socket.timeout:
+            self.close_connection = True
+            return
+        self.connection.settimeout(None)
+
+        # The body is only read through a LimitedStream, so whatever the
+        # application leaves unread can be skipped before the next request.
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = 0
+            self.close_connection = True
+        if self.headers.get('Transfer-Encoding'):
+            self.close_connection = True
+        body = LimitedStream(self.rfile, length)
+
+        handler = ServerHandler(body, self.wfile, self.get_stderr(), self.get_environ())
+        handler.request_handler = self      # backpointer for logging
+        handler.keep_alive = True
+        handler.http_version = '1.1'
+        handler.run(self.server.get_app())
+
+        if not self.close_connection:
+            if body.remaining > 65536:
+                self.close_connection = True
+            else:
+                body.read()
+
     def log_message(self, format, *args):
         # Don't bother logging requests for admin images or the favicon.
         if (self.path.startswith(self.admin_static_prefix)
@@ -205,14 +372,68 @@ class WSGIRequestHandler(simple_server.WSGIRequestHandler, object):
         sys.stderr.write(msg)
 
 
-def run(addr, port, wsgi_handler, ipv6=False, threading=False):
+def run(addr, port, wsgi_handler, ipv6=False, threading=False, threads=None,
+        processes=1, keep_alive=None, backlog=None):
+    """
+    Serves wsgi_handler on addr:port until interrupted.
+
+    With ``threading``, each connection is handled in a thread of its own,
+    or in one of a pool of ``threads`` if that is given. ``processes`` above 1
+    forks that many processes serving the same listening socket.
+    ``keep_alive`` is the number of seconds idle HTTP/1.1 connections are
+    kept open for, and ``backlog`` the size of the listen queue.
+    """
     server_address = (addr, port)
 
-    if threading:
+    if threading and threads:
+        httpd_cls = type(str('WSGIServer'), (ThreadPoolMixIn, WSGIServer),
+                         {'pool_size': threads})
+    elif threading:
         httpd_cls = type(str('WSGIServer'), (socketserver.ThreadingMixIn, WSGIServer), {})
     else:
         httpd_cls = WSGIServer
 
-    httpd = httpd_cls(server_address, WSGIRequestHandler, ipv6=ipv6)
+    httpd = httpd_cls(server_address, WSGIRequestHandler, ipv6=ipv6,
+                      keep_alive=keep_alive, backlog=backlog)
     httpd.set_app(wsgi_handler)
-    httpd.serve_forever() 永久运行
+    if processes > 1:
+        serve_forked(httpd, processes)
+    else:
+        httpd.serve_forever() 永久运行
+
+
+def serve_forked(httpd, processes):
+    """
+    Forks ``processes`` children that all serve from the listening socket of
+    ``httpd``, and waits for them. Interrupting the parent stops them all.
+    """
+    children = []
+    for i in range(processes):
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                httpd.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            except Exception:
+                traceback.print_exc()
+                status = 1
+            os._exit(status)
+        children.append(pid)
+
+    def terminate(signum, frame):
+        sys.exit(0)
+    # Make sure the children are stopped along with the parent.
+    signal.signal(signal.SIGTERM, terminate)
+    try:
+        while children:
+            pid, status = os.wait()
+            children.remove(pid)
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        httpd.server_close()
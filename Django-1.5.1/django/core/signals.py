@@ -3,3 +3,5 @@ from django.dispatch import Signal
 request_started = Signal()
 request_finished = Signal()
 got_request_exception = Signal(providing_args=["request"])
+cache_operation = Signal(providing_args=["alias", "operation", "key", "hit", "duration", "error"])
+request_resolved = Signal(providing_args=["request", "resolver_match", "duration"])
@@ -88,7 +88,11 @@ def get_cookie_signer(salt='django.core.signing.get_cookie_signer'):
     except AttributeError as e:
         raise ImproperlyConfigured(
             'Error importing cookie signer %s: "%s"' % (modpath, e))
-    return Signer('django.http.cookies' + settings.SECRET_KEY, salt=salt)
+    kwargs = {}
+    if settings.SECRET_KEY_FALLBACKS:
+        kwargs['fallback_keys'] = ['django.http.cookies' + key
+                                   for key in settings.SECRET_KEY_FALLBACKS]
+    return Signer('django.http.cookies' + settings.SECRET_KEY, salt=salt, **kwargs)
 
 
 class JSONSerializer(object):
@@ -136,7 +140,8 @@ def dumps(obj, key=None, salt='django.core.signing', serializer=JSONSerializer,
     return TimestampSigner(key, salt=salt).sign(base64d)
 
 
-def loads(s, key=None, salt='django.core.signing', serializer=JSONSerializer, max_age=None):
+def loads(s, key=None, salt='django.core.signing', serializer=JSONSerializer,
+          max_age=None, fallback_keys=None):
     """
     Reverse of dumps(), raises BadSignature if signature fails.
 
@@ -144,7 +149,8 @@ def loads(s, key=None, salt='django.core.signing', serializer=JSONSerializer, ma
     """
     # TimestampSigner.unsign always returns unicode but base64 and zlib
     # compression operate on bytes.
-    base64d = force_bytes(TimestampSigner(key, salt=salt).unsign(s, max_age=max_age))
+    signer = TimestampSigner(key, salt=salt, fallback_keys=fallback_keys)
+    base64d = force_bytes(signer.unsign(s, max_age=max_age))
     decompress = False
     if base64d[:1] == b'.':
         # It's compressed; uncompress it first
@@ -158,15 +164,20 @@ def loads(s, key=None, salt='django.core.signing', serializer=JSONSerializer, ma
 
 class Signer(object):
 
-    def __init__(self, key=None, sep=':', salt=None):
+    def __init__(self, key=None, sep=':', salt=None, fallback_keys=None):
         # Use of native strings in all versions of Python
         self.sep = str(sep)
         self.key = str(key or settings.SECRET_KEY)
+        # Values signed with a fallback key are accepted by unsign(), but
+        # sign() only ever uses self.key.
+        if fallback_keys is None:
+            fallback_keys = settings.SECRET_KEY_FALLBACKS if key is None else ()
+        self.fallback_keys = [str(k) for k in fallback_keys]
         self.salt = str(salt or
             '%s.%s' % (self.__class__.__module__, self.__class__.__name__))
 
-    def signature(self, value):
-        signature = base64_hmac(self.salt + 'signer', value, self.key)
+    def signature(self, value, key=None):
+        signature = base64_hmac(self.salt + 'signer', value, key or self.key)
         # Convert the signature from bytes to str only on Python 3
         return force_str(signature)
 
@@ -179,8 +190,9 @@ class Signer(object):
         if not self.sep in signed_value:
             raise BadSignature('No "%s" found in value' % self.sep)
         value, sig = signed_value.rsplit(self.sep, 1)
-        if constant_time_compare(sig, self.signature(value)):
-            return force_text(value)
+        for key in [self.key] + self.fallback_keys:
+            if constant_time_compare(sig, self.signature(value, key)):
+                return force_text(value)
         raise BadSignature('Signature "%s" does not match' % sig)
 
 
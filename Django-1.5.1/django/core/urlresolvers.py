@@ -8,6 +8,8 @@ a string) and returns a tuple in this format:
 """
 from __future__ import unicode_literals
 
+import copy
+import itertools
 import re
 from threading import local
 
@@ -29,6 +31,23 @@ _ns_resolver_cache = {} # Maps namespaces to RegexURLResolver instances.   names
 
 _callable_cache = {} # Maps view and url pattern names to their view functions. view url pattern view functions 映射
 
+_prefix_norm_cache = {} # Maps script prefixes to their normalized form.
+
+# Each resolver caches the URLs it reverses without arguments; that cache is
+# emptied if it ever holds this many.
+_REVERSE_RESULTS_SIZE = 1000
+
+# Maps (urlconf, path, language) to [ResolverMatch, last use] for the paths
+# whose match has no arguments. Paths carrying arguments (an ID, a slug) are
+# too many to be worth remembering.
+_resolve_cache = {}
+_resolve_uses = itertools.count()
+_invalid_paths = set() # (urlconf, path, language) keys that didn't resolve.
+
+# When _resolve_cache holds this many entries, the least recently used one is
+# dropped to make room; _invalid_paths is emptied instead.
+_RESOLVE_CACHE_SIZE = 1000
+
 # SCRIPT_NAME prefixes for each thread are stored here. If there's no entry for
 # the current thread (which is the only one we ever access), it is assumed to
 # be empty.
@@ -157,6 +176,12 @@ def get_ns_resolver(ns_pattern, resolver):
 
 get_ns_resolver = memoize(get_ns_resolver, _ns_resolver_cache, 2)
 
+def normalize_prefix(prefix):
+    # Returns the (format string, argument names) pair for a script prefix.
+    return normalize(urlquote(prefix))[0]
+
+normalize_prefix = memoize(normalize_prefix, _prefix_norm_cache, 1)
+
 def get_mod_func(callback):
     # Converts 'django.views.news.stories.story_detail' to
     # ['django.views.news.stories', 'story_detail']
@@ -166,6 +191,72 @@ def get_mod_func(callback):
         return callback, ''
     return callback[:dot], callback[dot+1:]
 
+# Inline flags such as (?i) change how the whole pattern matches.
+_inline_flags_re = re.compile(r'\(\?[iLmsux]')
+
+def _has_top_level_alternation(regex):
+    """
+    Returns True if ``regex`` contains a "|" outside of any group or
+    character class, i.e. if its leading "^" only anchors the first branch.
+    """
+    depth = 0
+    pos = 0
+    while pos < len(regex):
+        char = regex[pos]
+        if char == '\\':
+            pos += 1
+        elif char == '[':
+            # Skip the character class; a "]" right after "[" or "[^" is a
+            # literal member of it.
+            pos += 1
+            if regex[pos:pos + 1] == '^':
+                pos += 1
+            if regex[pos:pos + 1] == ']':
+                pos += 1
+            while pos < len(regex) and regex[pos] != ']':
+                if regex[pos] == '\\':
+                    pos += 1
+                pos += 1
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return True
+        pos += 1
+    return False
+
+def _literal_prefix(regex):
+    """
+    Returns the literal text that every path matched by ``regex`` must start
+    with, or '' if there is none or it can't be worked out safely.
+
+    '^articles/(?P<year>[0-9]{4})/$' gives 'articles/'.
+    """
+    if (not regex.startswith('^') or _inline_flags_re.search(regex)
+            or _has_top_level_alternation(regex)):
+        return ''
+    prefix = []
+    pos = 1
+    while pos < len(regex):
+        char = regex[pos]
+        if char == '\\':
+            # \d, \w, \1, \A... are not literals; \. \- \/ are.
+            char = regex[pos + 1:pos + 2]
+            if not char or char.isalnum():
+                break
+            step = 2
+        elif char in '.^$*+?{}[]|()':
+            break
+        else:
+            step = 1
+        if regex[pos + step:pos + step + 1] in ('*', '+', '?', '{'):
+            # A quantified character may be absent or repeated.
+            break
+        prefix.append(char)
+        pos += step
+    return ''.join(prefix)
+
 class LocaleRegexProvider(object):
     """
     区域相关的正则表达式, 会根据地区的不同返回不同的正则表达式, django 内部维护. 在一般英文的 url 中用处不大.
@@ -186,7 +277,12 @@ class LocaleRegexProvider(object):
         Returns a compiled regular expression, depending upon the activated
         language-code.
         """
-        language_code = get_language()
+        if isinstance(self._regex, six.string_types):
+            # Untranslated regexes are the same in every language, so they
+            # are only compiled once.
+            language_code = None
+        else:
+            language_code = get_language()
 
         if language_code not in self._regex_dict:
             if isinstance(self._regex, six.string_types):
@@ -281,6 +377,10 @@ class RegexURLResolver(LocaleRegexProvider):
         self._reverse_dict = {}
         self._namespace_dict = {}
         self._app_dict = {}
+        self._dispatch_dict = {}
+        self._reverse_templates = {}
+        self._reverse_results = {}
+        self._language_prefix_patterns_used = None
 
     def __repr__(self):
         if isinstance(self.urlconf_name, list) and len(self.urlconf_name):
@@ -365,6 +465,48 @@ class RegexURLResolver(LocaleRegexProvider):
 
         return self._app_dict[language_code]
 
+    def _build_dispatch(self):
+        """
+        Files the indexes of url_patterns into a trie keyed by the literal
+        prefix of each pattern's regex, so that resolve() only has to try
+        the patterns that can possibly match a given path.
+        """
+        patterns = list(self.url_patterns)
+        root = ({}, [])
+        for index, pattern in enumerate(patterns):
+            try:
+                prefix = _literal_prefix(pattern.regex.pattern)
+            except ImproperlyConfigured:
+                # Leave invalid regexes to fail when resolve() reaches them.
+                prefix = ''
+            node = root
+            for char in prefix:
+                node = node[0].setdefault(char, ({}, []))
+            node[1].append(index)
+        return patterns, root
+
+    @property
+    def _dispatch(self):
+        language_code = get_language()
+        if language_code not in self._dispatch_dict:
+            self._dispatch_dict[language_code] = self._build_dispatch()
+        return self._dispatch_dict[language_code]
+
+    def _candidates(self, root, path):
+        """
+        Returns the indexes of the patterns whose literal prefix starts
+        ``path``, in urlconf order.
+        """
+        node = root
+        indexes = list(node[1])
+        for char in path:
+            node = node[0].get(char)
+            if node is None:
+                break
+            indexes.extend(node[1])
+        indexes.sort()
+        return indexes
+
     # 最关键的函数
     def resolve(self, path):
 
@@ -377,7 +519,12 @@ class RegexURLResolver(LocaleRegexProvider):
             # 去除前缀
             new_path = path[match.end():]
 
-            for pattern in self.url_patterns: # 穷举所有的 url pattern
+            # Only the patterns whose literal prefix starts new_path can
+            # match it; try those in urlconf order.
+            patterns, root = self._dispatch
+            failed = {}
+            for index in self._candidates(root, new_path):
+                pattern = patterns[index]
                 # pattern 是 RegexURLPattern 实例
                 try:
 
@@ -390,13 +537,7 @@ RegexURLPattern 和 RegexURLResolver 都有一个 resolve() 函数, 所以, 下
                     sub_match = pattern.resolve(new_path)
 
                 except Resolver404 as e:
-                    # 搜集已经尝试过的匹配器, 在出错的页面中会显示错误信息
-                    sub_tried = e.args[0].get('tried')
-
-                    if sub_tried is not None:
-                        tried.extend([[pattern] + t for t in sub_tried])
-                    else:
-                        tried.append([pattern])
+                    failed[index] = e.args[0].get('tried')
                 else:
                     # 是否成功匹配
                     if sub_match:
@@ -415,6 +556,12 @@ RegexURLPattern 和 RegexURLResolver 都有一个 resolve() 函数, 所以, 下
                             sub_match.url_name, self.app_name or sub_match.app_name,
                             [self.namespace] + sub_match.namespaces)
 
+            # 搜集已经尝试过的匹配器, 在出错的页面中会显示错误信息
+            for index, pattern in enumerate(patterns):
+                sub_tried = failed.get(index)
+                if sub_tried is not None:
+                    tried.extend([[pattern] + t for t in sub_tried])
+                else:
                     tried.append([pattern])
 
             # 如果没有匹配成功的项目, 将异常
@@ -443,6 +590,18 @@ RegexURLPattern 和 RegexURLResolver 都有一个 resolve() 函数, 所以, 下
         # patterns 实际上是 RegexURLPattern 对象和 RegexURLResolver 对象的集合
         return patterns
 
+    @property
+    def language_prefix_patterns_used(self):
+        """
+        Returns True if a LocaleRegexURLResolver (see i18n_patterns()) is
+        among the URL patterns of this resolver. This is only worked out once.
+        """
+        if self._language_prefix_patterns_used is None:
+            self._language_prefix_patterns_used = any(
+                isinstance(pattern, LocaleRegexURLResolver)
+                for pattern in self.url_patterns)
+        return self._language_prefix_patterns_used
+
     def _resolve_special(self, view_type):
         callback = getattr(self.urlconf_module, 'handler%s' % view_type, None)
         if not callback:
@@ -471,30 +630,44 @@ RegexURLPattern 和 RegexURLResolver 都有一个 resolve() 函数, 所以, 下
             lookup_view = get_callable(lookup_view, True)
         except (ImportError, AttributeError) as e:
             raise NoReverseMatch("Error importing '%s': %s." % (lookup_view, e))
-        possibilities = self.reverse_dict.getlist(lookup_view)
+        language_code = get_language()
+        if not args and not kwargs:
+            try:
+                return self._reverse_results[lookup_view, _prefix, language_code]
+            except KeyError:
+                pass
 
-        prefix_norm, prefix_args = normalize(urlquote(_prefix))[0]
-        for possibility, pattern, defaults in possibilities:
-            for result, params in possibility:
-                if args:
-                    if len(args) != len(params) + len(prefix_args):
-                        continue
-                    unicode_args = [force_text(val) for val in args]
-                    candidate = (prefix_norm + result) % dict(zip(prefix_args + params, unicode_args))
-                else:
-                    if set(kwargs.keys()) | set(defaults.keys()) != set(params) | set(defaults.keys()) | set(prefix_args):
-                        continue
-                    matches = True
-                    for k, v in defaults.items():
-                        if kwargs.get(k, v) != v:
-                            matches = False
-                            break
-                    if not matches:
-                        continue
-                    unicode_kwargs = dict([(k, force_text(v)) for (k, v) in kwargs.items()])
-                    candidate = (prefix_norm.replace('%', '%%') + result) % unicode_kwargs
-                if re.search('^%s%s' % (prefix_norm, pattern), candidate, re.UNICODE):
-                    return candidate
+        # The candidate templates only depend on the view, the prefix and
+        # which arguments were passed, so they are worked out once for each
+        # such signature.
+        signature = len(args) if args else frozenset(kwargs)
+        key = (lookup_view, _prefix, signature, language_code)
+        try:
+            templates = self._reverse_templates[key]
+        except KeyError:
+            templates = self._reverse_templates[key] = self._reverse_templates_for(
+                lookup_view, _prefix, args, kwargs)
+
+        for template, params, regex, defaults in templates:
+            if args:
+                unicode_args = [force_text(val) for val in args]
+                candidate = template % dict(zip(params, unicode_args))
+            else:
+                matches = True
+                for k, v in defaults.items():
+                    if kwargs.get(k, v) != v:
+                        matches = False
+                        break
+                if not matches:
+                    continue
+                unicode_kwargs = dict([(k, force_text(v)) for (k, v) in kwargs.items()])
+                candidate = template % unicode_kwargs
+            if regex.search(candidate):
+                if not args and not kwargs:
+                    if len(self._reverse_results) >= _REVERSE_RESULTS_SIZE:
+                        self._reverse_results.clear()
+                    self._reverse_results[lookup_view, _prefix, language_code] = candidate
+                return candidate
         # lookup_view can be URL label, or dotted path, or callable, Any of
         # these can be passed in at the top, but callables are not friendly in
         # error messages.
@@ -507,6 +680,32 @@ RegexURLPattern 和 RegexURLResolver 都有一个 resolve() 函数, 所以, 下
         raise NoReverseMatch("Reverse for '%s' with arguments '%s' and keyword "
                 "arguments '%s' not found." % (lookup_view_s, args, kwargs))
 
+    def _reverse_templates_for(self, lookup_view, _prefix, args, kwargs):
+        """
+        Returns (template, params, regex, defaults) tuples for the ways of
+        reversing lookup_view with these argument names or this number of
+        arguments, in the order they must be tried. Filling ``template`` with
+        the arguments gives a candidate URL, which ``regex`` must match.
+        """
+        templates = []
+        prefix_norm, prefix_args = normalize_prefix(_prefix)
+        for possibility, pattern, defaults in self.reverse_dict.getlist(lookup_view):
+            regex = None
+            for result, params in possibility:
+                if args:
+                    if len(args) != len(params) + len(prefix_args):
+                        continue
+                    template = prefix_norm + result
+                    params = prefix_args + params
+                else:
+                    if set(kwargs.keys()) | set(defaults.keys()) != set(params) | set(defaults.keys()) | set(prefix_args):
+                        continue
+                    template = prefix_norm.replace('%', '%%') + result
+                if regex is None:
+                    regex = re.compile('^%s%s' % (prefix_norm, pattern), re.UNICODE)
+                templates.append((template, params, regex, defaults))
+        return templates
+
 class LocaleRegexURLResolver(RegexURLResolver):
     """
     A URL resolver that always matches the active language code as URL prefix.
@@ -515,8 +714,14 @@ class LocaleRegexURLResolver(RegexURLResolver):
     function to always return the active language-code as regex.
     """
     def __init__(self, urlconf_name, default_kwargs=None, app_name=None, namespace=None):
+        from django.conf import settings
         super(LocaleRegexURLResolver, self).__init__(
             None, urlconf_name, default_kwargs, app_name, namespace)
+        # Compile the prefixes of the available languages up front. Those of
+        # other languages, activated by hand, are compiled when first used.
+        for language_code, name in settings.LANGUAGES:
+            self._regex_dict[language_code] = re.compile(
+                '^%s/' % language_code, re.UNICODE)
 
     @property
     def regex(self):
@@ -535,7 +740,27 @@ def resolve(path, urlconf=None):
 
     # get_resolver() 会返回 RegexURLResolver 实例, 即 url 匹配处理器
     # 并调用 RegexURLResolver.resolve(path) 启动解析过程
-    return get_resolver(urlconf).resolve(path)
+    key = (urlconf, path, get_language())
+    try:
+        entry = _resolve_cache[key]
+    except KeyError:
+        match = get_resolver(urlconf).resolve(path)
+        if match.args or match.kwargs:
+            return match
+        if len(_resolve_cache) >= _RESOLVE_CACHE_SIZE:
+            # Copy the items first; other threads may change the cache.
+            oldest = min(list(six.iteritems(_resolve_cache)),
+                         key=lambda item: item[1][1])[0]
+            _resolve_cache.pop(oldest, None)
+        _resolve_cache[key] = [match, next(_resolve_uses)]
+    else:
+        match = entry[0]
+        entry[1] = next(_resolve_uses)
+    # Callers may change the match they are given, so each gets a copy.
+    match = copy.copy(match)
+    match.kwargs = dict(match.kwargs)
+    match.namespaces = list(match.namespaces)
+    return match
 
 def reverse(viewname, urlconf=None, args=None, kwargs=None, prefix=None, current_app=None):
     if urlconf is None:
@@ -599,9 +824,15 @@ def clear_url_caches():
     global _resolver_cache
     global _ns_resolver_cache
     global _callable_cache
+    global _prefix_norm_cache
+    global _resolve_cache
+    global _invalid_paths
     _resolver_cache.clear()
     _ns_resolver_cache.clear()
     _callable_cache.clear()
+    _prefix_norm_cache.clear()
+    _resolve_cache.clear()
+    _invalid_paths.clear()
 
 def set_script_prefix(prefix):
     """
@@ -648,9 +879,21 @@ def is_valid_path(path, urlconf=None):
 
     This is a convenience method to make working with "is this a match?" cases
     easier, avoiding unnecessarily indented try...except blocks.
+
+    Paths that don't resolve are remembered, so that checking them again
+    (as CommonMiddleware does for each 404 when APPEND_SLASH is set) doesn't
+    try every URL pattern again.
     """
+    if urlconf is None:
+        urlconf = get_urlconf()
+    key = (urlconf, path, get_language())
+    if key in _invalid_paths:
+        return False
     try:
         resolve(path, urlconf)
         return True
     except Resolver404:
+        if len(_invalid_paths) >= _RESOLVE_CACHE_SIZE:
+            _invalid_paths.clear()
+        _invalid_paths.add(key)
         return False
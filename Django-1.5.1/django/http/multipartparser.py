@@ -424,15 +424,21 @@ class InterBoundaryIter(six.Iterator):
     def __init__(self, stream, boundary):
         self._stream = stream
         self._boundary = boundary
+        self._current = None
 
     def __iter__(self):
         return self
 
     def __next__(self):
+        if self._current is not None:
+            # Hand back anything the previous part held on to, in case its
+            # consumer stopped reading before reaching the boundary.
+            self._current.release()
         try:
-            return LazyStream(BoundaryIter(self._stream, self._boundary))
+            self._current = BoundaryIter(self._stream, self._boundary)
         except InputStreamExhausted:
             raise StopIteration()
+        return LazyStream(self._current)
 
 对边界敏感
 class BoundaryIter(six.Iterator):
@@ -445,6 +451,11 @@ class BoundaryIter(six.Iterator):
 
     The future calls to next() after locating the boundary will raise a
     StopIteration exception.
+
+    Chunks read from the stream are yielded as they are whenever possible:
+    the most recent chunk is held back until the next one has been searched,
+    so that a boundary straddling the two is still found, and only the short
+    seam between them is ever copied.
     """
 
     def __init__(self, stream, boundary):
@@ -452,12 +463,14 @@ class BoundaryIter(six.Iterator):
         self._boundary = boundary
         self._done = False
 
+        # Data read from the stream but not yet yielded. It never contains a
+        # whole boundary, but may end with the start of one.
+        self._held = b''
+
         # rollback an additional six bytes because the format is like
         # this: CRLF<boundary>[--CRLF] 换行
         self._rollback = len(boundary) + 6
 
-        # Try to use mx fast string search if available. Otherwise
-        # use Python find. Wrap the latter for consistency.
         unused_char = self._stream.read(1)
 
         if not unused_char:
@@ -465,12 +478,6 @@ class BoundaryIter(six.Iterator):
 
         self._stream.unget(unused_char)
 
-        try:
-            from mx.TextTools import FS
-            self._fs = FS(boundary).find
-        except ImportError:
-            self._fs = lambda data: data.find(boundary)
-
     def __iter__(self):
         return self
 
@@ -481,68 +488,101 @@ class BoundaryIter(six.Iterator):
         stream = self._stream
         rollback = self._rollback
 
-        bytes_read = 0
-        chunks = []
-
-        for bytes in stream:
-            bytes_read += len(bytes)
-            chunks.append(bytes)
-            if bytes_read > rollback:
-                break
-            if not bytes:
-                break
-        else:
-            self._done = True
-
-        if not chunks:
-            raise StopIteration()
+        while True:
+            held = self._held
+            try:
+                chunk = next(stream)
+            except StopIteration:
+                chunk = b''
 
-        chunk = b''.join(chunks)
-        boundary = self._find_boundary(chunk, len(chunk) < self._rollback)
-
-        if boundary:
-            end, next = boundary
-            stream.unget(chunk[next:])
-            self._done = True
-            return chunk[:end]
-        else:
-            # make sure we dont treat a partial boundary (and
-            # its separators) as data
-            if not chunk[:-rollback]:# and len(chunk) >= (len(self._boundary) + 6):
-                # There's nothing left, we should just return and mark as done.
+            if not chunk:
+                # The stream ended before another boundary was found.
                 self._done = True
-                return chunk
+                self._held = b''
+                if not held:
+                    raise StopIteration()
+                return held
+
+            boundary = self._find_boundary(held, chunk)
+            if boundary:
+                end, start = boundary
+                offset = len(held)
+                self._done = True
+                self._held = b''
+                stream.unget(chunk[start - offset:])
+                if end <= offset:
+                    return held[:end]
+                return held + chunk[:end - offset]
+
+            if len(chunk) >= rollback:
+                # The chunk is long enough to keep any partial boundary (and
+                # its separators) out of the held data, which can be yielded
+                # without copying.
+                self._held = chunk
+                if held:
+                    return held
             else:
-                stream.unget(chunk[-rollback:])
-                return chunk[:-rollback]
+                data = held + chunk
+                if len(data) > rollback:
+                    self._held = data[-rollback:]
+                    return data[:-rollback]
+                self._held = data
+
+    def release(self):
+        """
+        Pushes any data held back by this iterator onto the stream, so that
+        abandoning it before the boundary doesn't lose the bytes that may
+        contain it.
+        """
+        if not self._done:
+            self._done = True
+            self._stream.unget(self._held)
+            self._held = b''
 
     找到边界
-    def _find_boundary(self, data, eof = False):
+    def _find_boundary(self, held, chunk):
         """
-        Finds a multipart boundary in data.
+        Finds a multipart boundary in ``held`` followed by ``chunk``. As
+        ``held`` never contains a whole boundary, only the seam between the two
+        and ``chunk`` itself are searched.
 
         Should no boundry exist in the data None is returned instead. Otherwise
-        a tuple containing the indices of the following are returned:
+        a tuple containing the following indices into the concatenated data
+        are returned:
 
          * the end of current encapsulation
          * the start of the next encapsulation
         """
-        index = self._fs(data)
+        boundary = self._boundary
+        offset = len(held)
+        overlap = len(boundary) - 1
+
+        index = -1
+        if held and overlap:
+            tail = held[-overlap:]
+            index = (tail + chunk[:overlap]).find(boundary)
+            if index >= 0:
+                index += offset - len(tail)
         if index < 0:
-            return None
-        else:
-            end = index
-            next = index + len(self._boundary)
-
-            # backup over CRLF 换行
-            last = max(0, end-1)
-            if data[last:last+1] == b'\n':
-                end -= 1
-
-            last = max(0, end-1)
-            if data[last:last+1] == b'\r':
-                end -= 1
-            return end, next
+            index = chunk.find(boundary)
+            if index < 0:
+                return None
+            index += offset
+
+        end = index
+        next = index + len(boundary)
+
+        # backup over CRLF 换行
+        for separator in (b'\n', b'\r'):
+            if end > 0:
+                last = end - 1
+                if last < offset:
+                    byte = held[last:last + 1]
+                else:
+                    byte = chunk[last - offset:last - offset + 1]
+                if byte == separator:
+                    end -= 1
+        return end, next
 
 def exhaust(stream_or_iterable):
     """ 抽干 stream 中的所有数据,一般在出错的时候用
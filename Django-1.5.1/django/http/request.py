@@ -4,6 +4,7 @@ import copy
 import os
 import re
 import sys
+import tempfile
 import warnings
 from io import BytesIO
 from pprint import pformat
@@ -15,7 +16,8 @@ except ImportError:
 
 from django.conf import settings
 from django.core import signing
-from django.core.exceptions import SuspiciousOperation, ImproperlyConfigured
+from django.core.exceptions import (SuspiciousOperation, ImproperlyConfigured,
+    RequestDataTooBig)
 from django.core.files import uploadhandler
 from django.http.multipartparser import MultiPartParser
 from django.utils import six
@@ -190,6 +192,9 @@ class HttpRequest(object):
     @property
     def body(self):
         if not hasattr(self, '_body'):
+            if self._exceeds_memory_limit():
+                raise RequestDataTooBig(
+                    "Request body exceeded settings.DATA_UPLOAD_MAX_MEMORY_SIZE.")
             if self._read_started:
                 raise Exception("You cannot access body after reading from request's data stream")
             try:
@@ -204,6 +209,72 @@ class HttpRequest(object):
         warnings.warn('HttpRequest.raw_post_data has been deprecated. Use HttpRequest.body instead.', DeprecationWarning)
         return self.body 直接返回
 
+    def _exceeds_memory_limit(self):
+        """
+        Returns True if the body is larger than DATA_UPLOAD_MAX_MEMORY_SIZE
+        allows to be loaded into memory.
+        """
+        max_size = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        if max_size is None:
+            return False
+        try:
+            content_length = int(self.META.get('CONTENT_LENGTH') or 0)
+        except (ValueError, TypeError):
+            content_length = 0
+        return content_length > max_size
+
+    def _spool_body(self, chunk_size=64 * 1024):
+        """
+        Copies the body into a temporary file and reads from that from then
+        on, so that it can be parsed and read again without holding it in
+        memory.
+        """
+        spool = tempfile.TemporaryFile(suffix='.body', dir=settings.FILE_UPLOAD_TEMP_DIR)
+        try:
+            while True:
+                chunk = self.read(chunk_size)
+                if not chunk:
+                    break
+                spool.write(chunk)
+        except IOError as e:
+            spool.close()
+            six.reraise(UnreadablePostError, UnreadablePostError(*e.args), sys.exc_info()[2])
+        spool.seek(0)
+        self._stream = spool
+
+    def _parse_form_stream(self, stream, chunk_size=64 * 1024):
+        """
+        Builds a QueryDict from a form-encoded stream, a chunk at a time.
+        Raises RequestDataTooBig if a single field is larger than
+        DATA_UPLOAD_MAX_MEMORY_SIZE.
+        """
+        max_size = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        post = QueryDict('', mutable=True, encoding=self._encoding)
+        # The pieces of the last, possibly incomplete, field.
+        pending = []
+        pending_size = 0
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            # Only the new chunk needs searching: pending has no separators.
+            cut = max(chunk.rfind(b'&'), chunk.rfind(b';'))
+            if cut >= 0:
+                pending.append(chunk[:cut])
+                post.update(QueryDict(b''.join(pending), encoding=self._encoding))
+                chunk = chunk[cut + 1:]
+                pending = []
+                pending_size = 0
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if max_size is not None and pending_size > max_size:
+                raise RequestDataTooBig(
+                    "A request field exceeded settings.DATA_UPLOAD_MAX_MEMORY_SIZE.")
+        if pending_size:
+            post.update(QueryDict(b''.join(pending), encoding=self._encoding))
+        post._mutable = False
+        return post
+
     def _mark_post_parse_error(self):
         self._post = QueryDict('')
         self._files = MultiValueDict()
@@ -240,7 +311,19 @@ class HttpRequest(object):
                 self._mark_post_parse_error()
                 raise
         elif self.META.get('CONTENT_TYPE', '').startswith('application/x-www-form-urlencoded'):
-            self._post, self._files = QueryDict(self.body, encoding=self._encoding), MultiValueDict()
+            if hasattr(self, '_body') or not self._exceeds_memory_limit():
+                self._post, self._files = QueryDict(self.body, encoding=self._encoding), MultiValueDict()
+            else:
+                # Too big to load into memory: parse the body from disk, and
+                # leave it there to be read again.
+                self._spool_body()
+                try:
+                    self._post, self._files = self._parse_form_stream(self._stream), MultiValueDict()
+                except RequestDataTooBig:
+                    self._mark_post_parse_error()
+                    raise
+                finally:
+                    self._stream.seek(0)
         else:
             self._post, self._files = QueryDict('', encoding=self._encoding), MultiValueDict()
 
@@ -299,17 +382,37 @@ class QueryDict(MultiValueDict):
             if isinstance(query_string, bytes):
                 # query_string contains URL-encoded data, a subset of ASCII.
                 query_string = query_string.decode()
-            for key, value in parse_qsl(query_string or '',
-                                        keep_blank_values=True,
-                                        encoding=encoding):
-                self.appendlist(key, value)
+            pairs = parse_qsl(query_string or '', keep_blank_values=True,
+                              encoding=encoding)
         else:
-            for key, value in parse_qsl(query_string or '',
-                                        keep_blank_values=True):
-                self.appendlist(force_text(key, encoding, errors='replace'),
-                                force_text(value, encoding, errors='replace'))
+            pairs = self._decode_pairs(
+                parse_qsl(query_string or '', keep_blank_values=True), encoding)
+        # Collect the lists first and store them in one go, rather than going
+        # through appendlist() (and its checks and conversions) for each pair.
+        lists = {}
+        for key, value in pairs:
+            list_ = lists.get(key)
+            if list_ is None:
+                lists[key] = [value]
+            else:
+                list_.append(value)
+        dict.update(self, lists)
         self._mutable = mutable
 
+    @staticmethod
+    def _decode_pairs(pairs, encoding):
+        """
+        Decodes the bytestring (key, value) pairs from parse_qsl on Python 2.
+        Keys tend to repeat, so each distinct one is only decoded once.
+        """
+        keys = {}
+        for key, value in pairs:
+            try:
+                text_key = keys[key]
+            except KeyError:
+                text_key = keys[key] = force_text(key, encoding, errors='replace')
+            yield text_key, force_text(value, encoding, errors='replace')
+
     @property
     def encoding(self):
         if self._encoding is None:
@@ -336,15 +439,22 @@ class QueryDict(MultiValueDict):
 
     def __copy__(self):
         result = self.__class__('', mutable=True, encoding=self.encoding)
+        # Keys and values were already converted to text on the way in.
         for key, value in six.iterlists(self):
-            result.setlist(key, value)
+            dict.__setitem__(result, key, list(value))
         return result
 
     def __deepcopy__(self, memo):
         result = self.__class__('', mutable=True, encoding=self.encoding)
         memo[id(self)] = result
         for key, value in six.iterlists(self):
-            result.setlist(copy.deepcopy(key, memo), copy.deepcopy(value, memo))
+            if all(isinstance(elt, six.text_type) for elt in value):
+                # Strings are immutable, so a new list is as good as a deep
+                # copy and a lot cheaper to make.
+                value = list(value)
+            else:
+                value = copy.deepcopy(value, memo)
+            dict.__setitem__(result, copy.deepcopy(key, memo), value)
         return result
 
     def setlist(self, key, list_):
@@ -56,11 +56,15 @@ CACHE_MIDDLEWARE_SECONDS 控制着 cache 的时间
 
 """
 
+import hashlib
+
 from django.conf import settings
 
 # 要看懂这个,还需要看懂 core.cache 
 from django.core.cache import get_cache, DEFAULT_CACHE_ALIAS
-from django.utils.cache import get_cache_key, learn_cache_key, patch_response_headers, get_max_age
+from django.http import HttpResponse
+from django.utils.cache import (get_cached_response, learn_cache_key,
+    patch_response_headers, get_max_age, tag_cached_response)
 
 
 class UpdateCacheMiddleware(object):
@@ -81,6 +85,7 @@ class UpdateCacheMiddleware(object):
         self.cache_anonymous_only = getattr(settings, 'CACHE_MIDDLEWARE_ANONYMOUS_ONLY', False)
         self.cache_alias = settings.CACHE_MIDDLEWARE_ALIAS
         self.cache = get_cache(self.cache_alias)
+        self.streaming_max_size = settings.CACHE_MIDDLEWARE_STREAMING_MAX_SIZE
 
     def _session_accessed(self, request):
         try:
@@ -110,7 +115,9 @@ class UpdateCacheMiddleware(object):
             # We don't need to update the cache, just return.
             return response
 
-        if response.streaming or response.status_code != 200: # 如果状态码不是 200,直接返回
+        if response.status_code != 200: # 如果状态码不是 200,直接返回
+            return response
+        if response.streaming and self.streaming_max_size is None:
             return response
 
         # Try to get the timeout from the "max-age" section of the "Cache-
@@ -126,7 +133,11 @@ class UpdateCacheMiddleware(object):
         patch_response_headers(response, timeout) # patch 修补, 修改时间用
         if timeout:
             cache_key = learn_cache_key(request, response, timeout, self.key_prefix, cache=self.cache)
-            if hasattr(response, 'render') and callable(response.render):
+            tag_cached_response(request, response, self.key_prefix, cache=self.cache)
+            if response.streaming:
+                response.streaming_content = self._cache_streaming_content(
+                    response, response.streaming_content, cache_key, timeout)
+            elif hasattr(response, 'render') and callable(response.render):
                 response.add_post_render_callback(
                     lambda r: self.cache.set(cache_key, r, timeout)
                 )
@@ -134,6 +145,41 @@ class UpdateCacheMiddleware(object):
                 self.cache.set(cache_key, response, timeout)
         return response
 
+    def _cache_streaming_content(self, response, content, cache_key, timeout):
+        """
+        Passes the content of a streaming response through, keeping a copy.
+        Once all of it has been sent, a regular response with that content is
+        cached, unless it turned out bigger than CACHE_MIDDLEWARE_STREAMING_MAX_SIZE.
+        The ETag can only be worked out by then, so only the cached copy gets
+        one.
+        """
+        chunks = []
+        size = 0
+        etag = None
+        if settings.USE_ETAGS and not response.has_header('ETag'):
+            etag = hashlib.md5()
+        for chunk in content:
+            if chunks is not None:
+                size += len(chunk)
+                if size > self.streaming_max_size:
+                    # Too big to cache; stop keeping a copy.
+                    chunks = etag = None
+                else:
+                    chunks.append(chunk)
+                    if etag is not None:
+                        etag.update(chunk)
+            yield chunk
+        if chunks is None:
+            return
+        cached = HttpResponse(b''.join(chunks), status=response.status_code)
+        cached._headers = response._headers.copy()
+        cached.cookies = response.cookies
+        if hasattr(response, '_cache_tag_versions'):
+            cached._cache_tag_versions = response._cache_tag_versions
+        if etag is not None:
+            cached['ETag'] = '"%s"' % etag.hexdigest()
+        self.cache.set(cache_key, cached, timeout)
+
 class FetchFromCacheMiddleware(object):
     """
     处理 request,必须放到最后一个位置(从上到下,也就是说他会最后一个被执行)
@@ -161,16 +207,8 @@ class FetchFromCacheMiddleware(object):
             return None # Don't bother checking the cache.
 
         # try and get the cached GET response  GEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEET
-        cache_key = get_cache_key(request, self.key_prefix, 'GET', cache=self.cache)
-        if cache_key is None:
-            request._cache_update_cache = True
-            return None # No cache information available, need to rebuild.
-
-        response = self.cache.get(cache_key, None)
-        # if it wasn't found and we are looking for a HEAD, try looking just for that HEAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAD
-        if response is None and request.method == 'HEAD':
-            cache_key = get_cache_key(request, self.key_prefix, 'HEAD', cache=self.cache)
-            response = self.cache.get(cache_key, None)
+        # (or, for a HEAD request, the HEAD one), header list and page together
+        response = get_cached_response(request, self.key_prefix, cache=self.cache)
 
         if response is None:
             request._cache_update_cache = True
@@ -226,3 +264,4 @@ class CacheMiddleware(UpdateCacheMiddleware, FetchFromCacheMiddleware):
 
         self.cache = get_cache(self.cache_alias, **cache_kwargs)
         self.cache_timeout = self.cache.default_timeout
+        self.streaming_max_size = settings.CACHE_MIDDLEWARE_STREAMING_MAX_SIZE
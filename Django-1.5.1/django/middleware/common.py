@@ -5,6 +5,8 @@ import re
 from django.conf import settings
 from django import http
 from django.core.mail import mail_managers
+from django.utils.encoding import force_text
+from django.utils.functional import memoize
 from django.utils.http import urlquote
 from django.utils import six
 from django.core import urlresolvers
@@ -12,6 +14,10 @@ from django.core import urlresolvers
 
 logger = logging.getLogger('django.request')
 
+_combined_regexes = {} # Maps tuples of regular expressions to their union.
+
+_backreference_re = re.compile(r'\\[1-9]|\(\?P=')
+
 
 class CommonMiddleware(object):
     """
@@ -46,15 +52,15 @@ class CommonMiddleware(object):
 
         # Check for denied User-Agents 检测被拒绝的客户端
         if 'HTTP_USER_AGENT' in request.META:
-            for user_agent_regex in settings.DISALLOWED_USER_AGENTS:
-                if user_agent_regex.search(request.META['HTTP_USER_AGENT']):
-                    logger.warning('Forbidden (User agent): %s', request.path,
-                        extra={
-                            'status_code': 403,
-                            'request': request
-                        }
-                    )
-                    return http.HttpResponseForbidden('<h1>Forbidden</h1>')
+            if _search_any(settings.DISALLOWED_USER_AGENTS,
+                           request.META['HTTP_USER_AGENT']):
+                logger.warning('Forbidden (User agent): %s', request.path,
+                    extra={
+                        'status_code': 403,
+                        'request': request
+                    }
+                )
+                return http.HttpResponseForbidden('<h1>Forbidden</h1>')
 
         # Check for a redirect based on settings.APPEND_SLASH 
         #看是否需要填补 www.
@@ -177,7 +183,7 @@ def _is_ignorable_404(uri):
             if uri.endswith(end):
                 return True
     # 还有一个 IGNORABLE_404_URLS 设置,专门放置忽略 404 的uri.######## 不是真正的忽略
-    return any(pattern.search(uri) for pattern in settings.IGNORABLE_404_URLS)
+    return _search_any(settings.IGNORABLE_404_URLS, uri)
 
 def _is_internal_request(domain, referer):
     """
@@ -186,3 +192,39 @@ def _is_internal_request(domain, referer):
     """
     # Different subdomains are treated as different domains.
     return referer is not None and re.match("^https?://%s/" % re.escape(domain), referer)
+
+def _combine_regexes(regexes):
+    """
+    Returns a single regular expression that matches wherever one of the
+    compiled regular expressions in ``regexes`` does, or None if they can't be
+    combined because their flags or types differ or they use backreferences.
+    """
+    sources = [regex.pattern for regex in regexes]
+    if (len(set(regex.flags for regex in regexes)) != 1 or
+            len(set(type(source) for source in sources)) != 1 or
+            any(_backreference_re.search(force_text(source, errors='replace'))
+                for source in sources)):
+        return None
+    if isinstance(sources[0], bytes):
+        combined = b'|'.join(b'(?:' + source + b')' for source in sources)
+    else:
+        combined = '|'.join('(?:' + source + ')' for source in sources)
+    try:
+        return re.compile(combined, regexes[0].flags)
+    except re.error:
+        return None
+_combine_regexes = memoize(_combine_regexes, _combined_regexes, 1)
+
+def _search_any(regexes, string):
+    """
+    Returns True if any of the compiled regular expressions in ``regexes``
+    matches somewhere in ``string``. They are combined into one, when
+    possible, so that the string is only scanned once.
+    """
+    regexes = tuple(regexes)
+    if not regexes:
+        return False
+    combined = _combine_regexes(regexes)
+    if combined is not None:
+        return combined.search(string) is not None
+    return any(regex.search(string) for regex in regexes)
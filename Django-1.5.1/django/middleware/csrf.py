@@ -31,6 +31,8 @@ REASON_BAD_TOKEN = "CSRF token missing or incorrect."
 
 CSRF_KEY_LENGTH = 32 # 默认 32 位
 
+_invalid_token_chars_re = re.compile('[^a-zA-Z0-9]+')
+
 def _get_failure_view():
     """
     Returns the view to be used for CSRF rejections
@@ -54,15 +56,31 @@ def get_token(request):
     function lazily, as is done by the csrf context processor.
     """
     # 提取请求中的 cstf token
+    if getattr(request, '_csrf_cookie_pending', False):
+        # CsrfViewMiddleware.process_view() leaves this to the first call.
+        request._csrf_cookie_pending = False
+        request.META["CSRF_COOKIE"] = (_get_cookie_token(request) or
+                                       _get_new_csrf_key())
     request.META["CSRF_COOKIE_USED"] = True
     return request.META.get("CSRF_COOKIE", None)
 
 
+def _get_cookie_token(request):
+    """
+    Returns the sanitized token of the request's CSRF cookie, or None if it
+    has none.
+    """
+    try:
+        return _sanitize_token(request.COOKIES[settings.CSRF_COOKIE_NAME])
+    except KeyError:
+        return None
+
+
 def _sanitize_token(token): # sanitize 使无害消毒
     # Allow only alphanum
     if len(token) > CSRF_KEY_LENGTH:
         return _get_new_csrf_key()
-    token = re.sub('[^a-zA-Z0-9]+', '', force_text(token)) # sub re,new,text
+    token = _invalid_token_chars_re.sub('', force_text(token)) # sub re,new,text
     if token == "":
         # In case the cookie has been truncated to nothing at some point.
         return _get_new_csrf_key()
@@ -97,24 +115,22 @@ class CsrfViewMiddleware(object):
         if getattr(request, 'csrf_processing_done', False):
             return None
 
-        try:
-            csrf_token = _sanitize_token(
-                request.COOKIES[settings.CSRF_COOKIE_NAME])
-            # Use same token next time
-            request.META['CSRF_COOKIE'] = csrf_token # 设置 request 的 cookie ,为什么?
-        except KeyError:
-            csrf_token = None
-            # Generate token and store it in the request, so it's
-            # available to the view.
-            request.META["CSRF_COOKIE"] = _get_new_csrf_key()
-
-        # Wait until request.META["CSRF_COOKIE"] has been manipulated before
-        # bailing out, so that get_token still works
+        # Reading the cookie or generating a new token is left to get_token(),
+        # so that exempt views and safe methods only pay for it if they use
+        # the token.
+        request._csrf_cookie_pending = True
+
         if getattr(callback, 'csrf_exempt', False): # exempt 免除.在 view 中可以添加 cstr_exempt 修饰,表示可以省略 csrf 的检测
             return None
 
         # Assume that anything not defined as 'safe' by RFC2616 needs protection
         if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'): # POST
+            csrf_token = _get_cookie_token(request)
+            if csrf_token is not None:
+                # Use same token next time
+                request._csrf_cookie_pending = False
+                request.META['CSRF_COOKIE'] = csrf_token # 设置 request 的 cookie ,为什么?
+
             if getattr(request, '_dont_enforce_csrf_checks', False):
                 # Mechanism to turn off CSRF checks for test suite.
                 # It comes after the creation of CSRF cookies, so that
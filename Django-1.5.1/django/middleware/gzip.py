@@ -1,5 +1,6 @@
 import re
 
+from django.conf import settings
 from django.utils.text import compress_sequence, compress_string
 from django.utils.cache import patch_vary_headers
 
@@ -10,7 +11,15 @@ class GZipMiddleware(object):
     This middleware compresses content if the browser allows gzip compression.
     It sets the Vary header accordingly, so that caches will base their storage
     on the Accept-Encoding header.
+
+    The compression level is set by GZIP_COMPRESSION_LEVEL. Streaming responses
+    are flushed to the client once GZIP_STREAMING_FLUSH_SIZE bytes have been
+    compressed, rather than after every chunk, if that is set.
     """
+    def __init__(self):
+        self.compresslevel = settings.GZIP_COMPRESSION_LEVEL
+        self.flush_size = settings.GZIP_STREAMING_FLUSH_SIZE
+
     def process_response(self, request, response):
         # It's not worth attempting to compress really short responses. 如果太过小的包就直接返回
         if not response.streaming and len(response.content) < 200:
@@ -35,11 +44,12 @@ class GZipMiddleware(object):
         if response.streaming:
             # Delete the `Content-Length` header for streaming content, because 压缩后,content-length 应该会变小
             # we won't know the compressed size until we stream it.
-            response.streaming_content = compress_sequence(response.streaming_content)
+            response.streaming_content = compress_sequence(
+                response.streaming_content, self.compresslevel, self.flush_size)
             del response['Content-Length']
         else:
             # Return the compressed content only if it's actually shorter.
-            compressed_content = compress_string(response.content)
+            compressed_content = compress_string(response.content, self.compresslevel)
             if len(compressed_content) >= len(response.content): #看值不值得压缩
                 return response
             response.content = compressed_content
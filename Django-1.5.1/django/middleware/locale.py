@@ -1,8 +1,7 @@
 "This is the locale selecting middleware that will look at accept headers"
 
 from django.conf import settings
-from django.core.urlresolvers import (is_valid_path, get_resolver,
-                                      LocaleRegexURLResolver)
+from django.core.urlresolvers import is_valid_path, get_resolver
 from django.http import HttpResponseRedirect
 from django.utils.cache import patch_vary_headers
 from django.utils import translation
@@ -54,7 +53,4 @@ class LocaleMiddleware(object):
         Returns `True` if the `LocaleRegexURLResolver` is used
         at root level of the urlpatterns, else it returns `False`. 如果正则 URL 解析器启用,返回 true
         """
-        for url_pattern in get_resolver(None).url_patterns:
-            if isinstance(url_pattern, LocaleRegexURLResolver):
-                return True
-        return False
+        return get_resolver(None).language_prefix_patterns_used
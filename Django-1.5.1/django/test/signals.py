@@ -73,6 +73,7 @@ def language_changed(**kwargs):
         trans_real._default = None
         if kwargs['setting'] == 'LOCALE_PATHS':
             trans_real._translations = {}
+            trans_real._checked_languages = {}
 
 @receiver(setting_changed)
 def file_storage_changed(**kwargs):
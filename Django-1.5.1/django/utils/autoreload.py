@@ -29,6 +29,11 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import os, sys, time, signal
+import errno
+import select
+import struct
+
+from django.utils import six
 
 try:
     from django.utils.six.moves import _thread as thread
@@ -47,22 +52,99 @@ try:
 except ImportError:
     termios = None
 
+try:
+    import ctypes
+    import ctypes.util
+except ImportError:
+    ctypes = None
+
 RUN_RELOADER = True
 
+# Seconds without further changes to wait for before reloading, so that a
+# burst of changes (a VCS checkout, an editor saving several files) causes a
+# single reload.
+RELOAD_DEBOUNCE = 0.2
+
+# Use inotify to be told about changes instead of polling for them, where
+# it's available. The reloader falls back to polling if it can't be set up.
+USE_INOTIFY = sys.platform.startswith('linux') and ctypes is not None
+
 _mtimes = {}
 _win = (sys.platform == "win32")
 
-def code_changed():
-    global _mtimes, _win
-    filenames = [getattr(m, "__file__", None) for m in sys.modules.values()]
-    for filename in filter(None, filenames):
+_cached_modules = set()
+_cached_filenames = []
+
+def _module_filenames(modules):
+    for module in modules:
+        filename = getattr(module, "__file__", None)
+        if not filename:
+            continue
         if filename.endswith(".pyc") or filename.endswith(".pyo"):
             filename = filename[:-1]
         if filename.endswith("$py.class"):
             filename = filename[:-9] + ".py"
-        if not os.path.exists(filename):
-            continue # File might be in an egg, so it can't be reloaded.
-        stat = os.stat(filename)
+        yield filename
+
+def _walk_files(directories, extension=''):
+    for directory in directories:
+        for dirpath, dirnames, filenames in os.walk(directory):
+            for filename in filenames:
+                if not filename.startswith('.') and filename.endswith(extension):
+                    yield os.path.join(dirpath, filename)
+
+def _data_filenames():
+    """
+    Returns the templates and the compiled translation catalogs of the
+    project and of the installed applications that have been imported.
+    """
+    from django.conf import settings
+    if not settings.configured:
+        return []
+    template_dirs = list(settings.TEMPLATE_DIRS)
+    locale_dirs = list(settings.LOCALE_PATHS)
+    settings_module = sys.modules.get(os.environ.get('DJANGO_SETTINGS_MODULE', ''))
+    if getattr(settings_module, '__file__', None):
+        locale_dirs.append(os.path.join(os.path.dirname(settings_module.__file__), 'locale'))
+    for app in settings.INSTALLED_APPS:
+        # Applications are imported by the server thread; those that aren't
+        # yet are picked up once they are.
+        app_module = sys.modules.get(app)
+        if getattr(app_module, '__file__', None):
+            app_dir = os.path.dirname(app_module.__file__)
+            template_dirs.append(os.path.join(app_dir, 'templates'))
+            locale_dirs.append(os.path.join(app_dir, 'locale'))
+    return (list(_walk_files(template_dirs)) +
+            list(_walk_files(locale_dirs, '.mo')))
+
+def gen_filenames():
+    """
+    Returns the absolute paths of the files whose changes trigger a reload:
+    the source files of the loaded modules, the templates and the compiled
+    translation catalogs. The list is only rebuilt when new modules have been
+    loaded since the previous call.
+    """
+    global _cached_modules, _cached_filenames
+    modules = set(sys.modules.values())
+    if modules != _cached_modules:
+        filenames = set(os.path.abspath(filename) for filename
+                        in _module_filenames(modules))
+        filenames.update(os.path.abspath(filename) for filename
+                         in _data_filenames())
+        # Files in eggs can't be reloaded.
+        _cached_filenames = [filename for filename in filenames
+                             if os.path.exists(filename)]
+        _cached_modules = modules
+    return _cached_filenames
+
+def code_changed():
+    global _mtimes, _win
+    changed = False
+    for filename in gen_filenames():
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            continue # The file was removed since the list was built.
         mtime = stat.st_mtime
         if _win:
             mtime -= stat.st_ctime
@@ -70,9 +152,96 @@ def code_changed():
             _mtimes[filename] = mtime
             continue
         if mtime != _mtimes[filename]:
-            _mtimes = {}
-            return True
-    return False
+            _mtimes[filename] = mtime
+            changed = True
+    return changed
+
+def polling_code_changed(timeout):
+    """
+    Waits for ``timeout`` seconds, then returns whether any watched file has
+    been modified since the previous call.
+    """
+    time.sleep(timeout)
+    return code_changed()
+
+# inotify(7) event masks: a file was written and closed, its metadata (e.g.
+# the modification time) changed, it was renamed into place, or events were
+# lost because the queue overflowed.
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+
+_inotify = None
+_inotify_fd = None
+_inotify_watches = {}
+
+def _inotify_setup():
+    global _inotify, _inotify_fd
+    if _inotify_fd is None:
+        _inotify = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = _inotify.inotify_init()
+        if fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        _inotify_fd = fd
+
+def _inotify_update_watches():
+    """
+    Watches the directories of the files returned by gen_filenames() that
+    aren't watched yet. Returns the set of watched files.
+    """
+    filenames = gen_filenames()
+    watched_dirs = set(_inotify_watches.values())
+    for directory in set(os.path.dirname(filename) for filename in filenames):
+        if directory in watched_dirs:
+            continue
+        path = directory
+        if isinstance(path, six.text_type):
+            # ctypes would pass text as a wchar_t array.
+            path = path.encode(sys.getfilesystemencoding())
+        wd = _inotify.inotify_add_watch(_inotify_fd, path,
+                                        IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error != errno.ENOENT:
+                raise OSError(error, os.strerror(error))
+        else:
+            _inotify_watches[wd] = directory
+    return set(filenames)
+
+def inotify_code_changed(timeout):
+    """
+    Waits up to ``timeout`` seconds for inotify to report a change to a
+    watched file, and returns whether it did. Raises OSError if inotify can't
+    be used.
+    """
+    _inotify_setup()
+    filenames = _inotify_update_watches()
+    try:
+        if not select.select([_inotify_fd], [], [], timeout)[0]:
+            return False
+    except select.error as e:
+        if e.args[0] != errno.EINTR:
+            raise
+        return False
+    data = os.read(_inotify_fd, 65536)
+    changed = False
+    offset = 0
+    while offset < len(data):
+        wd, mask, cookie, length = struct.unpack_from('iIII', data, offset)
+        offset += struct.calcsize('iIII')
+        name = data[offset:offset + length].rstrip(b'\0')
+        offset += length
+        if mask & IN_Q_OVERFLOW:
+            changed = True
+        elif wd in _inotify_watches and name:
+            directory = _inotify_watches[wd]
+            if isinstance(directory, six.text_type):
+                name = name.decode(sys.getfilesystemencoding())
+            if os.path.join(directory, name) in filenames:
+                changed = True
+    return changed
 
 def ensure_echo_on():
     if termios:
@@ -91,10 +260,19 @@ def ensure_echo_on():
 
 def reloader_thread():
     ensure_echo_on()
+    if USE_INOTIFY:
+        change_detected = inotify_code_changed
+    else:
+        change_detected = polling_code_changed
     while RUN_RELOADER:
-        if code_changed():
-            sys.exit(3) # force reload
-        time.sleep(1)
+        try:
+            if change_detected(1):
+                while change_detected(RELOAD_DEBOUNCE):
+                    pass
+                sys.exit(3) # force reload
+        except OSError:
+            # inotify isn't supported, or the limit of watches was reached.
+            change_detected = polling_code_changed
 
 def restart_with_reloader():
     while True:
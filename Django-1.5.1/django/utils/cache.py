@@ -24,6 +24,7 @@ import time
 
 from django.conf import settings
 from django.core.cache import get_cache
+from django.utils import six
 from django.utils.encoding import iri_to_uri, force_bytes, force_text
 from django.utils.http import http_date
 from django.utils.timezone import get_current_timezone_name
@@ -31,6 +32,10 @@ from django.utils.translation import get_language
 
 cc_delim_re = re.compile(r'\s*,\s*')
 
+# Tag versions must outlive the pages they guard; this is memcached's
+# longest relative timeout.
+TAG_VERSION_TIMEOUT = 60 * 60 * 24 * 30
+
 def patch_cache_control(response, **kwargs):
     """
     This function patches the Cache-Control header by adding all
@@ -194,6 +199,128 @@ def _generate_cache_header_key(key_prefix, request):
         key_prefix, path.hexdigest())
     return _i18n_cache_key_suffix(request, cache_key)
 
+def _generate_cache_tag_key(key_prefix, tag):
+    """Returns the cache key holding the current version of a tag."""
+    return 'views.decorators.cache.cache_tag.%s.%s' % (
+        key_prefix, hashlib.md5(force_bytes(tag)).hexdigest())
+
+def _to_cache_tag(tag):
+    """Turns a model class or instance into its tag; strings are unchanged."""
+    if isinstance(tag, six.string_types):
+        return tag
+    opts = tag._meta
+    return 'model:%s.%s' % (opts.app_label, opts.module_name)
+
+def _path_cache_tags(path):
+    """
+    Returns the tags of a URL path: one per directory prefix, plus the path
+    itself, e.g. '/', '/a/' and '/a/b' for '/a/b'.
+    """
+    tags = []
+    i = path.find('/')
+    while i != -1:
+        tags.append('path:' + path[:i + 1])
+        i = path.find('/', i + 1)
+    if not path.endswith('/'):
+        tags.append('path:' + path)
+    return tags
+
+def patch_cache_tags(response, tags):
+    """
+    Adds tags to the given HttpResponse object. When the page is stored by the
+    cache middleware, invalidate_cache_tags() with any of these tags purges
+    it. Tags are strings, or model classes or instances which stand for
+    "any object of this model".
+    """
+    existing = getattr(response, '_cache_tags', None) or set()
+    response._cache_tags = existing | set(_to_cache_tag(tag) for tag in tags)
+
+def invalidate_cache_tags(tags, key_prefix=None, cache=None):
+    """
+    Purges every page cached by the cache middleware with any of the given
+    tags, by bumping the version of each tag. Nothing else in the cache is
+    touched.
+    """
+    if key_prefix is None:
+        key_prefix = settings.CACHE_MIDDLEWARE_KEY_PREFIX
+    if cache is None:
+        cache = get_cache(settings.CACHE_MIDDLEWARE_ALIAS)
+    for tag in tags:
+        tag_key = _generate_cache_tag_key(key_prefix, _to_cache_tag(tag))
+        try:
+            cache.incr(tag_key)
+        except ValueError:
+            # Start from a value that can't match a version stored with a
+            # page before this key was evicted.
+            cache.set(tag_key, int(time.time() * 1000), TAG_VERSION_TIMEOUT)
+
+def invalidate_cache_path(path, key_prefix=None, cache=None):
+    """
+    Purges the pages cached by the cache middleware under the given URL path.
+    A path ending in a slash covers everything below it, anything else only
+    the exact path. Requires the CACHE_MIDDLEWARE_PATH_TAGS setting.
+    """
+    invalidate_cache_tags(['path:' + path], key_prefix, cache)
+
+def _cache_tag_versions(tags, key_prefix, cache):
+    tag_keys = dict((tag, _generate_cache_tag_key(key_prefix, tag)) for tag in tags)
+    values = cache.get_many(list(tag_keys.values()))
+    return dict((tag, values.get(key)) for tag, key in tag_keys.items())
+
+def get_cached_response(request, key_prefix=None, cache=None):
+    """
+    Returns the response stored by learn_cache_key() and the cache
+    middleware for the request, or None.
+
+    The header list, the page as cached without any Vary headers and, with
+    CACHE_MIDDLEWARE_PATH_TAGS, the versions of the path's tags are fetched
+    with a single get_many(); pages with Vary headers need one more. A page
+    whose tags were invalidated after it was stored counts as a miss.
+    """
+    if key_prefix is None:
+        key_prefix = settings.CACHE_MIDDLEWARE_KEY_PREFIX
+    if cache is None:
+        cache = get_cache(settings.CACHE_MIDDLEWARE_ALIAS)
+    # A HEAD request can be answered with a cached GET response.
+    methods = ['GET', 'HEAD'] if request.method == 'HEAD' else ['GET']
+    header_key = _generate_cache_header_key(key_prefix, request)
+    page_keys = [_generate_cache_key(request, method, [], key_prefix)
+                 for method in methods]
+    path_tags = {}
+    if settings.CACHE_MIDDLEWARE_PATH_TAGS:
+        path_tags = dict((tag, _generate_cache_tag_key(key_prefix, tag))
+                         for tag in _path_cache_tags(request.path))
+    values = cache.get_many([header_key] + page_keys + list(path_tags.values()))
+
+    request._cache_tag_versions = dict(
+        (tag, values.get(key)) for tag, key in path_tags.items())
+    headerlist = values.get(header_key)
+    if headerlist is None:
+        return None
+    if headerlist:
+        page_keys = [_generate_cache_key(request, method, headerlist, key_prefix)
+                     for method in methods]
+        values = cache.get_many(page_keys)
+    response = None
+    for page_key in page_keys:
+        response = values.get(page_key)
+        if response is not None:
+            break
+    if response is None:
+        return None
+
+    stored_versions = getattr(response, '_cache_tag_versions', None)
+    if stored_versions:
+        current = request._cache_tag_versions
+        other_tags = [tag for tag in stored_versions if tag not in current]
+        if other_tags:
+            current = dict(current)
+            current.update(_cache_tag_versions(other_tags, key_prefix, cache))
+        for tag, version in stored_versions.items():
+            if current.get(tag) != version:
+                return None
+    return response
+
 def get_cache_key(request, key_prefix=None, method='GET', cache=None):
     """
     Returns a cache key based on the request path and query. It can be used
@@ -238,13 +365,39 @@ def learn_cache_key(request, response, cache_timeout=None, key_prefix=None, cach
     if response.has_header('Vary'):
         headerlist = ['HTTP_'+header.upper().replace('-', '_')
                       for header in cc_delim_re.split(response['Vary'])]
-        cache.set(cache_key, headerlist, cache_timeout)
-        return _generate_cache_key(request, request.method, headerlist, key_prefix)
     else:
         # if there is no Vary header, we still need a cache key
         # for the request.get_full_path()
-        cache.set(cache_key, [], cache_timeout)
-        return _generate_cache_key(request, request.method, [], key_prefix)
+        headerlist = []
+    # Set it even if get_cached_response() just found the same list: the
+    # page is about to be stored for cache_timeout, and the list must not
+    # expire before it.
+    cache.set(cache_key, headerlist, cache_timeout)
+    return _generate_cache_key(request, request.method, headerlist, key_prefix)
+
+def tag_cached_response(request, response, key_prefix=None, cache=None):
+    """
+    Records on the response the current version of each of its tags (see
+    patch_cache_tags) and, with CACHE_MIDDLEWARE_PATH_TAGS, of its path tags,
+    so that get_cached_response() can tell when they have been invalidated.
+    Must be called before the response is stored in the cache.
+    """
+    if key_prefix is None:
+        key_prefix = settings.CACHE_MIDDLEWARE_KEY_PREFIX
+    if cache is None:
+        cache = get_cache(settings.CACHE_MIDDLEWARE_ALIAS)
+    tags = set(getattr(response, '_cache_tags', None) or ())
+    # Path tag versions read at request time, to not miss an invalidation
+    # made while the response was being generated.
+    versions = dict(getattr(request, '_cache_tag_versions', None) or {})
+    if settings.CACHE_MIDDLEWARE_PATH_TAGS:
+        tags.update(_path_cache_tags(request.path))
+    missing = [tag for tag in tags if tag not in versions]
+    if missing:
+        versions.update(_cache_tag_versions(missing, key_prefix, cache))
+    if tags:
+        response._cache_tag_versions = dict(
+            (tag, versions[tag]) for tag in tags)
 
 
 def _to_tuple(s):
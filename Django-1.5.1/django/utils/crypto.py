@@ -8,6 +8,8 @@ import struct
 import hashlib
 import binascii
 import operator
+import os
+import threading
 import time
 from functools import reduce
 
@@ -27,11 +29,29 @@ from django.utils.encoding import force_bytes
 from django.utils import six
 from django.utils.six.moves import xrange
 
+# OpenSSL's PBKDF2, available from Python 2.7.8 and 3.4. It is much faster
+# than the pure Python version below and releases the GIL while it runs.
+_pbkdf2_hmac = getattr(hashlib, 'pbkdf2_hmac', None)
 
 _trans_5c = bytearray([(x ^ 0x5C) for x in xrange(256)])
 _trans_36 = bytearray([(x ^ 0x36) for x in xrange(256)])
 
 
+# HMAC objects keyed with derived keys, by (key_salt, secret). Salts are
+# normally constants, so this stays small; it is emptied if it ever grows
+# past _SALTED_HMAC_CACHE_SIZE entries.
+_salted_hmacs = {}
+_SALTED_HMAC_CACHE_SIZE = 1000
+
+# Bytes read from os.urandom() ahead of time, so that random strings don't
+# cost a system call per character. The pool is discarded in a forked child,
+# which must not hand out the same values as its parent.
+_random_pool = bytearray()
+_random_pool_pid = None
+_random_pool_lock = threading.Lock()
+_RANDOM_POOL_SIZE = 4096
+
+
 def salted_hmac(key_salt, value, secret=None):
     """
     Returns the HMAC-SHA1 of 'value', using a key generated from key_salt and a
@@ -42,16 +62,28 @@ def salted_hmac(key_salt, value, secret=None):
     if secret is None:
         secret = settings.SECRET_KEY
 
-    # We need to generate a derived key from our base key.  We can do this by
-    # passing the key_salt and our base key through a pseudo-random function and
-    # SHA1 works nicely.
-    key = hashlib.sha1((key_salt + secret).encode('utf-8')).digest()
-
-    # If len(key_salt + secret) > sha_constructor().block_size, the above
-    # line is redundant and could be replaced by key = key_salt + secret, since
-    # the hmac module does the same thing for keys longer than the block size.
-    # However, we need to ensure that we *always* do this.
-    return hmac.new(key, msg=force_bytes(value), digestmod=hashlib.sha1)
+    try:
+        base = _salted_hmacs[key_salt, secret]
+    except KeyError:
+        # We need to generate a derived key from our base key.  We can do this
+        # by passing the key_salt and our base key through a pseudo-random
+        # function and SHA1 works nicely.
+        key = hashlib.sha1((key_salt + secret).encode('utf-8')).digest()
+
+        # If len(key_salt + secret) > sha_constructor().block_size, the above
+        # line is redundant and could be replaced by key = key_salt + secret,
+        # since the hmac module does the same thing for keys longer than the
+        # block size. However, we need to ensure that we *always* do this.
+        base = hmac.new(key, digestmod=hashlib.sha1)
+        if len(_salted_hmacs) >= _SALTED_HMAC_CACHE_SIZE:
+            _salted_hmacs.clear()
+        _salted_hmacs[key_salt, secret] = base
+
+    # Copying the keyed HMAC skips deriving the key and hashing the padded
+    # key blocks again.
+    mac = base.copy()
+    mac.update(force_bytes(value))
+    return mac
 
 
 def get_random_string(length=12,
@@ -77,9 +109,37 @@ def get_random_string(length=12,
                     time.time(),
                     settings.SECRET_KEY)).encode('utf-8')
                 ).digest())
+    if using_sysrandom and len(allowed_chars) <= 256:
+        return _get_pooled_random_string(length, allowed_chars)
     return ''.join([random.choice(allowed_chars) for i in range(length)])
 
 
+def _random_bytes(count):
+    global _random_pool, _random_pool_pid
+    with _random_pool_lock:
+        if _random_pool_pid != os.getpid():
+            _random_pool = bytearray()
+            _random_pool_pid = os.getpid()
+        if len(_random_pool) < count:
+            _random_pool += bytearray(os.urandom(max(count, _RANDOM_POOL_SIZE)))
+        data = _random_pool[:count]
+        del _random_pool[:count]
+    return data
+
+
+def _get_pooled_random_string(length, allowed_chars):
+    # Bytes at or above the largest multiple of len(allowed_chars) are
+    # dropped, so that every character is equally likely.
+    count = len(allowed_chars)
+    limit = 256 - 256 % count
+    chars = []
+    while len(chars) < length:
+        chars.extend(allowed_chars[byte % count]
+                     for byte in _random_bytes(length - len(chars))
+                     if byte < limit)
+    return ''.join(chars)
+
+
 def constant_time_compare(val1, val2):
     """
     Returns True if the two strings are equal, False otherwise.
@@ -140,9 +200,10 @@ def pbkdf2(password, salt, iterations, dklen=0, digest=None):
 
     Right now 10,000 iterations is the recommended default which takes
     100ms on a 2.2Ghz Core 2 Duo.  This is probably the bare minimum
-    for security given 1000 iterations was recommended in 2001. This
-    code is very well optimized for CPython and is only four times
-    slower than openssl's implementation.
+    for security given 1000 iterations was recommended in 2001. When
+    hashlib provides pbkdf2_hmac, OpenSSL's implementation is used;
+    otherwise this code is very well optimized for CPython and is only
+    four times slower than openssl's implementation.
     """
     assert iterations > 0
     if not digest:
@@ -154,6 +215,8 @@ def pbkdf2(password, salt, iterations, dklen=0, digest=None):
         dklen = hlen
     if dklen > (2 ** 32 - 1) * hlen:
         raise OverflowError('dklen too big')
+    if _pbkdf2_hmac is not None:
+        return _pbkdf2_hmac(digest().name, password, salt, int(iterations), dklen)
     l = -(-dklen // hlen)
     r = dklen - (l - 1) * hlen
 
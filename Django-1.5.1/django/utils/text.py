@@ -281,9 +281,9 @@ phone2numeric = allow_lazy(phone2numeric)
 
 # From http://www.xhaus.com/alan/python/httpcomp.html#gzip
 # Used with permission.
-def compress_string(s):
+def compress_string(s, compresslevel=6):
     zbuf = BytesIO()
-    zfile = GzipFile(mode='wb', compresslevel=6, fileobj=zbuf)
+    zfile = GzipFile(mode='wb', compresslevel=compresslevel, fileobj=zbuf)
     zfile.write(s)
     zfile.close()
     return zbuf.getvalue()
@@ -306,16 +306,24 @@ class StreamingBuffer(object):
     def close(self):
         return
 
-# Like compress_string, but for iterators of strings.
-def compress_sequence(sequence):
+# Like compress_string, but for iterators of strings. Compressed output is
+# flushed once at least flush_size bytes have been written since the last flush;
+# flushing less often compresses better, but delays output.
+def compress_sequence(sequence, compresslevel=6, flush_size=0):
     buf = StreamingBuffer()
-    zfile = GzipFile(mode='wb', compresslevel=6, fileobj=buf)
+    zfile = GzipFile(mode='wb', compresslevel=compresslevel, fileobj=buf)
     # Output headers...
     yield buf.read()
+    unflushed = 0
     for item in sequence:
         zfile.write(item)
-        zfile.flush()
-        yield buf.read()
+        unflushed += len(item)
+        if unflushed >= flush_size:
+            zfile.flush()
+            unflushed = 0
+        data = buf.read()
+        if data:
+            yield data
     zfile.close()
     yield buf.read()
 
@@ -28,6 +28,12 @@ _default = None
 # file lookups when checking the same locale on repeated requests.
 _accepted = {}
 
+# Results of check_for_language(), which would otherwise look for catalogs on
+# the filesystem for each request. Emptied if it ever holds this many entries,
+# since language codes can come from cookies or form data.
+_checked_languages = {}
+_CHECKED_LANGUAGES_SIZE = 1000
+
 # magic gettext number to separate context from message
 CONTEXT_SEPARATOR = "\x04"
 
@@ -348,10 +354,19 @@ def check_for_language(lang_code):
     available. This is only used for language codes from either the cookies
     or session and during format localization.
     """
+    try:
+        return _checked_languages[lang_code]
+    except KeyError:
+        pass
+    found = False
     for path in all_locale_paths():
         if gettext_module.find('django', path, [to_locale(lang_code)]) is not None:
-            return True
-    return False
+            found = True
+            break
+    if len(_checked_languages) >= _CHECKED_LANGUAGES_SIZE:
+        _checked_languages.clear()
+    _checked_languages[lang_code] = found
+    return found
 
 def get_language_from_path(path, supported=None):
     """
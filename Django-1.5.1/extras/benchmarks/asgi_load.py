@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+"""
+Compares how many slow-I/O requests per second the threaded WSGI server
+(runserver --threads) and an ASGI server running ASGIHandler get through.
+
+Each request goes to a view that waits ``--delay`` seconds, standing in for
+a call to another service: a blocking view (time.sleep) and a view returning
+a coroutine (asyncio.sleep). ``--concurrency`` clients each send requests
+one after the other, over new connections, for ``--duration`` seconds.
+
+Requires Python 3.5+ and uvicorn for the ASGI server:
+
+    python extras/benchmarks/asgi_load.py --threads 8 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from http.client import HTTPConnection
+except ImportError:
+    from httplib import HTTPConnection
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from django.conf import settings
+
+if not settings.configured:
+    settings.configure(
+        DEBUG=False,
+        ALLOWED_HOSTS=['*'],
+        ROOT_URLCONF=__name__,
+        MIDDLEWARE_CLASSES=(
+            'django.middleware.common.CommonMiddleware',
+            'django.middleware.csrf.CsrfViewMiddleware',
+        ),
+    )
+
+from django.conf.urls import patterns, url
+from django.http import HttpResponse
+
+DELAY = float(os.environ.get('BENCHMARK_DELAY', '0.1'))
+
+
+def blocking_view(request):
+    time.sleep(DELAY)
+    return HttpResponse(b'done')
+
+
+def coroutine_view(request):
+    return asyncio.sleep(DELAY, result=HttpResponse(b'done'))
+
+urlpatterns = patterns('',
+    url(r'^blocking/$', blocking_view),
+    url(r'^coroutine/$', coroutine_view),
+)
+
+
+def serve(server, port, threads):
+    if server == 'wsgi':
+        from django.core.servers.basehttp import run
+        from django.core.wsgi import get_wsgi_application
+        run('127.0.0.1', port, get_wsgi_application(), threading=True,
+            threads=threads, backlog=1024)
+    else:
+        import uvicorn
+        from django.core.asgi import get_asgi_application
+        uvicorn.run(get_asgi_application(ThreadPoolExecutor(threads)),
+                    host='127.0.0.1', port=port, interface='asgi3',
+                    log_level='error', backlog=1024)
+
+
+def wait_for_server(port):
+    for i in range(100):
+        try:
+            connection = HTTPConnection('127.0.0.1', port)
+            connection.request('GET', '/blocking/')
+            connection.getresponse().read()
+            return
+        except (IOError, OSError):
+            time.sleep(0.1)
+    raise RuntimeError("The server on port %d didn't start." % port)
+
+
+def load(port, path, concurrency, duration):
+    """
+    Returns the number of requests per second, and the mean latency, of
+    ``concurrency`` clients requesting ``path`` for ``duration`` seconds.
+    """
+    deadline = time.time() + duration
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def client():
+        while time.time() < deadline:
+            start = time.time()
+            try:
+                connection = HTTPConnection('127.0.0.1', port, timeout=30)
+                connection.request('GET', path, headers={'Connection': 'close'})
+                response = connection.getresponse()
+                response.read()
+                connection.close()
+                ok = response.status == 200
+            except (IOError, OSError):
+                ok = False
+            with lock:
+                (latencies if ok else errors).append(time.time() - start)
+
+    started = time.time()
+    clients = [threading.Thread(target=client) for i in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.time() - started
+    mean = sum(latencies) / len(latencies) if latencies else float('nan')
+    return len(latencies) / elapsed, mean, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--threads', type=int, default=8,
+                        help='worker threads of both servers')
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--delay', type=float, default=DELAY)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--serve', choices=('wsgi', 'asgi'), help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.serve:
+        serve(options.serve, options.port, options.threads)
+        return
+
+    print('%d worker threads, %d clients, %.0fms per request'
+          % (options.threads, options.concurrency, options.delay * 1000))
+    print('%-6s %-11s %10s %12s %7s' % ('server', 'view', 'requests/s', 'mean latency', 'errors'))
+    env = dict(os.environ, BENCHMARK_DELAY=str(options.delay))
+    for server, view in (('wsgi', 'blocking'), ('asgi', 'blocking'),
+                         ('asgi', 'coroutine')):
+        process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--serve', server,
+             '--port', str(options.port), '--threads', str(options.threads)],
+            env=env)
+        try:
+            wait_for_server(options.port)
+            rate, latency, errors = load(options.port, '/%s/' % view,
+                                         options.concurrency, options.duration)
+        finally:
+            process.terminate()
+            process.wait()
+        print('%-6s %-11s %10.1f %10.0fms %7d' % (server, view, rate, latency * 1000, errors))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Measures the cost of each cache SERIALIZER and COMPRESSOR against the bytes
+it saves.
+
+Every combination encodes and decodes a few typical cached values the way
+BaseCache does, and reports the time per call and the stored size:
+
+    python extras/benchmarks/cache_serializers.py
+
+MessagePackSerializer is skipped when msgpack isn't installed.
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from django.conf import settings
+
+if not settings.configured:
+    settings.configure()
+
+from django.core.cache.backends.base import BaseCache
+from django.core.exceptions import ImproperlyConfigured
+
+SERIALIZERS = (
+    ('pickle', 'django.core.cache.serializers.PickleSerializer'),
+    ('json', 'django.core.cache.serializers.JSONSerializer'),
+    ('msgpack', 'django.core.cache.serializers.MessagePackSerializer'),
+)
+
+COMPRESSORS = (
+    ('none', None),
+    ('zlib', 'django.core.cache.compressors.ZlibCompressor'),
+)
+
+
+def sample_values():
+    """
+    Returns (name, value) pairs of values resembling what sites cache.
+    """
+    row = '<tr><td class="name">Item %d</td><td class="price">%d.99</td></tr>\n'
+    page = '<html><body><table>\n%s</table></body></html>' % ''.join(
+        row % (i, i % 100) for i in range(1000))
+    rows = [{'id': i, 'name': 'Item %d' % i, 'price': i % 100,
+             'tags': ['new', 'sale'] if i % 3 else []} for i in range(1000)]
+    return (
+        ('counter', 42),
+        ('short string', 'user:1234:profile'),
+        ('rendered page', page),
+        ('1000 rows', rows),
+    )
+
+
+def measure(cache, value, number):
+    """
+    Returns the best encode and decode times per call, in microseconds, and
+    the size of the encoded value.
+    """
+    data = cache._serialize(value)
+    encode = min(timeit.repeat(lambda: cache._serialize(value),
+                               number=number, repeat=3))
+    decode = min(timeit.repeat(lambda: cache._deserialize(data),
+                               number=number, repeat=3))
+    return encode / number * 1e6, decode / number * 1e6, len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--number', type=int, default=200,
+                        help='calls per timing run')
+    parser.add_argument('--min-length', type=int, default=1024,
+                        help='ZlibCompressor min_length')
+    options = parser.parse_args()
+
+    print('%-14s %-8s %-5s %12s %12s %10s' % (
+        'value', 'format', 'zlib', 'encode (us)', 'decode (us)', 'bytes'))
+    for name, value in sample_values():
+        for serializer_name, serializer in SERIALIZERS:
+            for compressor_name, compressor in COMPRESSORS:
+                try:
+                    cache = BaseCache({
+                        'SERIALIZER': serializer,
+                        'COMPRESSOR': compressor,
+                        'COMPRESSOR_OPTIONS': {'min_length': options.min_length},
+                    })
+                except ImproperlyConfigured:
+                    continue
+                encode, decode, size = measure(cache, value, options.number)
+                print('%-14s %-8s %-5s %12.1f %12.1f %10d' % (
+                    name, serializer_name, compressor_name, encode, decode, size))
+
+
+if __name__ == '__main__':
+    main()
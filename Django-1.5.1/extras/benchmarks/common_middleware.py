@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Times CommonMiddleware's APPEND_SLASH and user-agent checks against a large
+generated urlconf.
+
+process_request() is run with APPEND_SLASH on and a few
+DISALLOWED_USER_AGENTS patterns for a URL that resolves, one that is
+redirected to its slashed form, and a slashless 404 requested again and
+again, as crawlers do. The check of a broken link against
+IGNORABLE_404_URLS is timed as well:
+
+    python extras/benchmarks/common_middleware.py --patterns 1400
+
+``--django-path`` imports Django from another checkout instead, so that the
+numbers can be compared before and after a change.
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import re
+import sys
+import timeit
+import types
+
+
+def view(request, **kwargs):
+    pass
+
+
+def build_urlconf(count):
+    """
+    Returns a urlconf module with ``count`` '^sectionN/(?P<pk>\\d+)/$'
+    patterns.
+    """
+    from django.conf.urls import patterns, url
+
+    module = types.ModuleType('benchmark_urls')
+    module.urlpatterns = patterns('', *[
+        url(r'^section%d/(?P<pk>\d+)/$' % i, view) for i in range(count)])
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--patterns', type=int, default=1400,
+                        help='number of URL patterns')
+    parser.add_argument('--number', type=int, default=200,
+                        help='calls per timing run')
+    parser.add_argument('--django-path',
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'),
+                        help='directory to import Django from')
+    options = parser.parse_args()
+    sys.path.insert(0, options.django_path)
+
+    from django.conf import settings
+    if not settings.configured:
+        settings.configure(
+            ALLOWED_HOSTS=['*'],
+            ROOT_URLCONF='benchmark_urls',
+            APPEND_SLASH=True,
+            DISALLOWED_USER_AGENTS=[re.compile(pattern) for pattern in (
+                r'^NaverBot', r'^EmailSiphon', r'^SiteSucker', r'^sohu-search')],
+            IGNORABLE_404_URLS=[re.compile(pattern) for pattern in (
+                r'^/apple-touch-icon.*\.png$', r'^/favicon\.ico$',
+                r'^/robots\.txt$', r'\.(php|cgi)$', r'^/phpmyadmin/')],
+        )
+
+    from django.http import HttpRequest
+    from django.middleware import common
+
+    sys.modules['benchmark_urls'] = build_urlconf(options.patterns)
+    middleware = common.CommonMiddleware()
+    last = options.patterns - 1
+
+    def process_request(path):
+        request = HttpRequest()
+        request.path = request.path_info = path
+        request.META = {
+            'SERVER_NAME': 'testserver',
+            'SERVER_PORT': '80',
+            'HTTP_HOST': 'testserver',
+            'HTTP_USER_AGENT': 'Mozilla/5.0 (X11; Linux x86_64)',
+        }
+        return middleware.process_request(request)
+
+    cases = (
+        ('resolving URL', lambda: process_request('/section%d/1/' % last)),
+        ('redirected to slash', lambda: process_request('/section%d/1' % last)),
+        ('slashless 404', lambda: process_request('/missing/page')),
+        ('_is_ignorable_404()', lambda: common._is_ignorable_404('/missing/page')),
+    )
+
+    print('%d patterns' % options.patterns)
+    print('%-22s %10s' % ('check', 'us'))
+    for name, case in cases:
+        case()
+        best = min(timeit.repeat(case, number=options.number, repeat=3))
+        print('%-22s %10.1f' % (name, best / options.number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
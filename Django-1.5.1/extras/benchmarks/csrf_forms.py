@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""
+Times CsrfViewMiddleware around views that do and don't render a form.
+
+Each case runs process_view(), the view and process_response() the way the
+request handler does. The form view renders a template with {% csrf_token %}
+through a RequestContext, both for a first visit without a CSRF cookie and
+for a visitor who has one. The other cases are a GET to a view that never
+touches the token, a csrf_exempt view and a POST of the form:
+
+    python extras/benchmarks/csrf_forms.py
+
+``--django-path`` imports Django from another checkout instead, so that the
+numbers can be compared before and after a change.
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import timeit
+
+FORM = '<form method="post">{% csrf_token %}<input name="q"></form>'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--number', type=int, default=5000,
+                        help='requests per timing run')
+    parser.add_argument('--django-path',
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'),
+                        help='directory to import Django from')
+    options = parser.parse_args()
+    sys.path.insert(0, options.django_path)
+
+    from django.conf import settings
+    if not settings.configured:
+        settings.configure(ALLOWED_HOSTS=['*'])
+
+    from django.http import HttpRequest, HttpResponse, QueryDict
+    from django.middleware.csrf import CsrfViewMiddleware
+    from django.template import RequestContext, Template
+    from django.views.decorators.csrf import csrf_exempt
+
+    template = Template(FORM)
+
+    def form_view(request):
+        return HttpResponse(template.render(RequestContext(request)))
+
+    def plain_view(request):
+        return HttpResponse('No form here.')
+
+    exempt_view = csrf_exempt(plain_view)
+
+    def make_request(method='GET', data=''):
+        request = HttpRequest()
+        request.method = method
+        request.path = '/'
+        request.META = {'SERVER_NAME': 'testserver', 'SERVER_PORT': '80'}
+        request.POST = QueryDict(data)
+        return request
+
+    middleware = CsrfViewMiddleware()
+
+    def handle(request, view):
+        response = middleware.process_view(request, view, (), {})
+        if response is None:
+            response = view(request)
+        return middleware.process_response(request, response)
+
+    def get(view, cookie=True):
+        request = make_request()
+        if cookie:
+            request.COOKIES[settings.CSRF_COOKIE_NAME] = token
+        return handle(request, view)
+
+    def post():
+        request = make_request('POST', 'csrfmiddlewaretoken=%s&q=x' % token)
+        request.COOKIES[settings.CSRF_COOKIE_NAME] = token
+        return handle(request, plain_view)
+
+    response = get(form_view, cookie=False)
+    token = response.cookies[settings.CSRF_COOKIE_NAME].value
+    cases = (
+        ('GET form, no cookie', lambda: get(form_view, cookie=False)),
+        ('GET form, cookie', lambda: get(form_view)),
+        ('GET without form', lambda: get(plain_view)),
+        ('GET csrf_exempt view', lambda: get(exempt_view)),
+        ('POST form', post),
+    )
+    assert post().status_code == 200, "The POST was rejected."
+
+    print('%-24s %10s' % ('request', 'us'))
+    for name, case in cases:
+        best = min(timeit.repeat(case, number=options.number, repeat=3))
+        print('%-24s %10.1f' % (name, best / options.number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
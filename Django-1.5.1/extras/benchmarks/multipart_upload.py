@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+"""
+Measures how fast MultiPartParser takes in a large file upload with each
+upload handler.
+
+The body, a single file part of ``--size`` megabytes (1GB by default), is
+generated while it is read, so it never sits in memory. Besides the temporary
+file handlers, a handler that throws the data away shows the cost of the
+parser alone:
+
+    python extras/benchmarks/multipart_upload.py --size 1024
+
+``--django-path`` imports Django from another checkout instead, so that the
+same body can be timed before and after a change; handlers missing from that
+checkout are skipped.
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+
+BOUNDARY = b'BoUnDaRyStRiNg'
+
+
+class MultipartBody(object):
+    """
+    A file-like multipart/form-data body holding one file of ``size`` bytes,
+    built from a repeated block of random bytes.
+    """
+    def __init__(self, size, part_length=False):
+        headers = [
+            b'--' + BOUNDARY,
+            b'Content-Disposition: form-data; name="file"; filename="upload.bin"',
+            b'Content-Type: application/octet-stream',
+        ]
+        if part_length:
+            headers.append(b'Content-Length: ' + str(size).encode('ascii'))
+        self.head = b'\r\n'.join(headers) + b'\r\n\r\n'
+        self.tail = b'\r\n--' + BOUNDARY + b'--\r\n'
+        self.block = os.urandom(1024 * 1024)
+        self.size = size
+        self.length = len(self.head) + size + len(self.tail)
+        self.position = 0
+
+    def read(self, size=-1):
+        if size < 0:
+            size = self.length - self.position
+        pieces = []
+        while size > 0 and self.position < self.length:
+            start = self.position
+            if start < len(self.head):
+                piece = self.head[start:start + size]
+            elif start < len(self.head) + self.size:
+                offset = (start - len(self.head)) % len(self.block)
+                left = len(self.head) + self.size - start
+                piece = self.block[offset:offset + min(size, left)]
+            else:
+                offset = start - len(self.head) - self.size
+                piece = self.tail[offset:offset + size]
+            pieces.append(piece)
+            self.position += len(piece)
+            size -= len(piece)
+        return b''.join(pieces)
+
+
+def handlers():
+    """
+    Returns (name, handler class, settings) for each handler to time.
+    """
+    from django.core.files import uploadhandler
+
+    class DiscardUploadHandler(uploadhandler.FileUploadHandler):
+        def receive_data_chunk(self, raw_data, start):
+            return None
+
+        def file_complete(self, file_size):
+            return None
+
+    cases = [
+        ('parser only', DiscardUploadHandler, {}),
+        ('temporary file', uploadhandler.TemporaryFileUploadHandler, {}),
+    ]
+    direct = getattr(uploadhandler, 'DirectTemporaryFileUploadHandler', None)
+    if direct is not None:
+        cases += [
+            ('direct', direct, {}),
+            ('direct, fsync 64MB', direct,
+             {'FILE_UPLOAD_FSYNC_INTERVAL': 64 * 1024 * 1024}),
+            ('direct, fsync end', direct, {'FILE_UPLOAD_FSYNC': True}),
+        ]
+    return cases
+
+
+def parse(handler_class, size, part_length):
+    """
+    Parses a generated body with ``handler_class`` and returns the time taken.
+    """
+    from django.http.multipartparser import MultiPartParser
+
+    body = MultipartBody(size, part_length)
+    META = {
+        'CONTENT_TYPE': 'multipart/form-data; boundary=%s' % BOUNDARY.decode('ascii'),
+        'CONTENT_LENGTH': str(body.length),
+    }
+    start = time.time()
+    post, files = MultiPartParser(META, body, [handler_class()]).parse()
+    elapsed = time.time() - start
+    for upload in files.values():
+        upload.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--size', type=int, default=1024,
+                        help='size of the uploaded file in megabytes')
+    parser.add_argument('--part-length', action='store_true',
+                        help='give the file part a Content-Length header')
+    parser.add_argument('--django-path',
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'),
+                        help='directory to import Django from')
+    options = parser.parse_args()
+    sys.path.insert(0, options.django_path)
+
+    from django.conf import settings
+    if not settings.configured:
+        settings.configure()
+
+    size = options.size * 1024 * 1024
+    print('%d MB file%s' % (options.size,
+        ', with a part Content-Length' if options.part_length else ''))
+    print('%-20s %10s %8s' % ('handler', 'seconds', 'MB/s'))
+    for name, handler_class, overrides in handlers():
+        defaults = dict((key, getattr(settings, key, None)) for key in overrides)
+        for key, value in overrides.items():
+            setattr(settings, key, value)
+        try:
+            elapsed = parse(handler_class, size, options.part_length)
+        finally:
+            for key, value in defaults.items():
+                setattr(settings, key, value)
+        print('%-20s %10.2f %8.0f' % (name, elapsed, options.size / elapsed))
+
+
+if __name__ == '__main__':
+    main()
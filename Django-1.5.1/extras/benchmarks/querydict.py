@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Micro-benchmarks for QueryDict, next to the MultiValueDict it is built on.
+
+A query string of ``--fields`` pairs, some keys repeated as with checkbox
+lists, is parsed into a QueryDict, and the result is copied, deep-copied and
+read. The same pairs are loaded into a plain MultiValueDict for comparison:
+
+    python extras/benchmarks/querydict.py --fields 4000
+
+``--django-path`` imports Django from another checkout instead, so that the
+numbers can be compared before and after a change.
+"""
+from __future__ import print_function
+
+import argparse
+import copy
+import os
+import sys
+import timeit
+
+
+def query_string(fields):
+    """
+    Returns a query string of ``fields`` pairs; every fifth key is repeated
+    three times and a few values need decoding.
+    """
+    pairs = []
+    for i in range(fields):
+        if i % 5 == 0:
+            pairs.append('choice%d=%d' % (i // 15, i))
+        else:
+            pairs.append('field%d=value%%20%d' % (i, i))
+    return '&'.join(pairs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--fields', type=int, default=4000,
+                        help='pairs in the query string')
+    parser.add_argument('--number', type=int, default=20,
+                        help='calls per timing run')
+    parser.add_argument('--django-path',
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'),
+                        help='directory to import Django from')
+    options = parser.parse_args()
+    sys.path.insert(0, options.django_path)
+
+    from django.conf import settings
+    if not settings.configured:
+        settings.configure()
+
+    from django.http import QueryDict
+    from django.utils.datastructures import MultiValueDict
+
+    qs = query_string(options.fields)
+    query = QueryDict(qs)
+    mutable = query.copy()
+    lists = list(query.lists())
+    multi = MultiValueDict(dict(lists))
+
+    def read():
+        for key in query:
+            query.getlist(key)
+
+    cases = (
+        ('QueryDict(qs)', lambda: QueryDict(qs)),
+        ('QueryDict.copy()', lambda: query.copy()),
+        ('copy.deepcopy(QueryDict)', lambda: copy.deepcopy(query)),
+        ('QueryDict.getlist(), all keys', read),
+        ('QueryDict.urlencode()', lambda: query.urlencode()),
+        ('mutable QueryDict.setlist()',
+         lambda: mutable.setlist('choice0', ['1', '2'])),
+        ('MultiValueDict(lists)', lambda: MultiValueDict(dict(lists))),
+        ('MultiValueDict.copy()', lambda: multi.copy()),
+        ('copy.deepcopy(MultiValueDict)', lambda: copy.deepcopy(multi)),
+    )
+
+    print('%d pairs, %d keys' % (options.fields, len(query)))
+    print('%-32s %12s' % ('operation', 'ms per call'))
+    for name, case in cases:
+        best = min(timeit.repeat(case, number=options.number, repeat=3))
+        print('%-32s %12.3f' % (name, best / options.number * 1000))
+
+
+if __name__ == '__main__':
+    main()
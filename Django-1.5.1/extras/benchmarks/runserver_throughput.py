@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""
+Compares the requests per second the development server's modes sustain.
+
+A trivial Django view is served by django.core.servers.basehttp.run() with
+a thread per connection (the only threaded mode before --threads), with a
+pool of ``--threads`` threads, with the pool and keep-alive, and with
+``--processes`` forked processes each running such a pool. ``--concurrency``
+clients send requests one after the other for ``--duration`` seconds, over
+new connections, or over one persistent connection each when keep-alive is
+on:
+
+    python extras/benchmarks/runserver_throughput.py --threads 8 --concurrency 8
+
+Each idle keep-alive connection holds one pool thread, so keep ``--concurrency``
+at or below ``--threads``; extra clients would wait for a free thread until
+the others' connections close.
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    from http.client import HTTPConnection
+except ImportError:
+    from httplib import HTTPConnection
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from django.conf import settings
+
+if not settings.configured:
+    settings.configure(
+        DEBUG=False,
+        ALLOWED_HOSTS=['*'],
+        ROOT_URLCONF=__name__,
+        MIDDLEWARE_CLASSES=(
+            'django.middleware.common.CommonMiddleware',
+        ),
+    )
+
+from django.conf.urls import patterns, url
+from django.http import HttpResponse
+
+
+def hello(request):
+    return HttpResponse(b'Hello, world!')
+
+urlpatterns = patterns('',
+    url(r'^$', hello),
+)
+
+# Name, run() keyword arguments and whether clients keep connections open.
+MODES = (
+    ('thread per connection', {'threading': True}, False),
+    ('thread pool', {'threading': True, 'threads': None}, False),
+    ('pool, keep-alive', {'threading': True, 'threads': None, 'keep_alive': 5}, True),
+    ('processes, keep-alive',
+     {'threading': True, 'threads': None, 'keep_alive': 5, 'processes': None}, True),
+)
+
+
+def serve(mode, port, threads, processes):
+    from django.core.servers.basehttp import run
+    from django.core.wsgi import get_wsgi_application
+    kwargs = dict(MODES[mode][1])
+    if 'threads' in kwargs:
+        kwargs['threads'] = threads
+    if 'processes' in kwargs:
+        kwargs['processes'] = processes
+    run('127.0.0.1', port, get_wsgi_application(), backlog=1024, **kwargs)
+
+
+def wait_for_server(port):
+    for i in range(100):
+        try:
+            connection = HTTPConnection('127.0.0.1', port)
+            connection.request('GET', '/', headers={'Connection': 'close'})
+            connection.getresponse().read()
+            connection.close()
+            return
+        except (IOError, OSError):
+            time.sleep(0.1)
+    raise RuntimeError("The server on port %d didn't start." % port)
+
+
+def load(port, concurrency, duration, keep_alive):
+    """
+    Returns the number of requests per second served to ``concurrency``
+    clients over ``duration`` seconds, and the number of failed requests.
+    """
+    deadline = time.time() + duration
+    counts = []
+    lock = threading.Lock()
+
+    def client():
+        done = errors = 0
+        connection = None
+        while time.time() < deadline:
+            try:
+                if connection is None:
+                    connection = HTTPConnection('127.0.0.1', port, timeout=30)
+                if keep_alive:
+                    connection.request('GET', '/')
+                else:
+                    connection.request('GET', '/', headers={'Connection': 'close'})
+                response = connection.getresponse()
+                response.read()
+                if response.status == 200:
+                    done += 1
+                else:
+                    errors += 1
+            except (IOError, OSError):
+                errors += 1
+                connection.close()
+                connection = None
+            if not keep_alive and connection is not None:
+                connection.close()
+                connection = None
+        if connection is not None:
+            connection.close()
+        with lock:
+            counts.append((done, errors))
+
+    started = time.time()
+    clients = [threading.Thread(target=client) for i in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.time() - started
+    return (sum(done for done, errors in counts) / elapsed,
+            sum(errors for done, errors in counts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--threads', type=int, default=8,
+                        help='size of the thread pool')
+    parser.add_argument('--processes', type=int, default=2,
+                        help='processes forked in the last mode')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.serve is not None:
+        serve(options.serve, options.port, options.threads, options.processes)
+        return
+
+    print('%d threads, %d processes, %d clients' % (
+        options.threads, options.processes, options.concurrency))
+    print('%-24s %10s %7s' % ('server', 'requests/s', 'errors'))
+    with open(os.devnull, 'w') as devnull:
+        for mode, (name, kwargs, keep_alive) in enumerate(MODES):
+            # The server logs every request to stderr.
+            process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), '--serve', str(mode),
+                 '--port', str(options.port), '--threads', str(options.threads),
+                 '--processes', str(options.processes)],
+                stderr=devnull)
+            try:
+                wait_for_server(options.port)
+                rate, errors = load(options.port, options.concurrency,
+                                    options.duration, keep_alive)
+            finally:
+                process.terminate()
+                process.wait()
+            print('%-24s %10.1f %7d' % (name, rate, errors))
+
+
+if __name__ == '__main__':
+    main()
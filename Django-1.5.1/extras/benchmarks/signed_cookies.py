@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Times the signed_cookies session backend on the paths a request takes:
+loading a session from its cookie, and changing and saving it.
+
+Each path is timed with the derived HMAC keys cached, as salted_hmac() now
+does, and with the cache disabled, which derives the key on every call as
+before. salted_hmac() is timed alone for reference, and loading a cookie
+signed with a key listed in SECRET_KEY_FALLBACKS is timed too:
+
+    python extras/benchmarks/signed_cookies.py
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from django.conf import settings
+
+if not settings.configured:
+    settings.configure(
+        SECRET_KEY='current-secret-key',
+        SECRET_KEY_FALLBACKS=['previous-secret-key'],
+        SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies',
+    )
+
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.utils import crypto
+
+SESSION_DATA = {
+    '_auth_user_id': 1234,
+    '_auth_user_backend': 'django.contrib.auth.backends.ModelBackend',
+    'cart': [1, 5, 9],
+}
+
+
+class NoCache(dict):
+    """
+    Stands in for salted_hmac()'s key cache, and never stores anything.
+    """
+    def __setitem__(self, key, value):
+        pass
+
+
+def signed_cookie(secret_key):
+    """
+    Returns the cookie value of a session holding SESSION_DATA, signed with
+    ``secret_key``.
+    """
+    current, settings.SECRET_KEY = settings.SECRET_KEY, secret_key
+    try:
+        session = SessionStore()
+        session.update(SESSION_DATA)
+        session.save()
+        return session.session_key
+    finally:
+        settings.SECRET_KEY = current
+
+
+def load(cookie):
+    return SessionStore(cookie)['_auth_user_id']
+
+
+def save(cookie):
+    session = SessionStore(cookie)
+    session['cart'] = session['cart'] + [1]
+    session.save()
+    return session.session_key
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--number', type=int, default=5000,
+                        help='calls per timing run')
+    options = parser.parse_args()
+
+    cookie = signed_cookie(settings.SECRET_KEY)
+    old_cookie = signed_cookie(settings.SECRET_KEY_FALLBACKS[0])
+    cases = (
+        ('salted_hmac() only', lambda: crypto.salted_hmac('salt', 'value')),
+        ('load', lambda: load(cookie)),
+        ('load, fallback key', lambda: load(old_cookie)),
+        ('change and save', lambda: save(cookie)),
+    )
+    key_cache = crypto._salted_hmacs
+
+    print('%-20s %16s %16s' % ('path', 'uncached (us)', 'cached (us)'))
+    for name, case in cases:
+        times = []
+        for cache in (NoCache(), key_cache):
+            crypto._salted_hmacs = cache
+            best = min(timeit.repeat(case, number=options.number, repeat=5))
+            times.append(best / options.number * 1e6)
+        crypto._salted_hmacs = key_cache
+        print('%-20s %16.1f %16.1f' % ((name,) + tuple(times)))
+
+
+if __name__ == '__main__':
+    main()
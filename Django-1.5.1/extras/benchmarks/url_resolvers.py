@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+r"""
+Times resolve() and reverse() against a large generated urlconf.
+
+The urlconf has ``--patterns`` patterns: half of them '^sectionN/(?P<pk>\d+)/$'
+at the top level, and the rest in includes of ten patterns each, plus a few
+patterns without arguments. URLs matching the first and last patterns of
+each kind are resolved, along with one that matches nothing. The same
+patterns are reversed by name, and an argument-free one both by name and by
+view, as {% url %} does on every render:
+
+    python extras/benchmarks/url_resolvers.py --patterns 1400
+
+``--django-path`` imports Django from another checkout instead, so that the
+numbers can be compared before and after a change.
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import timeit
+import types
+
+
+def view(request, **kwargs):
+    pass
+
+
+def static_view(request):
+    pass
+
+
+def build_urlconf(count):
+    """
+    Returns a urlconf module with ``count`` patterns.
+    """
+    from django.conf.urls import include, patterns, url
+
+    top_level = count // 2
+    includes = (count - top_level) // 10
+    urlpatterns = patterns('', *[
+        url(r'^section%d/(?P<pk>\d+)/$' % i, view, name='section%d' % i)
+        for i in range(top_level)])
+    urlpatterns += patterns('', *[
+        url(r'^static%d/$' % i, static_view if i == 0 else view, name='static%d' % i)
+        for i in range(10)])
+    for i in range(includes):
+        app = patterns('', *[
+            url(r'^item%d/(?P<slug>[\w-]+)/$' % j, view, name='app%d-item%d' % (i, j))
+            for j in range(10)])
+        urlpatterns += patterns('', url(r'^app%d/' % i, include(app)))
+    module = types.ModuleType('benchmark_urls')
+    module.urlpatterns = urlpatterns
+    module.top_level = top_level
+    module.includes = includes
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--patterns', type=int, default=1400,
+                        help='number of URL patterns')
+    parser.add_argument('--number', type=int, default=200,
+                        help='calls per timing run')
+    parser.add_argument('--django-path',
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'),
+                        help='directory to import Django from')
+    options = parser.parse_args()
+    sys.path.insert(0, options.django_path)
+
+    from django.conf import settings
+    if not settings.configured:
+        settings.configure(ROOT_URLCONF='benchmark_urls')
+
+    from django.core.urlresolvers import Resolver404, resolve, reverse
+
+    urlconf = build_urlconf(options.patterns)
+    sys.modules['benchmark_urls'] = urlconf
+
+    def resolve_or_404(path):
+        try:
+            resolve(path)
+        except Resolver404:
+            pass
+
+    last_app = urlconf.includes - 1
+    paths = (
+        ('first pattern', '/section0/1/'),
+        ('last top-level pattern', '/section%d/1/' % (urlconf.top_level - 1)),
+        ('first included pattern', '/app0/item0/slug/'),
+        ('last included pattern', '/app%d/item9/slug/' % last_app),
+        ('no match (404)', '/missing/'),
+    )
+
+    last_section = 'section%d' % (urlconf.top_level - 1)
+    reverses = (
+        ('first pattern, kwargs', 'section0', {'pk': 1}),
+        ('last pattern, kwargs', last_section, {'pk': 1}),
+        ('last pattern, args', last_section, [1]),
+        ('included pattern, kwargs', 'app%d-item9' % last_app, {'slug': 'slug'}),
+        ('no arguments, by name', 'static9', None),
+        ('no arguments, by view', static_view, None),
+    )
+
+    print('%d patterns' % options.patterns)
+    print('%-26s %-28s %10s' % ('resolve()', 'path', 'us'))
+    for name, path in paths:
+        # The first call populates the resolvers.
+        resolve_or_404(path)
+        best = min(timeit.repeat(lambda: resolve_or_404(path),
+                                 number=options.number, repeat=3))
+        print('%-26s %-28s %10.1f' % (name, path, best / options.number * 1e6))
+
+    print()
+    print('%-26s %-28s %10s' % ('reverse()', 'URL', 'us'))
+    for name, viewname, arguments in reverses:
+        if isinstance(arguments, dict):
+            call = lambda: reverse(viewname, kwargs=arguments)
+        else:
+            call = lambda: reverse(viewname, args=arguments)
+        result = call()
+        best = min(timeit.repeat(call, number=options.number, repeat=3))
+        print('%-26s %-28s %10.1f' % (name, result, best / options.number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -16,7 +16,7 @@ import codecs
 
 from django import conf, bin, get_version
 from django.conf import settings
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
 from django.db import connection
 from django.test.simple import DjangoTestSuiteRunner
 from django.utils import unittest
@@ -1181,6 +1181,17 @@ class ManageRunserver(AdminScriptTestCase):
         self.cmd.handle(addrport="deadbeef:7654")
         self.assertServerSettings('deadbeef', '7654')
 
+    def test_runner_server_options(self):
+        self.cmd.handle(threads=4, keep_alive=5, backlog=64)
+        self.assertServerSettings('127.0.0.1', '8000')
+        self.assertRaises(CommandError, self.cmd.handle,
+                          threads=4, use_threading=False)
+        self.assertRaises(CommandError, self.cmd.handle,
+                          keep_alive=5, use_threading=False)
+        if hasattr(os, 'fork'):
+            self.assertRaises(CommandError, self.cmd.handle, processes=2)
+            self.cmd.handle(processes=2, use_reloader=False)
+
 
 ##########################################################################
 # COMMAND PROCESSING TESTS
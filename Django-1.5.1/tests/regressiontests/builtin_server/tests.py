@@ -1,8 +1,12 @@
 from __future__ import unicode_literals
 
+import socket
+import threading
+import time
 from io import BytesIO
 
-from django.core.servers.basehttp import ServerHandler
+from django.core.servers.basehttp import (ServerHandler, ThreadPoolMixIn,
+    WSGIServer, WSGIRequestHandler)
 from django.utils.unittest import TestCase
 
 #
@@ -53,3 +57,110 @@ class WSGIFileWrapperTests(TestCase):
         self.assertFalse(handler._used_sendfile)
         self.assertEqual(handler.stdout.getvalue().splitlines()[-1], b'Hello World!')
         self.assertEqual(handler.stderr.getvalue(), b'')
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+class PoolWSGIServer(ThreadPoolMixIn, WSGIServer):
+    pool_size = 2
+
+def wsgi_app_streaming(environ, start_response):
+    start_response(str('200 OK'), [(str('Content-Type'), str('text/plain'))])
+    return iter([b'Hello ', b'World!'])
+
+class KeepAliveTests(TestCase):
+    """
+    Test HTTP/1.1 keep-alive and pipelining in the builtin server.
+    """
+    def setUp(self):
+        self.server, self.thread, self.sock = self.start_server(keep_alive=5)
+
+    def start_server(self, keep_alive):
+        """
+        Starts a server with the given keep-alive timeout, and returns it with
+        its thread and a client connected to it.
+        """
+        server = PoolWSGIServer(('127.0.0.1', 0), QuietWSGIRequestHandler,
+                                keep_alive=keep_alive)
+        server.set_app(self.dispatch)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        sock = socket.create_connection(server.server_address, 5)
+        self.addCleanup(sock.close)
+        return server, thread, sock
+
+    def dispatch(self, environ, start_response):
+        if environ['PATH_INFO'] == '/streaming/':
+            return wsgi_app_streaming(environ, start_response)
+        return wsgi_app(environ, start_response)
+
+    def receive(self, count):
+        """
+        Reads until the connection is closed or ``count`` responses came in.
+        """
+        data = b''
+        while data.count(b'Hello World!') < count:
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    def test_pipelined_requests(self):
+        # The body of the POST isn't read by the application, and must be
+        # skipped before the next request.
+        self.sock.sendall(
+            b'POST / HTTP/1.1\r\nHost: test\r\nContent-Length: 7\r\n\r\nignored'
+            b'GET / HTTP/1.1\r\nHost: test\r\n\r\n')
+        data = self.receive(2)
+        self.assertEqual(data.count(b'HTTP/1.1 200 OK\r\n'), 2)
+        self.assertEqual(data.count(b'Content-Length: 12\r\n'), 2)
+        self.assertNotIn(b'Connection: close', data)
+
+        self.sock.sendall(b'GET / HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n')
+        data = self.receive(2)
+        self.assertIn(b'Connection: close\r\n', data)
+        self.assertEqual(self.sock.recv(4096), b'')
+
+    def test_streaming_response_closes_connection(self):
+        self.sock.sendall(b'GET /streaming/ HTTP/1.1\r\nHost: test\r\n\r\n')
+        data = self.receive(2)
+        self.assertIn(b'Connection: close\r\n', data)
+        self.assertTrue(data.endswith(b'Hello World!'))
+        self.assertEqual(self.sock.recv(4096), b'')
+
+    def test_http10_keep_alive(self):
+        self.sock.sendall(b'GET / HTTP/1.0\r\nConnection: keep-alive\r\n\r\n')
+        data = self.receive(1)
+        self.assertIn(b'Connection: keep-alive\r\n', data)
+        self.sock.sendall(b'GET / HTTP/1.0\r\n\r\n')
+        data = self.receive(2)
+        self.assertIn(b'Connection: close\r\n', data)
+
+    def test_incomplete_headers_time_out(self):
+        server, thread, sock = self.start_server(keep_alive=0.2)
+        sock.sendall(b'GET / HTTP/1.1\r\nHost: te')
+        # The server gives up on the headers and closes the connection.
+        self.assertEqual(sock.recv(4096), b'')
+
+    def test_shutdown_with_busy_workers(self):
+        # Both workers hold an idle connection, and two more wait in the
+        # queue, which is then full.
+        clients = [socket.create_connection(self.server.server_address, 5)
+                   for i in range(3)]
+        try:
+            deadline = time.time() + 5
+            while not self.server._connections.full() and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(self.server._connections.full())
+            self.server.shutdown()
+            self.thread.join(2)
+            self.assertFalse(self.thread.is_alive())
+        finally:
+            for client in clients:
+                client.close()
@@ -0,0 +1,125 @@
+"""
+A minimal in-process server speaking the memcached text protocol, enough to
+exercise the memcached cache backends without a real memcached.
+"""
+from __future__ import unicode_literals
+
+import socket
+import threading
+
+from django.utils.six.moves import socketserver
+
+
+class MemcachedRequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        self.server.connections.add(self.connection)
+        while True:
+            try:
+                line = self.rfile.readline()
+            except socket.error:
+                return
+            if not line:
+                return
+            parts = line.split()
+            if not parts:
+                continue
+            command, args = parts[0].decode('ascii'), parts[1:]
+            handler = getattr(self, 'do_%s' % command, None)
+            if handler is None:
+                self.wfile.write(b'ERROR\r\n')
+            else:
+                handler(args)
+            self.wfile.flush()
+
+    @property
+    def data(self):
+        return self.server.data
+
+    def do_get(self, keys):
+        with self.server.lock:
+            for key in keys:
+                if key in self.data:
+                    flags, value = self.data[key]
+                    self.wfile.write(b'VALUE ' + key + b' ' + flags + b' ' +
+                                     str(len(value)).encode('ascii') + b'\r\n' +
+                                     value + b'\r\n')
+        self.wfile.write(b'END\r\n')
+
+    do_gets = do_get
+
+    def _store(self, args, mode):
+        key, flags, exptime, length = args[:4]
+        value = self.rfile.read(int(length) + 2)[:-2]
+        with self.server.lock:
+            if mode == 'add' and key in self.data:
+                stored = False
+            else:
+                self.data[key] = (flags, value)
+                stored = True
+        if b'noreply' not in args:
+            self.wfile.write(b'STORED\r\n' if stored else b'NOT_STORED\r\n')
+
+    def do_set(self, args):
+        self._store(args, 'set')
+
+    def do_add(self, args):
+        self._store(args, 'add')
+
+    def do_delete(self, args):
+        with self.server.lock:
+            found = self.data.pop(args[0], None) is not None
+        if b'noreply' not in args:
+            self.wfile.write(b'DELETED\r\n' if found else b'NOT_FOUND\r\n')
+
+    def _change(self, args, sign):
+        with self.server.lock:
+            if args[0] not in self.data:
+                self.wfile.write(b'NOT_FOUND\r\n')
+                return
+            flags, value = self.data[args[0]]
+            value = str(max(0, int(value) + sign * int(args[1]))).encode('ascii')
+            self.data[args[0]] = (flags, value)
+        self.wfile.write(value + b'\r\n')
+
+    def do_incr(self, args):
+        self._change(args, 1)
+
+    def do_decr(self, args):
+        self._change(args, -1)
+
+    def do_flush_all(self, args):
+        with self.server.lock:
+            self.data.clear()
+        self.wfile.write(b'OK\r\n')
+
+
+class FakeMemcachedServer(socketserver.ThreadingTCPServer):
+    """
+    Listens on an ephemeral localhost port; ``location`` is the
+    ``host:port`` string to use in the cache's LOCATION.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        socketserver.ThreadingTCPServer.__init__(
+            self, ('127.0.0.1', 0), MemcachedRequestHandler)
+        self.data = {}
+        self.connections = set()
+        self.lock = threading.Lock()
+        self.location = '%s:%s' % self.server_address
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        for connection in self.connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
@@ -8,6 +8,8 @@ import hashlib
 import os
 import random
 import re
+import shutil
+import socket
 import string
 import tempfile
 import time
@@ -18,6 +20,13 @@ from django.core import management
 from django.core.cache import get_cache
 from django.core.cache.backends.base import (CacheKeyWarning,
     InvalidCacheBackendError)
+from django.core.cache.backends.instrumented import get_cache_stats
+from django.core.cache.backends.memcached import (ConsistentHashingClient,
+    HashRing)
+from django.core.cache.compressors import ZlibCompressor
+from django.core.cache.serializers import JSONSerializer, PickleSerializer
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import cache_operation
 from django.db import router
 from django.http import (HttpResponse, HttpRequest, StreamingHttpResponse,
     QueryDict)
@@ -29,10 +38,13 @@ from django.test import TestCase, TransactionTestCase, RequestFactory
 from django.test.utils import override_settings, six
 from django.utils import timezone, translation, unittest
 from django.utils.cache import (patch_vary_headers, get_cache_key,
-    learn_cache_key, patch_cache_control, patch_response_headers)
+    learn_cache_key, patch_cache_control, patch_response_headers,
+    get_cached_response, invalidate_cache_path, invalidate_cache_tags,
+    patch_cache_tags)
 from django.utils.encoding import force_text
 from django.views.decorators.cache import cache_page
 
+from .fake_memcached import FakeMemcachedServer
 from .models import Poll, expensive_calculation
 
 # functions/classes for complex data type tests
@@ -974,6 +986,196 @@ class MemcachedCacheTests(unittest.TestCase, BaseCacheTests):
         self.assertRaises(Exception, self.cache.set, 'a' * 251, 'value')
 
 
+class FakeLibraryClient(object):
+    """
+    Stands in for a memcached library client talking to a single server.
+    """
+    def __init__(self, servers):
+        self.server = servers[0]
+        self.data = {}
+        self.down = False
+        self.calls = 0
+
+    def _check(self):
+        self.calls += 1
+        if self.down:
+            raise socket.error('connection refused')
+
+    def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    def set(self, key, value, time=0):
+        self._check()
+        self.data[key] = value
+        return True
+
+    def get_multi(self, keys):
+        self._check()
+        return dict((k, self.data[k]) for k in keys if k in self.data)
+
+    def disconnect_all(self):
+        pass
+
+
+class HashRingTests(unittest.TestCase):
+
+    def test_key_distribution(self):
+        servers = ['10.0.0.%d:11211' % i for i in range(1, 5)]
+        ring = HashRing(servers)
+        owners = [ring.get_server('key%d' % i) for i in range(1000)]
+        self.assertEqual(owners, [HashRing(servers).get_server('key%d' % i)
+                                  for i in range(1000)])
+        self.assertEqual(set(owners), set(servers))
+
+    def test_adding_server_moves_few_keys(self):
+        servers = ['10.0.0.%d:11211' % i for i in range(1, 5)]
+        before = HashRing(servers)
+        after = HashRing(servers + ['10.0.0.5:11211'])
+        moved = [i for i in range(2000) if
+                 before.get_server('key%d' % i) != after.get_server('key%d' % i)]
+        # Ideally 1/5 of the keys move; modulo hashing would move 4/5.
+        self.assertTrue(len(moved) < 2000 * 0.35)
+        for i in moved:
+            self.assertEqual(after.get_server('key%d' % i), '10.0.0.5:11211')
+
+    def test_iter_servers(self):
+        servers = ['a:1', 'b:1', 'c:1']
+        ring = HashRing(servers)
+        candidates = list(ring.iter_servers('key'))
+        self.assertEqual(sorted(candidates), servers)
+        self.assertEqual(candidates[0], ring.get_server('key'))
+        self.assertEqual(HashRing([]).get_server('key'), None)
+
+
+class ConsistentHashingClientTests(unittest.TestCase):
+
+    def setUp(self):
+        self.servers = ['a:1', 'b:1', 'c:1']
+        self.ring = HashRing(self.servers)
+        self.failures = {}
+        self.client = ConsistentHashingClient(
+            self.servers, self.ring, FakeLibraryClient, self.failures,
+            server_errors=(socket.error,), dead_retry=10, max_dead_retry=25)
+
+    def test_routing(self):
+        self.client.set('key', 'value')
+        owner = self.client._clients[self.ring.get_server('key')]
+        self.assertEqual(owner.data, {'key': 'value'})
+        self.assertEqual(self.client.get('key'), 'value')
+
+    def test_get_multi(self):
+        keys = ['key%d' % i for i in range(20)]
+        for key in keys:
+            self.client.set(key, key.upper())
+        self.assertEqual(self.client.get_multi(keys),
+                         dict((key, key.upper()) for key in keys))
+
+    def test_failover_and_backoff(self):
+        owner, fallback = list(self.ring.iter_servers('key'))[:2]
+        self.client._clients[owner].down = True
+
+        self.assertEqual(self.client.set('key', 'value'), False)
+        retry_at, count = self.failures[owner]
+        self.assertEqual(count, 1)
+        self.assertTrue(retry_at - time.time() <= 10)
+
+        # The key fails over to the next server on the ring.
+        self.client.set('key', 'value')
+        self.assertEqual(self.client._clients[fallback].data, {'key': 'value'})
+        calls = self.client._clients[owner].calls
+        self.assertEqual(self.client.get('key'), 'value')
+        self.assertEqual(self.client._clients[owner].calls, calls)
+
+        # Retrying a server that is still down doubles the delay, up to the cap.
+        self.failures[owner] = (0, 1)
+        self.client.get('key')
+        retry_at, count = self.failures[owner]
+        self.assertEqual(count, 2)
+        self.assertTrue(10 < retry_at - time.time() <= 20)
+        self.failures[owner] = (0, 2)
+        self.client.get('key')
+        retry_at, count = self.failures[owner]
+        self.assertEqual(count, 3)
+        self.assertTrue(20 < retry_at - time.time() <= 25)
+
+        # Once the server answers again it is put back on the ring.
+        self.client._clients[owner].down = False
+        self.failures[owner] = (0, 3)
+        self.client.set('key', 'new')
+        self.assertFalse(owner in self.failures)
+        self.assertEqual(self.client.get('key'), 'new')
+
+    def test_all_servers_dead(self):
+        for client in self.client._clients.values():
+            client.down = True
+        for server in self.servers:
+            self.client._mark_dead(server)
+        self.assertEqual(self.client.get('key'), None)
+        self.assertEqual(self.client.get_multi(['key']), {})
+
+
+try:
+    import memcache
+except ImportError:
+    memcache = None
+
+
+@unittest.skipUnless(memcache, "python-memcached not available")
+class FakeServerMemcachedCacheTests(unittest.TestCase):
+    """
+    Runs the python-memcached backend against local fake memcached servers.
+    """
+    backend_name = 'django.core.cache.backends.memcached.MemcachedCache'
+
+    def setUp(self):
+        self.servers = [FakeMemcachedServer() for i in range(3)]
+        for server in self.servers:
+            server.start()
+        self.cache = get_cache(self.backend_name,
+            LOCATION=[server.location for server in self.servers],
+            CONSISTENT_HASHING=True, DEAD_RETRY=60)
+
+    def tearDown(self):
+        self.cache.close()
+        for server in self.servers:
+            server.stop()
+
+    def test_operations(self):
+        self.cache.set('key', 'value')
+        self.assertEqual(self.cache.get('key'), 'value')
+        self.assertEqual(self.cache.add('key', 'other'), False)
+        self.cache.set_many(dict(('key%d' % i, i) for i in range(30)))
+        self.assertEqual(self.cache.get_many(['key1', 'key2', 'missing']),
+                         {'key1': 1, 'key2': 2})
+        self.assertEqual(self.cache.incr('key1', 10), 11)
+        self.cache.delete('key')
+        self.assertEqual(self.cache.get('key'), None)
+        # Keys are spread over every server.
+        self.assertTrue(all(server.data for server in self.servers))
+
+    def test_server_ejection(self):
+        self.cache.set('key', 'value')
+        owner = self.cache._ring.get_server(self.cache.make_key('key'))
+        dead = [server for server in self.servers if server.location == owner][0]
+        dead.stop()
+
+        self.assertEqual(self.cache.get('key'), None)
+        self.assertTrue(owner in self.cache._failures)
+        self.cache.set('key', 'value')
+        self.assertEqual(self.cache.get('key'), 'value')
+
+    def test_persistent_connections(self):
+        cache = get_cache(self.backend_name,
+            LOCATION=[server.location for server in self.servers],
+            PERSISTENT_CONNECTIONS=True)
+        cache.set('key', 'value')
+        client = cache._cache
+        cache.close()
+        self.assertTrue(cache._cache is client)
+        self.assertTrue(any(host.socket is not None for host in client.servers))
+
+
 class FileBasedCacheTests(unittest.TestCase, BaseCacheTests):
     """
     Specific test cases for the file-based cache.
@@ -1014,6 +1216,32 @@ class FileBasedCacheTests(unittest.TestCase, BaseCacheTests):
         self.assertTrue(not os.path.exists(os.path.dirname(keypath)))
         self.assertTrue(not os.path.exists(os.path.dirname(os.path.dirname(keypath))))
 
+    def test_undecodable_entry(self):
+        """
+        Entries that can't be deserialized are treated as misses and removed.
+        """
+        def keypath(cache, key):
+            keyhash = hashlib.md5(cache.make_key(key).encode()).hexdigest()
+            return os.path.join(self.dirname, keyhash[:2], keyhash[2:4], keyhash[4:])
+
+        json_cache = get_cache(self.backend_name, LOCATION=self.dirname,
+            SERIALIZER='django.core.cache.serializers.JSONSerializer')
+        self.cache.set('pickled', 'value')
+        self.assertEqual(json_cache.get('pickled', 'missing'), 'missing')
+        self.assertFalse(os.path.exists(keypath(self.cache, 'pickled')))
+
+        zlib_cache = get_cache(self.backend_name, LOCATION=self.dirname,
+            COMPRESSOR='django.core.cache.compressors.ZlibCompressor',
+            COMPRESSOR_OPTIONS={'min_length': 0})
+        zlib_cache.set('truncated', 'value' * 100)
+        fname = keypath(zlib_cache, 'truncated')
+        with open(fname, 'rb') as f:
+            data = f.read()
+        with open(fname, 'wb') as f:
+            f.write(data[:-10])
+        self.assertEqual(zlib_cache.get('truncated', 'missing'), 'missing')
+        self.assertFalse(os.path.exists(fname))
+
     def test_cull(self):
         self.perform_cull_test(50, 29)
 
@@ -1022,6 +1250,177 @@ class FileBasedCacheTests(unittest.TestCase, BaseCacheTests):
         self.perform_cull_test(50, 29)
 
 
+class CompressedFileBasedCacheTests(FileBasedCacheTests):
+    """
+    Runs the file-based cache tests with every value going through zlib.
+    """
+    def setUp(self):
+        super(CompressedFileBasedCacheTests, self).setUp()
+        for cache in (self.cache, self.prefix_cache, self.v2_cache,
+                      self.custom_key_cache, self.custom_key_cache2):
+            cache._compressor = ZlibCompressor(min_length=0)
+
+
+class CacheSerializationTests(unittest.TestCase):
+    """
+    Tests for the SERIALIZER and COMPRESSOR cache options.
+    """
+    backend_name = 'django.core.cache.backends.locmem.LocMemCache'
+
+    def test_default_serializer(self):
+        cache = get_cache(self.backend_name, LOCATION='serialization')
+        self.assertTrue(isinstance(cache._serializer, PickleSerializer))
+        self.assertEqual(cache._compressor, None)
+
+    def test_json_serializer(self):
+        cache = get_cache(self.backend_name, LOCATION='serialization',
+            SERIALIZER='django.core.cache.serializers.JSONSerializer')
+        value = {'a': [1, 2, 3], 'b': 'text'}
+        cache.set('key', value)
+        self.assertEqual(cache.get('key'), value)
+        self.assertEqual(cache._cache[cache.make_key('key')],
+                         b'{"a":[1,2,3],"b":"text"}')
+        cache.clear()
+
+    def test_serializer_class(self):
+        cache = get_cache(self.backend_name, SERIALIZER=JSONSerializer)
+        self.assertTrue(isinstance(cache._serializer, JSONSerializer))
+
+    def test_msgpack_serializer(self):
+        try:
+            import msgpack
+        except ImportError:
+            self.assertRaises(ImproperlyConfigured, get_cache,
+                self.backend_name,
+                SERIALIZER='django.core.cache.serializers.MessagePackSerializer')
+        else:
+            cache = get_cache(self.backend_name, LOCATION='serialization',
+                SERIALIZER='django.core.cache.serializers.MessagePackSerializer')
+            cache.set('key', {'a': [1, 2]})
+            self.assertEqual(cache.get('key'), {'a': [1, 2]})
+            cache.clear()
+
+    def test_compression_threshold(self):
+        cache = get_cache(self.backend_name, LOCATION='serialization',
+            COMPRESSOR='django.core.cache.compressors.ZlibCompressor',
+            COMPRESSOR_OPTIONS={'min_length': 100})
+        small, large = 'x' * 10, 'x' * 1000
+        cache.set('small', small)
+        cache.set('large', large)
+        self.assertEqual(cache.get('small'), small)
+        self.assertEqual(cache.get('large'), large)
+        stored_small = cache._cache[cache.make_key('small')]
+        stored_large = cache._cache[cache.make_key('large')]
+        self.assertEqual(stored_small[:1], b'\x00')
+        self.assertEqual(stored_large[:1], b'\x01')
+        self.assertTrue(len(stored_large) < len(large))
+        cache.clear()
+
+    def test_incompressible_value_stored_raw(self):
+        compressor = ZlibCompressor(min_length=0)
+        data = os.urandom(512)
+        compressed = compressor.compress(data)
+        self.assertEqual(compressed, b'\x00' + data)
+        self.assertEqual(compressor.decompress(compressed), data)
+
+    def test_compressor_reads_uncompressed_values(self):
+        dirname = tempfile.mkdtemp()
+        try:
+            plain = get_cache('django.core.cache.backends.filebased.FileBasedCache',
+                LOCATION=dirname)
+            compressed = get_cache('django.core.cache.backends.filebased.FileBasedCache',
+                LOCATION=dirname,
+                COMPRESSOR='django.core.cache.compressors.ZlibCompressor')
+            plain.set('key', ['value'] * 1000)
+            self.assertEqual(compressed.get('key'), ['value'] * 1000)
+        finally:
+            shutil.rmtree(dirname)
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'instrumented': {
+        'BACKEND': 'django.core.cache.backends.instrumented.InstrumentedCache',
+        'LOCATION': 'default',
+        'OPTIONS': {'SIZE_SAMPLE_RATE': 1},
+    },
+})
+class InstrumentedCacheTests(TestCase):
+
+    def setUp(self):
+        self.cache = get_cache('instrumented')
+        self.cache.stats.reset()
+
+    def tearDown(self):
+        self.cache.clear()
+
+    def test_wraps_alias(self):
+        self.cache.set('key', 'value')
+        self.assertEqual(get_cache('default').get('key'), 'value')
+        self.assertEqual(self.cache.get('key'), 'value')
+        # Statistics are shared by every instance wrapping the same alias.
+        self.assertTrue(get_cache('instrumented').stats is self.cache.stats)
+
+    def test_operations(self):
+        self.cache.set('user:1', 'a')
+        self.cache.set('user:2', 'b')
+        self.cache.get('user:1')
+        self.cache.delete('user:2')
+        operations = self.cache.stats.snapshot()['operations']
+        self.assertEqual(operations['set']['calls'], 2)
+        self.assertEqual(operations['get']['calls'], 1)
+        self.assertEqual(operations['delete']['calls'], 1)
+        self.assertEqual(operations['set']['errors'], 0)
+        self.assertTrue(operations['set']['max_time'] >= operations['set']['mean_time'])
+
+    def test_hits_by_key_group(self):
+        self.cache.set('user:1', 'a')
+        self.cache.set('page:1', None)
+        self.assertEqual(self.cache.get('user:1'), 'a')
+        self.assertEqual(self.cache.get('user:2', 'default'), 'default')
+        self.assertEqual(self.cache.get('page:1', 'default'), None)
+        self.cache.get_many(['user:1', 'user:3', 'page:2'])
+        keys = self.cache.stats.snapshot()['keys']
+        self.assertEqual(keys['user'], {'hits': 2, 'misses': 2, 'hit_ratio': 0.5})
+        self.assertEqual(keys['page'], {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+    def test_errors(self):
+        self.assertRaises(ValueError, self.cache.incr, 'missing')
+        operations = self.cache.stats.snapshot()['operations']
+        self.assertEqual(operations['incr']['errors'], 1)
+
+    def test_sizes(self):
+        self.cache.set('bytes', b'x' * 100)
+        self.cache.set_many({'a': 'y' * 500})
+        sizes = self.cache.stats.snapshot()['sizes']
+        self.assertEqual(sizes['sampled'], 2)
+        self.assertEqual(sizes['max'] > 500, True)
+
+    def test_snapshot_reset(self):
+        self.cache.get('key')
+        stats = get_cache_stats(reset=True)
+        self.assertEqual(stats['default']['operations']['get']['calls'], 1)
+        self.assertEqual(self.cache.stats.snapshot()['operations'], {})
+
+    def test_signal(self):
+        calls = []
+        def receiver(sender, **kwargs):
+            calls.append(kwargs)
+        cache_operation.connect(receiver)
+        try:
+            self.cache.get('key')
+        finally:
+            cache_operation.disconnect(receiver)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0]['alias'], 'default')
+        self.assertEqual(calls[0]['operation'], 'get')
+        self.assertEqual(calls[0]['key'], 'key')
+        self.assertEqual(calls[0]['hit'], False)
+        self.assertEqual(calls[0]['error'], False)
+
+
 class CustomCacheKeyValidationTests(unittest.TestCase):
     """
     Tests for the ability to mixin a custom ``validate_key`` method to
@@ -1440,6 +1839,42 @@ class CacheI18nTest(TestCase):
         get_cache_data = FetchFromCacheMiddleware().process_request(request)
         self.assertIsNone(get_cache_data)
 
+    @override_settings(
+            CACHE_MIDDLEWARE_KEY_PREFIX="test",
+            CACHE_MIDDLEWARE_SECONDS=60,
+            CACHE_MIDDLEWARE_STREAMING_MAX_SIZE=1024,
+            USE_ETAGS=True,
+    )
+    def test_middleware_caches_streaming_response(self):
+        request = self._get_request()
+        self.assertIsNone(FetchFromCacheMiddleware().process_request(request))
+
+        response = StreamingHttpResponse([b'Streamed ', b'content.'])
+        response = UpdateCacheMiddleware().process_response(request, response)
+        # Nothing is stored until the content has been sent.
+        self.assertIsNone(FetchFromCacheMiddleware().process_request(request))
+        self.assertEqual(b''.join(response.streaming_content), b'Streamed content.')
+
+        cached = FetchFromCacheMiddleware().process_request(request)
+        self.assertFalse(cached.streaming)
+        self.assertEqual(cached.content, b'Streamed content.')
+        self.assertEqual(cached['ETag'],
+            '"%s"' % hashlib.md5(b'Streamed content.').hexdigest())
+        self.assertTrue(cached.has_header('Expires'))
+
+    @override_settings(
+            CACHE_MIDDLEWARE_KEY_PREFIX="test",
+            CACHE_MIDDLEWARE_SECONDS=60,
+            CACHE_MIDDLEWARE_STREAMING_MAX_SIZE=10,
+    )
+    def test_middleware_doesnt_cache_large_streaming_response(self):
+        request = self._get_request()
+        self.assertIsNone(FetchFromCacheMiddleware().process_request(request))
+        response = StreamingHttpResponse([b'Streamed ', b'content.'])
+        response = UpdateCacheMiddleware().process_response(request, response)
+        self.assertEqual(b''.join(response.streaming_content), b'Streamed content.')
+        self.assertIsNone(FetchFromCacheMiddleware().process_request(request))
+
 @override_settings(
         CACHES={
             'default': {
@@ -1697,6 +2132,134 @@ class CacheMiddlewareTest(TestCase):
         self.assertEqual(response.content, b'Hello World 18')
 
 
+class CountingCache(object):
+    """
+    Wraps a cache and records the name of each method called on it.
+    """
+    def __init__(self, cache):
+        self._cache = cache
+        self.calls = []
+
+    def __getattr__(self, name):
+        attr = getattr(self._cache, name)
+        if callable(attr):
+            self.calls.append(name)
+        return attr
+
+
+@override_settings(
+        CACHE_MIDDLEWARE_KEY_PREFIX='tagprefix',
+        CACHE_MIDDLEWARE_SECONDS=30,
+        CACHE_MIDDLEWARE_ANONYMOUS_ONLY=False,
+        CACHE_MIDDLEWARE_ALIAS='default',
+        CACHE_MIDDLEWARE_PATH_TAGS=True,
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+        },
+        USE_I18N=False,
+)
+class CacheTagsTest(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.cache = get_cache('default')
+
+    def tearDown(self):
+        self.cache.clear()
+
+    def _cache_page(self, path, tags=(), vary=None):
+        request = self.factory.get(path)
+        self.assertEqual(FetchFromCacheMiddleware().process_request(request), None)
+        response = HttpResponse('content of %s' % path)
+        if vary:
+            patch_vary_headers(response, [vary])
+        patch_cache_tags(response, tags)
+        UpdateCacheMiddleware().process_response(request, response)
+
+    def _is_cached(self, path, **extra):
+        middleware = FetchFromCacheMiddleware()
+        middleware.cache = CountingCache(middleware.cache)
+        response = middleware.process_request(self.factory.get(path, **extra))
+        return response is not None, middleware.cache.calls
+
+    def test_single_round_trip(self):
+        self._cache_page('/tags/page/')
+        cached, calls = self._is_cached('/tags/page/')
+        self.assertTrue(cached)
+        self.assertEqual(calls, ['get_many'])
+
+        cached, calls = self._is_cached('/tags/other/')
+        self.assertFalse(cached)
+        self.assertEqual(calls, ['get_many'])
+
+    def test_vary_headers_need_second_fetch(self):
+        self._cache_page('/tags/vary/', vary='Accept-Encoding')
+        cached, calls = self._is_cached('/tags/vary/')
+        self.assertTrue(cached)
+        self.assertEqual(calls, ['get_many', 'get_many'])
+
+    def test_header_list_refreshed(self):
+        # The header list is set again with the page's timeout even if it
+        # didn't change, so that it can't expire before the page.
+        self._cache_page('/tags/page/')
+        request = self.factory.get('/tags/page/')
+        get_cached_response(request, cache=self.cache)
+        counting = CountingCache(self.cache)
+        learn_cache_key(request, HttpResponse(), cache_timeout=1000, cache=counting)
+        self.assertEqual(counting.calls, ['set'])
+        header_keys = [key for key in self.cache._expire_info if 'cache_header' in key]
+        self.assertEqual(len(header_keys), 1)
+        self.assertTrue(self.cache._expire_info[header_keys[0]] > time.time() + 500)
+
+    def test_invalidate_path(self):
+        self._cache_page('/tags/a/one/')
+        self._cache_page('/tags/a/two')
+        self._cache_page('/tags/b/')
+        invalidate_cache_path('/tags/a/')
+        self.assertFalse(self._is_cached('/tags/a/one/')[0])
+        self.assertFalse(self._is_cached('/tags/a/two')[0])
+        self.assertTrue(self._is_cached('/tags/b/')[0])
+
+        # Pages cached again after the invalidation are served.
+        self._cache_page('/tags/a/one/')
+        self.assertTrue(self._is_cached('/tags/a/one/')[0])
+
+    def test_invalidate_exact_path(self):
+        self._cache_page('/tags/a')
+        self._cache_page('/tags/a/b')
+        invalidate_cache_path('/tags/a')
+        self.assertFalse(self._is_cached('/tags/a')[0])
+        self.assertTrue(self._is_cached('/tags/a/b')[0])
+
+    def test_invalidate_model(self):
+        self._cache_page('/tags/polls/', tags=[Poll])
+        self._cache_page('/tags/named/', tags=['frontpage'])
+        self._cache_page('/tags/plain/')
+        invalidate_cache_tags([Poll(question='?', pub_date=timezone.now())])
+        self.assertFalse(self._is_cached('/tags/polls/')[0])
+        self.assertTrue(self._is_cached('/tags/named/')[0])
+        self.assertTrue(self._is_cached('/tags/plain/')[0])
+        invalidate_cache_tags(['frontpage'])
+        self.assertFalse(self._is_cached('/tags/named/')[0])
+
+    def test_evicted_tag_version(self):
+        self._cache_page('/tags/polls/', tags=[Poll])
+        invalidate_cache_tags([Poll])
+        self._cache_page('/tags/polls/', tags=[Poll])
+        self.cache.clear()
+        self._cache_page('/tags/polls/', tags=[Poll])
+        invalidate_cache_tags([Poll])
+        self.assertFalse(self._is_cached('/tags/polls/')[0])
+
+    @override_settings(CACHE_MIDDLEWARE_PATH_TAGS=False)
+    def test_path_tags_disabled(self):
+        self._cache_page('/tags/a/')
+        invalidate_cache_path('/tags/a/')
+        self.assertTrue(self._is_cached('/tags/a/')[0])
+
+
 @override_settings(
         CACHE_MIDDLEWARE_KEY_PREFIX='settingsprefix',
         CACHE_MIDDLEWARE_SECONDS=1,
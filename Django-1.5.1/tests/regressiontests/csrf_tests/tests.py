@@ -134,6 +134,33 @@ class CsrfViewMiddlewareTest(TestCase):
         csrf_cookie = resp2.cookies.get(settings.CSRF_COOKIE_NAME, False)
         self.assertEqual(csrf_cookie, False)
 
+    def test_process_view_token_not_generated_until_used(self):
+        """
+        Check that a token is only read from the cookie or generated when
+        get_token() is called.
+        """
+        req = self._get_GET_no_csrf_cookie_request()
+        CsrfViewMiddleware().process_view(req, non_token_view_using_request_processor, (), {})
+        non_token_view_using_request_processor(req)
+        self.assertFalse('CSRF_COOKIE' in req.META)
+
+        CsrfViewMiddleware().process_view(req, token_view, (), {})
+        resp = token_view(req)
+        self.assertEqual(len(req.META['CSRF_COOKIE']), CSRF_KEY_LENGTH)
+        self._check_token_present(resp, csrf_id=req.META['CSRF_COOKIE'])
+
+    def test_get_token_for_exempt_view_no_csrf_cookie(self):
+        """
+        Check that get_token generates a token for a view decorated with
+        'csrf_exempt' when there is no CSRF cookie.
+        """
+        req = self._get_GET_no_csrf_cookie_request()
+        CsrfViewMiddleware().process_view(req, csrf_exempt(token_view), (), {})
+        resp = token_view(req)
+        resp2 = CsrfViewMiddleware().process_response(req, resp)
+        csrf_cookie = resp2.cookies[settings.CSRF_COOKIE_NAME]
+        self._check_token_present(resp, csrf_id=csrf_cookie.value)
+
     # Check the request processing
     def test_process_request_no_csrf_cookie(self):
         """
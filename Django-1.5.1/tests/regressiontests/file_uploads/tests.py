@@ -11,11 +11,13 @@ import tempfile as sys_tempfile
 
 from django.core.files import temp as tempfile
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import (DirectTemporaryFileUploadHandler,
+    MemoryFileUploadHandler)
 from django.http.multipartparser import MultiPartParser
 from django.test import TestCase, client
 from django.test.utils import override_settings
 from django.utils.encoding import force_bytes
-from django.utils.six import StringIO
+from django.utils.six import BytesIO, StringIO
 from django.utils import unittest
 
 from . import uploadhandler
@@ -74,6 +76,17 @@ class FileUploadTests(TestCase):
 
         self.assertEqual(response.status_code, 200)
 
+    @override_settings(FILE_UPLOAD_HANDLERS=(
+        'django.core.files.uploadhandler.DirectTemporaryFileUploadHandler',))
+    def test_direct_temporary_file_upload(self):
+        post_data = {
+            'file1': SimpleUploadedFile('file1.txt', b'first file'),
+            'file2': SimpleUploadedFile('file2.txt', b'x' * (2 ** 18)),
+        }
+        response = self.client.post('/file_uploads/echo_content/', post_data)
+        got = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(got, {'file1': 'first file', 'file2': 'x' * (2 ** 18)})
+
     def _test_base64_upload(self, content):
         payload = client.FakePayload("\r\n".join([
             '--' + client.BOUNDARY,
@@ -413,3 +426,95 @@ class MultiParserTests(unittest.TestCase):
             'CONTENT_TYPE':     'multipart/form-data; boundary=_foo',
             'CONTENT_LENGTH':   '1'
         }, StringIO('x'), [], 'utf-8')
+
+    def test_boundary_across_chunks(self):
+        """
+        Parts are split correctly whatever the size of the chunks the body is
+        read in, including boundaries straddling several chunks.
+        """
+        boundary = '_boundary_'
+        content = b'\r\n--_bound' * 20 + b'end of file\r\n-'
+        body = b'\r\n'.join([
+            b'--' + boundary.encode('ascii'),
+            b'Content-Disposition: form-data; name="name"',
+            b'',
+            b'value',
+            b'--' + boundary.encode('ascii'),
+            b'Content-Disposition: form-data; name="file"; filename="test.txt"',
+            b'Content-Type: application/octet-stream',
+            b'',
+            content,
+            b'--' + boundary.encode('ascii') + b'--',
+            b'',
+        ])
+        for chunk_size in (1, 3, 11, 17, 64, 1024):
+            handler = MemoryFileUploadHandler()
+            handler.chunk_size = chunk_size
+            parser = MultiPartParser({
+                'CONTENT_TYPE': 'multipart/form-data; boundary=%s' % boundary,
+                'CONTENT_LENGTH': len(body),
+            }, BytesIO(body), [handler], 'utf-8')
+            post, files = parser.parse()
+            self.assertEqual(post['name'], 'value')
+            self.assertEqual(files['file'].read(), content)
+
+
+class DirectTemporaryFileUploadHandlerTests(unittest.TestCase):
+
+    def _upload(self, chunks, request_length, content_length=None, handler=None):
+        if handler is None:
+            handler = DirectTemporaryFileUploadHandler()
+            handler.handle_raw_input(None, {}, request_length, b'boundary')
+        handler.new_file('file', 'test.txt', 'text/plain', content_length)
+        start = 0
+        for chunk in chunks:
+            handler.receive_data_chunk(chunk, start)
+            start += len(chunk)
+        return handler.file_complete(start)
+
+    def test_preallocated_file_is_truncated(self):
+        uploaded = self._upload([b'a' * 1000, b'b' * 24], 2 ** 20, 2 ** 20)
+        try:
+            self.assertEqual(uploaded.size, 1024)
+            self.assertEqual(os.fstat(uploaded.file.fileno()).st_size, 1024)
+            self.assertEqual(uploaded.read(), b'a' * 1000 + b'b' * 24)
+        finally:
+            uploaded.close()
+
+    def test_preallocation(self):
+        allocated = []
+        original_fallocate = getattr(os, 'posix_fallocate', None)
+        os.posix_fallocate = lambda fd, offset, size: allocated.append(size)
+        try:
+            handler = DirectTemporaryFileUploadHandler()
+            handler.handle_raw_input(None, {}, 1000, b'boundary')
+            # Without its own size, a part isn't given the request's.
+            self._upload([b'a' * 300], 1000, handler=handler).close()
+            self.assertEqual(allocated, [])
+            # A part's size is capped at what is left of the request.
+            self._upload([b'a' * 100], 1000, 5000, handler=handler).close()
+            self.assertEqual(allocated, [700])
+        finally:
+            if original_fallocate is None:
+                del os.posix_fallocate
+            else:
+                os.posix_fallocate = original_fallocate
+
+    def test_fsync(self):
+        synced = []
+        original_fsync = os.fsync
+        os.fsync = synced.append
+        try:
+            with override_settings(FILE_UPLOAD_FSYNC=True):
+                self._upload([b'a' * 100] * 3, 300).close()
+            self.assertEqual(len(synced), 1)
+            del synced[:]
+            with override_settings(FILE_UPLOAD_FSYNC_INTERVAL=150):
+                self._upload([b'a' * 100] * 3, 300).close()
+            # After 200 bytes, and for the remaining 100 on completion.
+            self.assertEqual(len(synced), 2)
+            del synced[:]
+            self._upload([b'a' * 100] * 3, 300).close()
+            self.assertEqual(synced, [])
+        finally:
+            os.fsync = original_fsync
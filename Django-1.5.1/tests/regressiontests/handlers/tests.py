@@ -1,8 +1,32 @@
+from __future__ import absolute_import
+
+from django.core.exceptions import ImproperlyConfigured
 from django.core.handlers.wsgi import WSGIHandler
 from django.core import signals
+from django.http import HttpResponse
 from django.test import RequestFactory, TestCase
 from django.test.utils import override_settings
 from django.utils import six
+from django.utils import unittest
+
+from .urls import waiting
+
+try:
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    from django.core.handlers.asgi import ASGIHandler
+except (ImportError, ImproperlyConfigured):
+    asyncio = None
+
+
+class MarkingMiddleware(object):
+    def process_exception(self, request, exception):
+        return HttpResponse(b"handled " + str(exception).encode('ascii'))
+
+    def process_response(self, request, response):
+        if not response.streaming:
+            response['X-Marked'] = response.content.decode('ascii')
+        return response
 
 
 class HandlerTests(TestCase):
@@ -53,8 +77,172 @@ class SignalsTests(TestCase):
         self.assertEqual(self.signals, ['started', 'finished'])
         self.assertEqual(response.content, b"regular content")
 
+    def test_request_resolved_signal(self):
+        resolved = []
+        def register_resolved(**kwargs):
+            resolved.append(kwargs)
+        signals.request_resolved.connect(register_resolved)
+        try:
+            self.client.get('/regular/')
+            self.client.get('/missing/')
+        finally:
+            signals.request_resolved.disconnect(register_resolved)
+        self.assertEqual(len(resolved), 2)
+        self.assertEqual(resolved[0]['request'].path, '/regular/')
+        self.assertEqual(resolved[0]['resolver_match'].url_name, 'regular')
+        self.assertTrue(resolved[0]['duration'] >= 0)
+        self.assertEqual(resolved[1]['request'].path, '/missing/')
+        self.assertIsNone(resolved[1]['resolver_match'])
+
     def test_request_signals_streaming_response(self):
         response = self.client.get('/streaming/')
         self.assertEqual(self.signals, ['started'])
         self.assertEqual(b''.join(response.streaming_content), b"streaming content")
         self.assertEqual(self.signals, ['started', 'finished'])
+
+
+@unittest.skipIf(asyncio is None, "asyncio is not available")
+class ASGIHandlerTests(TestCase):
+    urls = 'regressiontests.handlers.urls'
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    def call(self, handler, path, method='GET', body=(b'',), headers=()):
+        """
+        Calls ``handler`` on a request for ``path`` whose body arrives in the
+        ``body`` chunks. Returns the awaitable result and the list the
+        messages sent are appended to.
+        """
+        scope = {
+            'type': 'http',
+            'method': method,
+            'path': path,
+            'query_string': b'',
+            'headers': list(headers),
+        }
+        received = [{'type': 'http.request', 'body': chunk,
+                     'more_body': i < len(body) - 1}
+                    for i, chunk in enumerate(body)]
+        sent = []
+
+        def done(result=None):
+            future = self.loop.create_future()
+            future.set_result(result)
+            return future
+
+        def receive():
+            return done(received.pop(0) if received else
+                        {'type': 'http.disconnect'})
+
+        def send(message):
+            sent.append(message)
+            return done()
+
+        return handler(scope, receive, send), sent
+
+    def request(self, path, **kwargs):
+        """
+        Runs ASGIHandler on a request for ``path`` and returns the messages
+        it sent.
+        """
+        result, sent = self.call(ASGIHandler(), path, **kwargs)
+        self.loop.run_until_complete(result)
+        return sent
+
+    def test_regular_response(self):
+        start, body = self.request('/regular/')
+        self.assertEqual(start['type'], 'http.response.start')
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'Content-Type', b'text/html; charset=utf-8'),
+                      start['headers'])
+        self.assertEqual(body, {'type': 'http.response.body',
+                                'body': b"regular content"})
+
+    def test_request_body(self):
+        start, body = self.request('/echo/', method='POST',
+            body=[b'a=1', b'&b=2'],
+            headers=[(b'content-type', b'application/x-www-form-urlencoded'),
+                     (b'content-length', b'7')])
+        self.assertEqual(start['status'], 200)
+        self.assertEqual(body['body'], b'a=1&b=2')
+
+    def test_streaming_response(self):
+        messages = self.request('/streaming/')
+        self.assertEqual(messages[0]['status'], 200)
+        self.assertEqual([m.get('body', b'') for m in messages[1:]],
+                         [b"streaming", b" ", b"content", b""])
+        self.assertFalse(messages[-1].get('more_body', False))
+
+    def test_coroutine_view(self):
+        start, body = self.request('/coroutine/')
+        self.assertEqual(start['status'], 200)
+        self.assertEqual(body['body'], b"coroutine content")
+
+    @override_settings(MIDDLEWARE_CLASSES=(
+        'regressiontests.handlers.tests.MarkingMiddleware',))
+    def test_coroutine_view_middleware(self):
+        # The response middleware runs once the coroutine has finished.
+        start, body = self.request('/coroutine/')
+        self.assertIn((b'X-Marked', b'coroutine content'), start['headers'])
+
+    @override_settings(MIDDLEWARE_CLASSES=(
+        'regressiontests.handlers.tests.MarkingMiddleware',))
+    def test_coroutine_view_exception(self):
+        # Exceptions raised by the coroutine go through exception middleware.
+        waiting['future'] = self.loop.create_future()
+        waiting['future'].set_exception(ValueError("failed"))
+        try:
+            start, body = self.request('/wait/')
+        finally:
+            waiting.clear()
+        self.assertEqual(body['body'], b"handled failed")
+
+    def test_coroutine_view_releases_thread(self):
+        """
+        While a coroutine returned by a view runs, the thread that called the
+        view can handle other requests.
+        """
+        handler = ASGIHandler(ThreadPoolExecutor(1))
+        waiting['loop'] = self.loop
+        waiting['future'] = self.loop.create_future()
+        try:
+            waited, wait_sent = self.call(handler, '/wait/')
+            released, release_sent = self.call(handler, '/release/')
+            self.loop.run_until_complete(asyncio.wait_for(
+                asyncio.gather(waited, released, loop=self.loop), 3,
+                loop=self.loop))
+        finally:
+            handler.executor.shutdown()
+            waiting.clear()
+        self.assertEqual(wait_sent[1]['body'], b"released")
+        self.assertEqual(release_sent[1]['body'], b"releasing")
+
+    def test_not_found(self):
+        start, body = self.request('/missing/')
+        self.assertEqual(start['status'], 404)
+
+    def test_disconnect(self):
+        self.assertEqual(self.request('/regular/', body=[]), [])
+
+    def test_environ(self):
+        environ = ASGIHandler().get_environ({
+            'type': 'http',
+            'method': 'GET',
+            'root_path': '/root',
+            'path': '/root/caf\xe9/',
+            'query_string': b'a=1',
+            'headers': [(b'host', b'example.com'), (b'cookie', b'a=1'),
+                        (b'cookie', b'b=2'), (b'content-type', b'text/plain')],
+        }, six.BytesIO())
+        self.assertEqual(environ['SCRIPT_NAME'], '/root')
+        self.assertEqual(environ['PATH_INFO'], '/caf\xc3\xa9/')
+        self.assertEqual(environ['QUERY_STRING'], 'a=1')
+        self.assertEqual(environ['HTTP_HOST'], 'example.com')
+        self.assertEqual(environ['HTTP_COOKIE'], 'a=1; b=2')
+        self.assertEqual(environ['CONTENT_TYPE'], 'text/plain')
@@ -2,8 +2,32 @@ from __future__ import unicode_literals
 
 from django.conf.urls import patterns, url
 from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+
+# Set by the tests to the event loop they run and a future on it.
+waiting = {}
+
+
+def coroutine_view(request):
+    # Stands in for a view defined with ``async def``.
+    import asyncio
+    return asyncio.sleep(0, result=HttpResponse(b"coroutine content"))
+
+def wait_view(request):
+    # Returns a coroutine that finishes once release_view has run.
+    import asyncio
+    return asyncio.wait_for(waiting['future'], 5)
+
+def release_view(request):
+    waiting['loop'].call_soon_threadsafe(
+        waiting['future'].set_result, HttpResponse(b"released"))
+    return HttpResponse(b"releasing")
 
 urlpatterns = patterns('',
-    url(r'^regular/$', lambda request: HttpResponse(b"regular content")),
+    url(r'^regular/$', lambda request: HttpResponse(b"regular content"), name='regular'),
     url(r'^streaming/$', lambda request: StreamingHttpResponse([b"streaming", b" ", b"content"])),
+    url(r'^echo/$', csrf_exempt(lambda request: HttpResponse(request.body))),
+    url(r'^coroutine/$', coroutine_view),
+    url(r'^wait/$', wait_view),
+    url(r'^release/$', release_view),
 )
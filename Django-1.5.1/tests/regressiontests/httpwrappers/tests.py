@@ -221,6 +221,22 @@ class QueryDictTests(unittest.TestCase):
         x.update(y)
         self.assertEqual(x.getlist('a'), ['1', '2', '3', '4'])
 
+    def test_copies_are_independent(self):
+        q = QueryDict(str('a=1&a=2&b=3'))
+        for q1 in (q.copy(), copy.copy(q), copy.deepcopy(q)):
+            self.assertEqual(q1, q)
+            q1.appendlist('a', '4')
+            q1.getlist('b').append('5')
+            self.assertEqual(q.getlist('a'), ['1', '2'])
+            self.assertEqual(q.getlist('b'), ['3'])
+
+    def test_deepcopy_copies_mutable_values(self):
+        q = QueryDict(str(''), mutable=True)
+        q.setlist('a', [['nested']])
+        q1 = copy.deepcopy(q)
+        q1.getlist('a')[0].append('more')
+        self.assertEqual(q.getlist('a'), [['nested']])
+
     def test_non_default_encoding(self):
         """#13572 - QueryDict with a non-default encoding"""
         q = QueryDict(str('cur=%A4'), encoding='iso-8859-15')
@@ -3,7 +3,8 @@ from __future__ import unicode_literals
 import os
 
 from django.core.exceptions import ImproperlyConfigured
-from django.core.urlresolvers import reverse, clear_url_caches
+from django.core.urlresolvers import (reverse, clear_url_caches, get_resolver,
+    LocaleRegexURLResolver)
 from django.test import TestCase
 from django.test.utils import override_settings
 from django.template import Template, Context
@@ -91,6 +92,41 @@ class PathUnusedTests(URLTestCaseBase):
         self.assertEqual(response.context['LANGUAGE_CODE'], 'en')
 
 
+class URLRegexCompilationTests(URLTestCaseBase):
+    """
+    Tests that regexes are compiled once for untranslated patterns, and up
+    front for the language prefixes.
+    """
+    def test_untranslated_regex_shared(self):
+        pattern = get_resolver(None).url_patterns[0]
+        with translation.override('en'):
+            regex = pattern.regex
+        with translation.override('nl'):
+            self.assertIs(pattern.regex, regex)
+
+    def test_translated_regex_per_language(self):
+        pattern = get_resolver(None).url_patterns[1]
+        with translation.override('en'):
+            self.assertEqual(pattern.regex.pattern, '^translated/$')
+        with translation.override('nl'):
+            self.assertEqual(pattern.regex.pattern, '^vertaald/$')
+
+    def test_language_prefixes_precompiled(self):
+        resolver = get_resolver(None).url_patterns[-1]
+        self.assertIsInstance(resolver, LocaleRegexURLResolver)
+        self.assertEqual(sorted(resolver._regex_dict), ['en', 'nl', 'pt-br'])
+        with translation.override('pt-br'):
+            self.assertEqual(resolver.regex.pattern, '^pt-br/')
+
+    def test_language_prefix_patterns_used(self):
+        self.assertTrue(get_resolver(None).language_prefix_patterns_used)
+        self.assertTrue(get_resolver(None).language_prefix_patterns_used)
+        with self.settings(ROOT_URLCONF='regressiontests.i18n.patterns.urls.path_unused'):
+            clear_url_caches()
+            self.assertFalse(get_resolver(None).language_prefix_patterns_used)
+        clear_url_caches()
+
+
 class URLTranslationTests(URLTestCaseBase):
     """
     Tests if the pattern-strings are translated correctly (within the
@@ -24,7 +24,8 @@ from django.utils import six
 from django.utils.six import PY3
 from django.utils.translation import (ugettext, ugettext_lazy, activate,
     deactivate, gettext_lazy, pgettext, npgettext, to_locale,
-    get_language_info, get_language, get_language_from_request, trans_real)
+    get_language_info, get_language, get_language_from_request, trans_real,
+    check_for_language)
 
 
 from .commands.tests import can_run_extraction_tests, can_run_compilation_tests
@@ -42,7 +43,8 @@ from .models import Company, TestModel
 from .patterns.tests import (URLRedirectWithoutTrailingSlashTests,
     URLTranslationTests, URLDisabledTests, URLTagTests, URLTestCaseBase,
     URLRedirectWithoutTrailingSlashSettingTests, URLNamespaceTests,
-    URLPrefixTests, URLResponseTests, URLRedirectTests, PathUnusedTests)
+    URLPrefixTests, URLResponseTests, URLRedirectTests, PathUnusedTests,
+    URLRegexCompilationTests)
 
 
 here = os.path.dirname(os.path.abspath(upath(__file__)))
@@ -838,6 +840,14 @@ class MiscTests(TestCase):
             self.assertEqual(t_plur.render(Context({'percent': 42, 'num': 1})), '%(percent)s% represents 1 object')
             self.assertEqual(t_plur.render(Context({'percent': 42, 'num': 4})), '%(percent)s% represents 4 objects')
 
+    def test_check_for_language_cached(self):
+        trans_real._checked_languages = {}
+        self.assertTrue(check_for_language('nl'))
+        self.assertFalse(check_for_language('xx'))
+        self.assertEqual(trans_real._checked_languages, {'nl': True, 'xx': False})
+        with self.settings(LOCALE_PATHS=extended_locale_paths):
+            self.assertEqual(trans_real._checked_languages, {})
+
 
 class ResolutionOrderI18NTests(TestCase):
 
@@ -20,6 +20,7 @@ from django.test import TransactionTestCase, TestCase, RequestFactory
 from django.test.utils import override_settings
 from django.utils import six
 from django.utils.encoding import force_str
+from django.utils.text import compress_string
 from django.utils.six.moves import xrange
 
 from .models import Band
@@ -300,8 +301,40 @@ class CommonMiddlewareTest(TestCase):
         CommonMiddleware().process_response(request, response)
         self.assertEqual(len(mail.outbox), 0)
 
+    def test_404_error_reporting_ignored_url_patterns(self):
+        settings.SEND_BROKEN_LINK_EMAILS = True
+        # Patterns that can be combined, and patterns that can't because of
+        # their flags or backreferences.
+        for patterns in [(r'foo', r'^/middleware/bar'),
+                         (r'foo', r'(?i)^/middleware/BAR'),
+                         (r'foo', r'(b)a\1?r_url')]:
+            settings.IGNORABLE_404_URLS = tuple(re.compile(pattern)
+                                                for pattern in patterns)
+            for path, ignored in [('foo_url/', True), ('bar_url/', True),
+                                  ('baz_url/', False)]:
+                request = self._get_request(path)
+                request.META['HTTP_REFERER'] = '/another/url/'
+                response = self.client.get(request.path)
+                mail.outbox = []
+                CommonMiddleware().process_response(request, response)
+                self.assertEqual(len(mail.outbox), 0 if ignored else 1)
+
     # Other tests
 
+    def test_disallowed_user_agents(self):
+        with self.settings(DISALLOWED_USER_AGENTS=(re.compile(r'^Bad'),
+                                                   re.compile(r'(?i)crawler'))):
+            for user_agent, forbidden in [('Bad/1.0', True),
+                                          ('Some CRAWLER', True),
+                                          ('Mozilla/5.0', False)]:
+                request = self._get_request('slash/')
+                request.META['HTTP_USER_AGENT'] = user_agent
+                response = CommonMiddleware().process_request(request)
+                if forbidden:
+                    self.assertEqual(response.status_code, 403)
+                else:
+                    self.assertEqual(response, None)
+
     def test_non_ascii_query_string_does_not_crash(self):
         """Regression test for #15152"""
         request = self._get_request('slash')
@@ -595,6 +628,24 @@ class GZipMiddlewareTest(TestCase):
         self.assertEqual(r.get('Content-Encoding'), 'gzip')
         self.assertFalse(r.has_header('Content-Length'))
 
+    @override_settings(GZIP_STREAMING_FLUSH_SIZE=1000)
+    def test_compress_streaming_response_coalesced(self):
+        """
+        Streamed output is only flushed once GZIP_STREAMING_FLUSH_SIZE bytes
+        have been compressed.
+        """
+        r = GZipMiddleware().process_response(self.req, self.stream_resp)
+        chunks = list(r)
+        self.assertEqual(self.decompress(b''.join(chunks)), b''.join(self.sequence))
+        # The gzip header, one flush after all 1000 bytes, and the trailer.
+        self.assertEqual(len(chunks), 3)
+
+    @override_settings(GZIP_COMPRESSION_LEVEL=1)
+    def test_compression_level(self):
+        r = GZipMiddleware().process_response(self.req, self.resp)
+        self.assertEqual(self.decompress(r.content), self.compressible_string)
+        self.assertEqual(r.content, compress_string(self.compressible_string, 1))
+
     def test_compress_non_200_response(self):
         """
         Tests that compression is performed on responses with a status other than 200.
@@ -1,11 +1,14 @@
 import sys
+import threading
 
 from django.conf import settings
+from django.core.handlers.stats import MiddlewareStats, get_middleware_stats
 from django.core.signals import got_request_exception
 from django.http import HttpResponse
 from django.template.response import TemplateResponse
 from django.template import Template
 from django.test import TestCase
+from django.test.utils import override_settings
 
 class TestException(Exception):
     pass
@@ -784,3 +787,64 @@ class RootUrlconfTests(TestCase):
 
         if original_ROOT_URLCONF is not _missing:
             settings.ROOT_URLCONF = original_ROOT_URLCONF
+
+
+class HeaderMiddleware(object):
+    def process_request(self, request):
+        request.middleware_seen = True
+
+    def process_response(self, request, response):
+        response['X-Middleware'] = str(getattr(request, 'middleware_seen', False))
+        return response
+
+class PartialHeaderMiddleware(HeaderMiddleware):
+    inactive_paths = ('/middleware_exceptions/template',)
+
+
+@override_settings(
+    MIDDLEWARE_CLASSES=('regressiontests.middleware_exceptions.tests.PartialHeaderMiddleware',),
+)
+class MiddlewarePipelineTests(TestCase):
+    urls = 'regressiontests.middleware_exceptions.urls'
+
+    def test_inactive_paths(self):
+        response = self.client.get('/middleware_exceptions/view/')
+        self.assertEqual(response['X-Middleware'], 'True')
+        response = self.client.get('/middleware_exceptions/template_response/')
+        self.assertFalse(response.has_header('X-Middleware'))
+        response = self.client.get('/middleware_exceptions/view/')
+        self.assertEqual(response['X-Middleware'], 'True')
+
+    @override_settings(MIDDLEWARE_TIMING=True)
+    def test_timing(self):
+        path = 'regressiontests.middleware_exceptions.tests.PartialHeaderMiddleware'
+        get_middleware_stats(reset=True)
+        self.client.get('/middleware_exceptions/view/')
+        self.client.get('/middleware_exceptions/view/')
+        self.client.get('/middleware_exceptions/template_response/')
+        stats = get_middleware_stats(reset=True)[path]
+        self.assertEqual(sorted(stats), ['process_request', 'process_response'])
+        for method in stats.values():
+            self.assertEqual(method['calls'], 2)
+            self.assertEqual(sum(count for bound, count in method['histogram']), 2)
+            self.assertEqual(method['histogram'][-1][0], None)
+            self.assertTrue(method['max_time'] >= method['mean_time'] >= 0)
+        self.assertEqual(get_middleware_stats()[path], {})
+
+    def test_timing_reset_keeps_concurrent_samples(self):
+        stats = MiddlewareStats()
+        done = threading.Event()
+
+        def record():
+            for i in range(20000):
+                stats.record('process_request', 0.0)
+            done.set()
+
+        thread = threading.Thread(target=record)
+        thread.start()
+        calls = 0
+        while not done.is_set():
+            calls += stats.snapshot(reset=True).get('process_request', {}).get('calls', 0)
+        thread.join()
+        calls += stats.snapshot(reset=True).get('process_request', {}).get('calls', 0)
+        self.assertEqual(calls, 20000)
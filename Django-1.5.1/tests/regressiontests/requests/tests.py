@@ -8,7 +8,7 @@ from io import BytesIO
 
 from django.db import connection, connections, DEFAULT_DB_ALIAS
 from django.core import signals
-from django.core.exceptions import SuspiciousOperation
+from django.core.exceptions import SuspiciousOperation, RequestDataTooBig
 from django.core.handlers.wsgi import WSGIRequest, LimitedStream
 from django.http import HttpRequest, HttpResponse, parse_cookie, build_request_repr, UnreadablePostError
 from django.test import TransactionTestCase
@@ -355,6 +355,21 @@ class RequestsTests(unittest.TestCase):
         self.assertEqual(stream.read(2), b'')
         self.assertEqual(stream.read(), b'')
 
+    def test_limited_stream_readline_reads_in_chunks(self):
+        # Looking for the end of a line doesn't read the rest of the stream.
+        stream = LimitedStream(BytesIO(b'12\n' + b'x' * 100), 103, buf_size=8)
+        self.assertEqual(stream.readline(), b'12\n')
+        self.assertEqual(stream.remaining, 95)
+        self.assertEqual(stream.readline(), b'x' * 100)
+        self.assertEqual(stream.readline(), b'')
+
+    def test_limited_stream_negative_size(self):
+        # A negative size means no limit, as it does for files.
+        stream = LimitedStream(BytesIO(b'line one\nline two\nrest'), 22, buf_size=4)
+        self.assertEqual(stream.readline(-1), b'line one\n')
+        self.assertEqual(stream.readline(-5), b'line two\n')
+        self.assertEqual(stream.read(-1), b'rest')
+
     def test_stream(self):
         payload = FakePayload('name=value')
         request = WSGIRequest({'REQUEST_METHOD': 'POST',
@@ -562,6 +577,62 @@ class RequestsTests(unittest.TestCase):
         with self.assertRaises(UnreadablePostError):
             request.body
 
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=5)
+    def test_body_exceeds_memory_limit(self):
+        payload = FakePayload('Hello There!')
+        request = WSGIRequest({'REQUEST_METHOD': 'POST',
+                               'CONTENT_TYPE': 'application/json',
+                               'CONTENT_LENGTH': len(payload),
+                               'wsgi.input': payload})
+        self.assertRaises(RequestDataTooBig, lambda: request.body)
+        # The body can still be streamed.
+        self.assertEqual(request.read(), b'Hello There!')
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=1024)
+    def test_POST_spooled_to_disk(self):
+        """
+        Form bodies too big to load into memory are parsed from a copy on disk,
+        which can be read again afterwards.
+        """
+        data = [('f%d' % i, 'value %d' % i) for i in range(10000)]
+        payload = FakePayload(urlencode(data))
+        request = WSGIRequest({'REQUEST_METHOD': 'POST',
+                               'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+                               'CONTENT_LENGTH': len(payload),
+                               'wsgi.input': payload})
+        self.assertEqual(len(request.POST), 10000)
+        self.assertEqual(request.POST['f0'], 'value 0')
+        self.assertEqual(request.POST['f9999'], 'value 9999')
+        self.assertRaises(AttributeError, request.POST.__setitem__, 'f0', 'x')
+        self.assertRaises(RequestDataTooBig, lambda: request.body)
+        self.assertEqual(request.read(), urlencode(data).encode('ascii'))
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=1024)
+    def test_POST_spooled_field_too_big(self):
+        """
+        A spooled form body is rejected, rather than buffered, once one field
+        without separators grows past DATA_UPLOAD_MAX_MEMORY_SIZE.
+        """
+        payload = FakePayload('a=' + 'x' * (1024 * 1024))
+        request = WSGIRequest({'REQUEST_METHOD': 'POST',
+                               'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+                               'CONTENT_LENGTH': len(payload),
+                               'wsgi.input': payload})
+        self.assertRaises(RequestDataTooBig, lambda: request.POST)
+        self.assertEqual(request.POST, {})
+        self.assertTrue(request._post_parse_error)
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=1024)
+    def test_POST_spooled_fields_across_chunks(self):
+        # Fields split between reads are reassembled.
+        data = [('f%d' % i, 'v' * 700) for i in range(300)]
+        payload = FakePayload(urlencode(data))
+        request = WSGIRequest({'REQUEST_METHOD': 'POST',
+                               'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+                               'CONTENT_LENGTH': len(payload),
+                               'wsgi.input': payload})
+        self.assertEqual(sorted(request.POST.items()), sorted(data))
+
 class TransactionRequestTests(TransactionTestCase):
     def test_request_finished_db_state(self):
         # The GET below will not succeed, but it will give a response with
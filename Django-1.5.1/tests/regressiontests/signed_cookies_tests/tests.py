@@ -19,6 +19,18 @@ class SignedCookieTest(TestCase):
         value = request.get_signed_cookie('c')
         self.assertEqual(value, 'hello')
 
+    def test_secret_key_rotation(self):
+        with self.settings(SECRET_KEY='old-secret'):
+            response = HttpResponse()
+            response.set_signed_cookie('c', 'hello')
+        request = HttpRequest()
+        request.COOKIES['c'] = response.cookies['c'].value
+        with self.settings(SECRET_KEY='new-secret',
+                           SECRET_KEY_FALLBACKS=['old-secret']):
+            self.assertEqual(request.get_signed_cookie('c'), 'hello')
+        with self.settings(SECRET_KEY='new-secret'):
+            self.assertRaises(signing.BadSignature, request.get_signed_cookie, 'c')
+
     def test_can_use_salt(self):
         response = HttpResponse()
         response.set_signed_cookie('a', 'hello', salt='one')
@@ -105,6 +105,30 @@ class TestSigner(TestCase):
             self.assertRaises(
                 signing.BadSignature, signing.loads, transform(encoded))
 
+    def test_fallback_keys(self):
+        old_signer = signing.Signer('old-secret')
+        signer = signing.Signer('new-secret', fallback_keys=['old-secret'])
+        signed = old_signer.sign('hello')
+        self.assertEqual(signer.unsign(signed), 'hello')
+        # New values are only signed with the current key.
+        self.assertEqual(signer.sign('hello'),
+                         signing.Signer('new-secret').sign('hello'))
+        self.assertRaises(signing.BadSignature,
+            signing.Signer('new-secret').unsign, signed)
+
+    def test_fallback_keys_setting(self):
+        with self.settings(SECRET_KEY='old-secret'):
+            signed = signing.dumps('hello')
+        with self.settings(SECRET_KEY='new-secret',
+                           SECRET_KEY_FALLBACKS=['old-secret']):
+            self.assertEqual(signing.loads(signed), 'hello')
+            # An explicit key doesn't pick up the fallbacks.
+            self.assertRaises(signing.BadSignature,
+                signing.loads, signed, key='new-secret')
+        with self.settings(SECRET_KEY='new-secret'):
+            self.assertRaises(signing.BadSignature, signing.loads, signed)
+
+
 class TestTimestampSigner(TestCase):
 
     def test_timestamp_signer(self):
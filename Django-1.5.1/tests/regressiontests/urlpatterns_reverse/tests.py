@@ -6,9 +6,10 @@ from __future__ import absolute_import, unicode_literals
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ImproperlyConfigured, ViewDoesNotExist
+from django.core import urlresolvers
 from django.core.urlresolvers import (reverse, resolve, get_callable,
-    get_resolver, NoReverseMatch, Resolver404, ResolverMatch, RegexURLResolver,
-    RegexURLPattern)
+    get_resolver, is_valid_path, clear_url_caches, NoReverseMatch, Resolver404,
+    ResolverMatch, RegexURLResolver, RegexURLPattern)
 from django.http import HttpResponseRedirect, HttpResponsePermanentRedirect
 from django.shortcuts import redirect
 from django.test import TestCase
@@ -183,6 +184,19 @@ class URLPatternReverse(TestCase):
         self.assertEqual('/bump%2520map/includes/non_path_include/',
                reverse('non_path_include', prefix='/bump%20map/'))
 
+    def test_reverse_repeated(self):
+        """
+        Reversing again, from the templates and results cached by the
+        resolver, gives the same answers as the first time.
+        """
+        for i in range(2):
+            self.test_urlpattern_reverse()
+            self.assertEqual('/includes/non_path_include/',
+                   reverse('non_path_include'))
+            self.assertEqual('/bump%2520map/includes/non_path_include/',
+                   reverse('non_path_include', prefix='/bump%20map/'))
+            self.assertRaises(NoReverseMatch, reverse, 'places', args=[1, 2])
+
 class ResolverTests(unittest.TestCase):
     def test_resolver_repr(self):
         """
@@ -244,6 +258,36 @@ class ResolverTests(unittest.TestCase):
                         else:
                             self.assertEqual(t.name, e['name'], 'Wrong URL name.  Expected "%s", got "%s".' % (e['name'], t.name))
 
+    def test_resolve_keeps_urlconf_order(self):
+        """
+        Patterns are still tried in urlconf order when only those whose
+        literal prefix fits the path are considered.
+        """
+        resolver = RegexURLResolver(r'^/', [
+            RegexURLPattern(r'^art', views.empty_view, name='art'),
+            RegexURLPattern(r'^(?P<slug>[a-z]+)/$', views.empty_view, name='slug'),
+            RegexURLPattern(r'^articles/$', views.empty_view, name='articles'),
+            RegexURLPattern(r'^x|^y/', views.empty_view, name='alternation'),
+            RegexURLPattern(r'^news/$', views.empty_view, name='news'),
+            RegexURLPattern(r'news/$', views.empty_view, name='unanchored'),
+            RegexURLPattern(r'^(?i)NEWS/', views.empty_view, name='ignorecase'),
+            RegexURLPattern(r'^ab?c/1$', views.empty_view, name='optional'),
+        ])
+        self.assertEqual(resolver.resolve('/articles/').url_name, 'art')
+        self.assertEqual(resolver.resolve('/blog/').url_name, 'slug')
+        self.assertEqual(resolver.resolve('/articles/1/').url_name, 'art')
+        self.assertEqual(resolver.resolve('/y/1').url_name, 'alternation')
+        self.assertEqual(resolver.resolve('/news/').url_name, 'slug')
+        self.assertEqual(resolver.resolve('/old/news/').url_name, 'unanchored')
+        self.assertEqual(resolver.resolve('/NEWS/').url_name, 'ignorecase')
+        self.assertEqual(resolver.resolve('/ac/1').url_name, 'optional')
+        try:
+            resolver.resolve('/1/')
+            self.fail('resolve did not raise a 404')
+        except Resolver404 as e:
+            # Patterns skipped because of their prefix are still reported.
+            self.assertEqual(len(e.args[0]['tried']), 8)
+
 class ReverseLazyTest(TestCase):
     urls = 'regressiontests.urlpatterns_reverse.reverse_lazy_urls'
 
@@ -529,6 +573,50 @@ class ResolverMatchTests(TestCase):
         resolver_match = response.resolver_match
         self.assertEqual(resolver_match.url_name, 'test-resolver-match')
 
+    def test_resolve_cached_match_is_copied(self):
+        """
+        Matches served from the resolve() cache can be changed without
+        affecting later lookups of the same path.
+        """
+        match = resolve('/normal/')
+        match.kwargs['arg1'] = 'changed'
+        match.namespaces.append('changed')
+        match = resolve('/normal/')
+        self.assertEqual(match.kwargs, {})
+        self.assertEqual(match.namespaces, [])
+
+    def test_resolve_caches_only_matches_without_arguments(self):
+        clear_url_caches()
+        resolve('/normal/42/37/')
+        self.assertEqual(len(urlresolvers._resolve_cache), 0)
+        resolve('/normal/')
+        self.assertEqual(len(urlresolvers._resolve_cache), 1)
+
+    def test_resolve_cache_drops_least_recently_used(self):
+        clear_url_caches()
+        old_size = urlresolvers._RESOLVE_CACHE_SIZE
+        urlresolvers._RESOLVE_CACHE_SIZE = 2
+        try:
+            resolve('/normal/')
+            resolve('/resolver_match/')
+            resolve('/normal/')
+            resolve('/+\\$*/')
+            paths = sorted(key[1] for key in urlresolvers._resolve_cache)
+            self.assertEqual(paths, ['/+\\$*/', '/normal/'])
+        finally:
+            urlresolvers._RESOLVE_CACHE_SIZE = old_size
+            clear_url_caches()
+
+    def test_is_valid_path_remembers_invalid_paths(self):
+        clear_url_caches()
+        self.assertFalse(is_valid_path('/not-a-path/'))
+        self.assertTrue(is_valid_path('/normal/42/37/'))
+        self.assertFalse(is_valid_path('/not-a-path/'))
+        self.assertEqual(len(urlresolvers._invalid_paths), 1)
+        clear_url_caches()
+        self.assertEqual(len(urlresolvers._invalid_paths), 0)
+        self.assertFalse(is_valid_path('/not-a-path/'))
+
 class ErroneousViewTests(TestCase):
     urls = 'regressiontests.urlpatterns_reverse.erroneous_urls'
 
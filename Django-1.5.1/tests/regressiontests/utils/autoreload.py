@@ -0,0 +1,107 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from django.test import SimpleTestCase
+from django.test.utils import override_settings
+from django.utils import autoreload, six, unittest
+from django.utils._os import upath
+
+LOCALE_PATH = os.path.join(os.path.dirname(os.path.dirname(upath(__file__))),
+                           'i18n', 'patterns', 'locale')
+
+
+class AutoreloadTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.module_file = os.path.join(self.tmpdir, 'autoreload_test_module.py')
+        with open(self.module_file, 'w') as f:
+            f.write('VALUE = 1\n')
+        self.template_dir = os.path.join(self.tmpdir, 'templates')
+        os.mkdir(self.template_dir)
+        self.template_file = os.path.join(self.template_dir, 'page.html')
+        with open(self.template_file, 'w') as f:
+            f.write('{{ value }}\n')
+        sys.path.insert(0, self.tmpdir)
+        __import__('autoreload_test_module')
+        self.reset_autoreload()
+
+    def tearDown(self):
+        sys.path.remove(self.tmpdir)
+        del sys.modules['autoreload_test_module']
+        shutil.rmtree(self.tmpdir)
+        self.reset_autoreload()
+
+    def reset_autoreload(self):
+        autoreload._cached_modules = set()
+        autoreload._mtimes = {}
+
+    def touch(self, filename):
+        mtime = os.stat(filename).st_mtime + 10
+        os.utime(filename, (mtime, mtime))
+
+    def test_gen_filenames_modules(self):
+        filenames = autoreload.gen_filenames()
+        self.assertIn(os.path.abspath(self.module_file), filenames)
+        self.assertIn(os.path.abspath(autoreload.__file__.replace('.pyc', '.py')),
+                      filenames)
+
+    @override_settings(LOCALE_PATHS=(LOCALE_PATH,))
+    def test_gen_filenames_locale(self):
+        filenames = autoreload.gen_filenames()
+        self.assertIn(os.path.join(LOCALE_PATH, 'nl', 'LC_MESSAGES', 'django.mo'),
+                      filenames)
+        self.assertNotIn(os.path.join(LOCALE_PATH, 'nl', 'LC_MESSAGES', 'django.po'),
+                         filenames)
+
+    def test_gen_filenames_templates(self):
+        with self.settings(TEMPLATE_DIRS=(self.template_dir,)):
+            self.assertIn(self.template_file, autoreload.gen_filenames())
+
+    def test_gen_filenames_cached(self):
+        filenames = autoreload.gen_filenames()
+        self.assertIs(autoreload.gen_filenames(), filenames)
+        del sys.modules['autoreload_test_module']
+        self.assertIsNot(autoreload.gen_filenames(), filenames)
+        self.assertNotIn(os.path.abspath(self.module_file),
+                         autoreload.gen_filenames())
+        __import__('autoreload_test_module')
+
+    def test_code_changed(self):
+        self.assertFalse(autoreload.code_changed())
+        self.assertFalse(autoreload.code_changed())
+        self.touch(self.module_file)
+        self.assertTrue(autoreload.code_changed())
+        self.assertFalse(autoreload.code_changed())
+
+    @unittest.skipUnless(autoreload.USE_INOTIFY, "inotify isn't available")
+    def test_inotify_code_changed(self):
+        with self.settings(TEMPLATE_DIRS=(self.template_dir,)):
+            self.assertFalse(autoreload.inotify_code_changed(0))
+            # Files that aren't watched don't trigger a reload.
+            with open(os.path.join(self.tmpdir, 'notes.txt'), 'w') as f:
+                f.write('notes\n')
+            self.assertFalse(autoreload.inotify_code_changed(0.1))
+            with open(self.module_file, 'a') as f:
+                f.write('VALUE = 2\n')
+            self.assertTrue(autoreload.inotify_code_changed(1))
+            self.assertFalse(autoreload.inotify_code_changed(0.1))
+            self.touch(self.template_file)
+            self.assertTrue(autoreload.inotify_code_changed(1))
+
+    @unittest.skipUnless(autoreload.USE_INOTIFY, "inotify isn't available")
+    def test_inotify_text_directory(self):
+        # Directories given as text (e.g. under unicode_literals on Python 2)
+        # are watched too.
+        template_dir = six.text_type(self.template_dir)
+        with self.settings(TEMPLATE_DIRS=(template_dir,)):
+            self.assertFalse(autoreload.inotify_code_changed(0))
+            self.assertIn(template_dir, autoreload._inotify_watches.values())
+            with open(self.template_file, 'a') as f:
+                f.write('{{ other }}\n')
+            self.assertTrue(autoreload.inotify_code_changed(1))
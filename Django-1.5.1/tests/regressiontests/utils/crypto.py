@@ -1,12 +1,15 @@
 from __future__ import unicode_literals
 
 import binascii
+import hmac
 import math
+import os
 import timeit
 import hashlib
 
-from django.utils import unittest
-from django.utils.crypto import constant_time_compare, pbkdf2
+from django.utils import crypto, unittest
+from django.utils.crypto import (constant_time_compare, get_random_string,
+    pbkdf2, salted_hmac)
 
 
 class TestUtilsCryptoMisc(unittest.TestCase):
@@ -18,6 +21,31 @@ class TestUtilsCryptoMisc(unittest.TestCase):
         self.assertTrue(constant_time_compare('spam', 'spam'))
         self.assertFalse(constant_time_compare('spam', 'eggs'))
 
+    def test_salted_hmac(self):
+        key = hashlib.sha1(b'salt' + b'secret').digest()
+        expected = hmac.new(key, b'value', hashlib.sha1).hexdigest()
+        # Computed from scratch, then from the cached keyed HMAC.
+        self.assertEqual(salted_hmac('salt', 'value', 'secret').hexdigest(), expected)
+        self.assertEqual(salted_hmac('salt', 'value', 'secret').hexdigest(), expected)
+        self.assertNotEqual(salted_hmac('salt', 'other', 'secret').hexdigest(), expected)
+        self.assertNotEqual(salted_hmac('salt', 'value', 'other').hexdigest(), expected)
+
+    def test_get_random_string(self):
+        self.assertEqual(len(get_random_string()), 12)
+        self.assertEqual(len(get_random_string(1000)), 1000)
+        self.assertEqual(set(get_random_string(1000, 'ab')), set('ab'))
+        self.assertNotEqual(get_random_string(32), get_random_string(32))
+
+    def test_random_pool_not_shared_after_fork(self):
+        get_random_string(32)
+        # Pretend this is a forked child of the process that filled the pool.
+        crypto._random_pool_pid = -1
+        pool = crypto._random_pool[:]
+        chars = bytes(bytearray(range(256))).decode('latin-1')
+        string = get_random_string(32, chars)
+        self.assertNotEqual(string, ''.join(chars[b] for b in pool[:32]))
+        self.assertEqual(crypto._random_pool_pid, os.getpid())
+
 
 class TestUtilsCryptoPBKDF2(unittest.TestCase):
 
@@ -144,3 +172,12 @@ class TestUtilsCryptoPBKDF2(unittest.TestCase):
             result = pbkdf2(**vector['args'])
             self.assertEqual(binascii.hexlify(result).decode('ascii'),
                              vector['result'])
+
+    def test_python_implementation(self):
+        # The vectors also hold when hashlib.pbkdf2_hmac isn't available.
+        original, crypto._pbkdf2_hmac = crypto._pbkdf2_hmac, None
+        try:
+            self.test_public_vectors()
+            self.test_regression_vectors()
+        finally:
+            crypto._pbkdf2_hmac = original
@@ -4,6 +4,7 @@ Tests for django.utils.
 from __future__ import absolute_import
 
 from .archive import TestBzip2Tar, TestGzipTar, TestTar, TestZip
+from .autoreload import AutoreloadTests
 from .baseconv import TestBaseConv
 from .checksums import TestUtilsChecksums
 from .crypto import TestUtilsCryptoMisc, TestUtilsCryptoPBKDF2